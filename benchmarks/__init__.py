@@ -0,0 +1,4 @@
+"""
+Offline benchmarks, ran from the repository root
+with ``python -m benchmarks.<name>``.
+"""
@@ -0,0 +1,74 @@
+"""
+Benchmarks the cost of building a ``MESSAGE_CREATE`` message,
+which looks its channel and guild up in the cache, as the
+amount of cached guilds grows. It should stay flat.
+
+    python -m benchmarks.cache --guilds 10 100 1000 10000 100000
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from typing import Any, Dict, List
+
+from discii import Client, Message
+from discii.guild import Guild
+from discii.mock import guild_payload, message_payload
+
+
+CHANNELS_PER_GUILD = 5
+
+
+async def benchmark_cache(guilds: int, *, messages: int = 20000) -> float:
+    """
+    Builds messages in random channels of ``guilds``
+    cached guilds.
+
+    Returns
+    -------
+    micros: :class:`float`
+        The microseconds per message built.
+    """
+    client = Client()
+    await client.login("x" * 59)
+    state = client._state
+
+    try:
+        for guild_id in range(guilds):
+            first = guild_id * CHANNELS_PER_GUILD
+            channel_ids = range(first, first + CHANNELS_PER_GUILD)
+            guild = Guild(payload=guild_payload(guild_id, channel_ids), state=state)
+            client._cache.add_guild(guild)
+
+        channel_count = guilds * CHANNELS_PER_GUILD
+        payloads: List[Dict[str, Any]] = [
+            message_payload(index, random.randrange(channel_count))
+            for index in range(messages)
+        ]
+
+        started = time.perf_counter()
+        for payload in payloads:
+            Message(payload=payload, state=state)
+        return (time.perf_counter() - started) / messages * 1e6
+    finally:
+        await client.http.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmarks building messages against the amount of cached guilds."
+    )
+    parser.add_argument(
+        "--guilds", type=int, nargs="+", default=[10, 100, 1000, 10000, 100000]
+    )
+    parser.add_argument("--messages", type=int, default=20000)
+    args = parser.parse_args()
+
+    for guilds in args.guilds:
+        micros = asyncio.run(benchmark_cache(guilds, messages=args.messages))
+        print("{} guilds: {:.2f}us per message".format(guilds, micros))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Benchmarks gateway throughput in events per second against
+the amount of cluster processes. Every shard is played the
+same recording of ``MESSAGE_CREATE`` events by a local
+`ReplayGateway`, which runs in a thread of the supervisor.
+
+    python -m benchmarks.cluster --events 20000 --shards 8 --clusters 1 2 4 8
+"""
+import argparse
+import asyncio
+import functools
+import multiprocessing
+import os
+import queue
+import tempfile
+import threading
+import time
+
+from typing import Any, List, Sequence, Tuple
+
+import discii
+
+from discii.mock import dispatch_frame, guild_payload, message_payload, write_recording
+from discii.replay import ReplayGateway
+
+
+# the first and last event times and the amount of events of a cluster.
+Report = Tuple[float, float, int]
+
+
+def _record(path: str, events: int) -> None:
+    # messages are built against the cached channels of their guild.
+    frames = [dispatch_frame("GUILD_CREATE", 1, guild_payload(1, range(100)))]
+    for index in range(events):
+        message = message_payload(index, index % 100, 1)
+        frames.append(dispatch_frame("MESSAGE_CREATE", index + 2, message))
+    write_recording(path, frames)
+
+
+class _BenchmarkClient(discii.AutoShardedClient):
+    def __init__(self, reports: Any, events: int, **options: Any) -> None:
+        super().__init__(**options)
+        self.reports = reports
+        self.expected = events * len(self.shard_ids or ())
+        self.received = 0
+        self.first = 0.0
+
+    async def on_message_create(self, message: discii.Message) -> None:
+        # wall clock times, so they compare across processes.
+        now = time.time()
+        if not self.received:
+            self.first = now
+
+        self.received += 1
+        if self.received == self.expected:
+            self.reports.put((self.first, now, self.received))
+
+
+def _build_client(
+    gateway_url: str, reports: Any, events: int, **options: Any
+) -> _BenchmarkClient:
+    return _BenchmarkClient(reports, events, gateway_url=gateway_url, **options)
+
+
+def run(
+    gateway_url: str, *, events: int, shards: int, clusters: int, timeout: float
+) -> float:
+    """
+    Runs every shard in ``clusters`` worker processes
+    until each cluster received the whole recording.
+
+    Returns
+    -------
+    events_per_second: :class:`float`
+        The events received by every cluster over the
+        seconds between the first and the last one.
+    """
+    reports = multiprocessing.get_context("spawn").Queue()
+    factory = functools.partial(_build_client, gateway_url, reports, events)
+    # every shard identifies at once, the replay gateway has no rate limit.
+    manager = discii.ClusterManager(
+        factory, "x" * 59, shard_count=shards, clusters=clusters, max_concurrency=shards
+    )
+
+    received: List[Report] = []
+    deadline = time.monotonic() + timeout
+    manager.start()
+    try:
+        while len(received) < len(manager.cluster_shards):
+            if time.monotonic() > deadline:
+                raise TimeoutError("the clusters didn't receive every event in time")
+
+            manager.poll(timeout=0.1)
+            try:
+                while True:
+                    received.append(reports.get_nowait())
+            except queue.Empty:
+                pass
+    finally:
+        manager.stop()
+
+    first = min(report[0] for report in received)
+    last = max(report[1] for report in received)
+    return sum(report[2] for report in received) / (last - first)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmarks events per second against the amount of clusters."
+    )
+    parser.add_argument("--events", type=int, default=20000, help="events per shard")
+    parser.add_argument("--shards", type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        "--clusters", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1]
+    )
+    parser.add_argument("--timeout", type=float, default=300.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "events.bin")
+        _record(path, args.events)
+
+        loop = asyncio.new_event_loop()
+        gateway = ReplayGateway(path, speed=None)
+        gateway_url = loop.run_until_complete(gateway.start())
+        thread = threading.Thread(target=loop.run_forever, daemon=True)
+        thread.start()
+
+        try:
+            clusters: Sequence[int] = sorted(set(args.clusters))
+            for count in clusters:
+                if count > args.shards:
+                    continue
+
+                rate = run(
+                    gateway_url,
+                    events=args.events,
+                    shards=args.shards,
+                    clusters=count,
+                    timeout=args.timeout,
+                )
+                print("{} clusters: {:.0f} events/s".format(count, rate))
+        finally:
+            asyncio.run_coroutine_threadsafe(gateway.stop(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+
+
+if __name__ == "__main__":
+    main()
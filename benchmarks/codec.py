@@ -0,0 +1,123 @@
+"""
+Benchmarks every installed `JSONCodec` decoding and encoding
+``MESSAGE_CREATE`` and ``GUILD_CREATE`` gateway frames.
+
+    python -m benchmarks.codec --rounds 2000
+"""
+import argparse
+import json
+import time
+
+from typing import Any, Callable, Dict, List, Tuple
+
+from discii.codec import JSONCodec
+from discii.mock import dispatch_frame, guild_payload, message_payload
+
+
+CODECS: List[Callable[[], JSONCodec]] = [
+    JSONCodec.stdlib,
+    JSONCodec.orjson,
+    JSONCodec.ujson,
+]
+
+
+# snowflake sized ids, so the numbers look like real ones.
+GUILD_ID = 1000000000000000000
+
+
+def _message_create() -> Dict[str, Any]:
+    data = message_payload(GUILD_ID + 1, GUILD_ID + 100, GUILD_ID)
+    data["content"] = "a representative message, with some unicode: éè ☃"
+    data["member"] = {"roles": [str(GUILD_ID + 2)], "joined_at": "2022-01-01T00:00:00"}
+    data["embeds"] = [
+        {
+            "title": "title",
+            "description": "description " * 20,
+            "fields": [{"name": "name", "value": "value", "inline": True}] * 5,
+        }
+    ]
+    return dispatch_frame("MESSAGE_CREATE", 2, data)
+
+
+def _guild_create(channels: int = 200, members: int = 500) -> Dict[str, Any]:
+    data = guild_payload(GUILD_ID, range(GUILD_ID + 100, GUILD_ID + 100 + channels))
+    data["member_count"] = members
+    data["members"] = [
+        {
+            "user": {
+                "id": str(GUILD_ID + 100000 + index),
+                "username": "member-{}".format(index),
+                "discriminator": "0",
+                "avatar": None,
+            },
+            "roles": [],
+            "joined_at": "2022-01-01T00:00:00+00:00",
+        }
+        for index in range(members)
+    ]
+    return dispatch_frame("GUILD_CREATE", 1, data)
+
+
+PAYLOADS: Dict[str, Callable[[], Dict[str, Any]]] = {
+    "MESSAGE_CREATE": _message_create,
+    "GUILD_CREATE": _guild_create,
+}
+
+
+def _time(function: Callable[[Any], Any], argument: Any, rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        function(argument)
+    return (time.perf_counter() - started) / rounds * 1e6
+
+
+def benchmark_codecs(*, rounds: int = 2000) -> Dict[Tuple[str, str], Tuple[float, float]]:
+    """
+    Decodes and encodes every payload with
+    every installed codec.
+
+    Parameters
+    ----------
+    rounds: :class:`int`
+        The amount of times to decode and
+        encode each payload.
+
+    Returns
+    -------
+    result: :class:`Dict[Tuple[str, str], Tuple[float, float]]`
+        The microseconds to decode and to encode,
+        by codec name and event name.
+    """
+    result: Dict[Tuple[str, str], Tuple[float, float]] = {}
+    for factory in CODECS:
+        try:
+            codec = factory()
+        except ImportError:
+            continue
+
+        for name, payload in PAYLOADS.items():
+            # frames arrive as text, like aiohttp gives them to the gateway.
+            text = json.dumps(payload(), separators=(",", ":"))
+            decoded = codec.loads(text)
+            result[codec.name, name] = (
+                _time(codec.loads, text, rounds),
+                _time(codec.dumps, decoded, rounds),
+            )
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmarks the installed json codecs on gateway payloads."
+    )
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    for (codec, event), (loads, dumps) in benchmark_codecs(rounds=args.rounds).items():
+        print(
+            "{} {}: {:.1f}us decode, {:.1f}us encode".format(codec, event, loads, dumps)
+        )
+
+
+if __name__ == "__main__":
+    main()
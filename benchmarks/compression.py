@@ -0,0 +1,171 @@
+"""
+Benchmarks the gateway connection with and without zlib-stream
+compression. A local `ReplayGateway` plays a recording of
+``GUILD_CREATE`` and ``MESSAGE_CREATE`` events, or one passed
+with ``--recording``, to a client in both modes, reporting the
+bytes received and the CPU time spent decoding every frame.
+
+    python -m benchmarks.compression --guilds 200 --messages 5000
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+import zlib
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from discii import Client
+from discii.gateway import DiscordWebSocket
+from discii.mock import dispatch_frame, guild_payload, message_payload, write_recording
+from discii.replay import ReplayGateway, read_recording
+
+
+def _record(path: str, *, guilds: int, messages: int, channels: int = 100) -> None:
+    frames = []
+    for guild_id in range(guilds):
+        channel_ids = range(guild_id * channels, (guild_id + 1) * channels)
+        frames.append(("GUILD_CREATE", guild_payload(guild_id, channel_ids)))
+    for index in range(messages):
+        guild_id = index % guilds
+        channel_id = guild_id * channels + index % channels
+        frames.append(("MESSAGE_CREATE", message_payload(index, channel_id, guild_id)))
+
+    write_recording(
+        path,
+        [
+            dispatch_frame(name, sequence, data)
+            for sequence, (name, data) in enumerate(frames, 1)
+        ],
+    )
+
+
+def _dispatches(path: str) -> List[bytes]:
+    return [data for _, data in read_recording(path) if json.loads(data)["op"] == 0]
+
+
+async def _receive(path: str, compress: Optional[str], timeout: float) -> float:
+    # plays the whole recording to a client, returning the bytes it received.
+    frames = _dispatches(path)
+    last = max(json.loads(data)["s"] or 0 for data in frames)
+
+    gateway = ReplayGateway(path, speed=None)
+    client = Client(gateway_url=await gateway.start(), compress=compress, metrics=True)
+    await client.login("x" * 59)
+    connect = asyncio.ensure_future(client.connect())
+    try:
+        deadline = time.monotonic() + timeout
+        while getattr(client, "ws", None) is None or client.ws.sequence < last:
+            if time.monotonic() > deadline:
+                raise TimeoutError("the client didn't receive the recording in time")
+            await asyncio.sleep(0.01)
+
+        return client.ws._bytes_received.get()
+    finally:
+        await client.close()
+        await connect
+        await gateway.stop()
+
+
+async def _decode(path: str, compress: Optional[str], rounds: int) -> float:
+    # the seconds of CPU the client spends decoding every frame of the recording.
+    frames = _dispatches(path)
+    client = Client(compress=compress)
+    await client.login("x" * 59)
+
+    try:
+        # never connected, only its decoding is used.
+        ws = DiscordWebSocket(
+            client=client,
+            socket=None,  # type: ignore
+            loop=client.http.loop,
+            cache=client._cache,
+        )
+
+        if compress is None:
+            received: List[Any] = [data.decode("utf-8") for data in frames]
+        else:
+            # compressed like the gateway does, one sync flush per message.
+            deflator = zlib.compressobj()
+            received = [
+                deflator.compress(data) + deflator.flush(zlib.Z_SYNC_FLUSH)
+                for data in frames
+            ]
+
+        loads = ws.codec.loads
+        best = float("inf")
+        for _ in range(rounds):
+            ws._inflator = zlib.decompressobj()
+            started = time.process_time()
+            for data in received:
+                if compress is not None:
+                    data = ws._decompress(data)
+                    assert data is not None
+                loads(data)
+            best = min(best, time.process_time() - started)
+        return best
+    finally:
+        await client.http.close()
+
+
+async def benchmark_compression(
+    path: str, *, rounds: int = 5, timeout: float = 120.0
+) -> Dict[str, Tuple[float, float]]:
+    """
+    Plays a recording to a client with and
+    without zlib-stream compression.
+
+    Parameters
+    ----------
+    path: :class:`str`
+        The recording made by `GatewayRecorder`.
+    rounds: :class:`int`
+        The amount of times to decode the recording,
+        the fastest is kept.
+    timeout: :class:`float`
+        The most seconds a playback can take.
+
+    Returns
+    -------
+    result: :class:`Dict[str, Tuple[float, float]]`
+        The bytes received and the CPU seconds spent
+        decoding, by compression mode.
+    """
+    result: Dict[str, Tuple[float, float]] = {}
+    for compress in Client.COMPRESSION_TYPES:
+        received = await _receive(path, compress, timeout)
+        decode = await _decode(path, compress, rounds)
+        result[compress or "none"] = (received, decode)
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmarks gateway bytes and decoding with and without zlib-stream."
+    )
+    parser.add_argument("--recording", help="a GatewayRecorder recording to play")
+    parser.add_argument("--guilds", type=int, default=200)
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = args.recording
+        if path is None:
+            path = os.path.join(directory, "events.bin")
+            _record(path, guilds=args.guilds, messages=args.messages)
+
+        result = asyncio.run(benchmark_compression(path, rounds=args.rounds))
+
+    for name, (received, decode) in result.items():
+        print(
+            "{}: {:.2f}MiB received, {:.0f}ms decoding".format(
+                name, received / 2**20, decode * 1000
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
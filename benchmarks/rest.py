@@ -0,0 +1,211 @@
+"""
+Benchmarks `HTTPClient` sending or editing messages
+concurrently against a local `MockRESTServer`, reporting
+the requests per second and p50/p99 latencies.
+
+    python -m benchmarks.rest send --requests 1000 --concurrency 50 --latency 0.05
+"""
+import argparse
+import asyncio
+import time
+
+from typing import List, Optional
+
+from discii import Client
+from discii.mock import MockRESTServer
+
+
+WORKLOADS = ("send", "edit")
+
+
+class BenchmarkResult:
+    """
+    Represents the outcome of a `benchmark` run.
+
+    Attributes
+    ----------
+    workload: :class:`str`
+        The workload that was ran.
+    duration: :class:`float`
+        The seconds the run took.
+    latencies: :class:`List[float]`
+        The seconds every successful request took,
+        including rate limit waits and retries.
+    errors: :class:`int`
+        The amount of requests that raised.
+    """
+
+    def __init__(
+        self, workload: str, *, duration: float, latencies: List[float], errors: int
+    ) -> None:
+        self.workload = workload
+        self.duration = duration
+        self.latencies = sorted(latencies)
+        self.errors = errors
+
+    def __str__(self) -> str:
+        return (
+            "{0.workload}: {1} requests, {0.errors} errors in {0.duration:.2f}s, "
+            "{0.rps:.1f} rps, p50 {2:.1f}ms, p99 {3:.1f}ms"
+        ).format(self, len(self.latencies), self.p50 * 1000, self.p99 * 1000)
+
+    @property
+    def rps(self) -> float:
+        """Returns the successful requests per second."""
+        return len(self.latencies) / self.duration if self.duration else 0.0
+
+    def percentile(self, percentile: float) -> float:
+        """
+        Gets a latency percentile.
+
+        Parameters
+        ----------
+        percentile: :class:`float`
+            The percentile between 0 and 100.
+
+        Returns
+        -------
+        latency: :class:`float`
+            The latency in seconds.
+        """
+        if not self.latencies:
+            return 0.0
+        index = int(len(self.latencies) * percentile / 100)
+        return self.latencies[min(index, len(self.latencies) - 1)]
+
+    @property
+    def p50(self) -> float:
+        """Returns the median latency."""
+        return self.percentile(50)
+
+    @property
+    def p99(self) -> float:
+        """Returns the 99th percentile latency."""
+        return self.percentile(99)
+
+
+async def benchmark(
+    workload: str = "send",
+    *,
+    requests: int = 1000,
+    concurrency: int = 50,
+    channels: int = 10,
+    server: Optional[MockRESTServer] = None,
+) -> BenchmarkResult:
+    """
+    Sends or edits messages concurrently through
+    `HTTPClient` against a `MockRESTServer` and
+    measures the throughput and latency.
+
+    Parameters
+    ----------
+    workload: :class:`str`
+        Either ``"send"`` or ``"edit"``.
+    requests: :class:`int`
+        The amount of requests to make.
+    concurrency: :class:`int`
+        The maximum amount of requests in flight.
+    channels: :class:`int`
+        The amount of channels, and so rate limit
+        buckets, the requests are spread across.
+    server: :class:`Optional[MockRESTServer]`
+        The server to benchmark against. Defaults
+        to one with discord's rate limits and no
+        injected latency or errors.
+
+    Returns
+    -------
+    result: :class:`BenchmarkResult`
+        The requests per second and latencies.
+    """
+    if workload not in WORKLOADS:
+        raise ValueError(
+            "workload must be one of {} not ``{}``".format(WORKLOADS, workload)
+        )
+
+    server = server or MockRESTServer()
+    client = Client(api_url=await server.start())
+    await client.login("x" * 59)
+    http = client.http
+
+    try:
+        channel_ids = [await http.create_dm(user_id) for user_id in range(1, channels + 1)]
+        message_ids: List[int] = []
+        if workload == "edit":
+            for channel_id in channel_ids:
+                message = await http.send_message(channel_id, text="0", embeds=None)
+                message_ids.append(message.id)
+
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies: List[float] = []
+        errors = 0
+
+        async def run(index: int) -> None:
+            nonlocal errors
+            channel_id = channel_ids[index % channels]
+
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    if workload == "send":
+                        await http.send_message(channel_id, text=str(index), embeds=None)
+                    else:
+                        await http.edit_message(
+                            channel_id,
+                            message_id=message_ids[index % channels],
+                            text=str(index),
+                            embeds=None,
+                        )
+                except Exception:
+                    errors += 1
+                else:
+                    latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(run(index) for index in range(requests)))
+        duration = time.perf_counter() - started
+    finally:
+        await http.close()
+        await server.stop()
+
+    return BenchmarkResult(workload, duration=duration, latencies=latencies, errors=errors)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmarks HTTPClient against a local mock discord api."
+    )
+    parser.add_argument("workload", choices=WORKLOADS)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--channels", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--server-error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-error-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--no-rate-limit", action="store_true", help="disable the bucket rate limits"
+    )
+    args = parser.parse_args()
+
+    server = MockRESTServer(
+        latency=args.latency,
+        jitter=args.jitter,
+        rate_limit=None if args.no_rate_limit else (5, 5.0),
+        server_error_rate=args.server_error_rate,
+        rate_limit_error_rate=args.rate_limit_error_rate,
+    )
+    result = asyncio.run(
+        benchmark(
+            args.workload,
+            requests=args.requests,
+            concurrency=args.concurrency,
+            channels=args.channels,
+            server=server,
+        )
+    )
+    print(result)
+
+
+if __name__ == "__main__":
+    main()
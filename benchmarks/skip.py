@@ -0,0 +1,165 @@
+"""
+Benchmarks reading a recorded stream made mostly of
+``PRESENCE_UPDATE`` and ``TYPING_START`` events, which the
+client has no handler for, with unhandled frames skipped
+before decoding and with every frame decoded. Only
+``MESSAGE_CREATE`` has a handler.
+
+    python -m benchmarks.skip --events 50000 --messages 0.05
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+
+from aiohttp import WSMessage, WSMsgType
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+from discii import Client, Message
+from discii.codec import JSONCodec
+from discii.gateway import DiscordWebSocket
+from discii.mock import dispatch_frame, guild_payload, message_payload, write_recording
+from discii.replay import read_recording
+
+
+CHANNELS = 100
+
+
+def _presence_update(index: int) -> Dict[str, Any]:
+    return {
+        "user": {"id": str(index)},
+        "guild_id": "1",
+        "status": "online",
+        "activities": [{"name": "a game", "type": 0, "created_at": 1640995200000}],
+        "client_status": {"desktop": "online"},
+    }
+
+
+def _typing_start(index: int) -> Dict[str, Any]:
+    return {
+        "channel_id": str(index % CHANNELS),
+        "guild_id": "1",
+        "user_id": str(index),
+        "timestamp": 1640995200,
+        "member": {"user": {"id": str(index), "username": "user"}, "roles": []},
+    }
+
+
+def _record(path: str, *, events: int, messages: float) -> None:
+    frames = [("GUILD_CREATE", guild_payload(1, range(CHANNELS)))]
+    for index in range(events):
+        if random.random() < messages:
+            frames.append(("MESSAGE_CREATE", message_payload(index, index % CHANNELS, 1)))
+        elif index % 2:
+            frames.append(("PRESENCE_UPDATE", _presence_update(index)))
+        else:
+            frames.append(("TYPING_START", _typing_start(index)))
+
+    write_recording(
+        path,
+        [
+            dispatch_frame(name, sequence, data)
+            for sequence, (name, data) in enumerate(frames, 1)
+        ],
+    )
+
+
+class _RecordedSocket:
+    # plays recorded frames to `DiscordWebSocket._receive` in place of a connection.
+    def __init__(self, frames: List[str]) -> None:
+        self.frames = frames
+
+    def __aiter__(self) -> AsyncIterator[WSMessage]:
+        return self._iterate()
+
+    async def _iterate(self) -> AsyncIterator[WSMessage]:
+        for data in self.frames:
+            yield WSMessage(WSMsgType.TEXT, data, None)
+
+
+class _BenchmarkClient(Client):
+    async def on_message_create(self, message: Message) -> None:
+        pass
+
+
+async def _read(frames: List[str], *, skip: bool) -> Tuple[float, int, int]:
+    client = _BenchmarkClient()
+    await client.login("x" * 59)
+    decodes = 0
+
+    def loads(data: Any) -> Any:
+        nonlocal decodes
+        decodes += 1
+        return json.loads(data)
+
+    try:
+        ws = DiscordWebSocket(
+            client=client,
+            socket=_RecordedSocket(frames),  # type: ignore
+            loop=client.http.loop,
+            cache=client._cache,
+        )
+        ws.state = client._state
+        ws.codec = JSONCodec("json", loads=loads, dumps=json.dumps)
+        if not skip:
+            ws._skip_frame = lambda data: False  # type: ignore
+
+        started = time.perf_counter()
+        await ws._receive()
+        elapsed = time.perf_counter() - started
+        return elapsed, decodes, ws.sequence
+    finally:
+        await client.http.close()
+
+
+async def benchmark_skip(path: str) -> Dict[str, Tuple[float, int, int]]:
+    """
+    Reads a recording with and without
+    skipping unhandled frames.
+
+    Parameters
+    ----------
+    path: :class:`str`
+        The recording made by `GatewayRecorder`.
+
+    Returns
+    -------
+    result: :class:`Dict[str, Tuple[float, int, int]]`
+        The seconds taken, the frames decoded and
+        the last sequence seen, by mode.
+    """
+    frames = [data.decode("utf-8") for _, data in read_recording(path)]
+    return {
+        "skip": await _read(frames, skip=True),
+        "no skip": await _read(frames, skip=False),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmarks skipping unhandled frames before decoding them."
+    )
+    parser.add_argument("--events", type=int, default=50000)
+    parser.add_argument(
+        "--messages", type=float, default=0.05, help="the share of MESSAGE_CREATE"
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "events.bin")
+        _record(path, events=args.events, messages=args.messages)
+        result = asyncio.run(benchmark_skip(path))
+
+    for name, (elapsed, decodes, sequence) in result.items():
+        print(
+            "{}: {:.0f}ms, {} frames decoded, sequence {}".format(
+                name, elapsed * 1000, decodes, sequence
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
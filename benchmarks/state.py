@@ -0,0 +1,100 @@
+"""
+Benchmarks the memory allocated while parsing ``MESSAGE_CREATE``
+events that are then kept, like the message cache does, with
+the client's single shared `ClientState` and with a fresh state
+built for every event, with and without ``__slots__``.
+
+    python -m benchmarks.state --events 100000
+"""
+import argparse
+import asyncio
+import tracemalloc
+
+from typing import Any, Callable, Dict, List, Tuple
+
+from discii import Client
+from discii.guild import Guild
+from discii.mock import guild_payload, message_payload
+from discii.state import ClientState
+
+
+CHANNELS = 100
+
+
+class _UnslottedState(ClientState):
+    # subclassing without ``__slots__`` gives every state a ``__dict__`` again.
+    pass
+
+
+def _measure(client: Client, payloads: List[Dict[str, Any]]) -> Tuple[int, int]:
+    tracemalloc.start()
+    try:
+        parsed = [client._parse_event_data("MESSAGE_CREATE", data) for data in payloads]
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    del parsed
+    return current, peak
+
+
+async def benchmark_state(*, events: int = 100000) -> Dict[str, Tuple[int, int]]:
+    """
+    Parses ``events`` synthetic ``MESSAGE_CREATE``
+    events once for every way of getting a state.
+
+    Parameters
+    ----------
+    events: :class:`int`
+        The amount of events to parse.
+
+    Returns
+    -------
+    result: :class:`Dict[str, Tuple[int, int]]`
+        The bytes still allocated after parsing, and
+        the peak bytes allocated, by each mode.
+    """
+    client = Client()
+    await client.login("x" * 59)
+    shared = client._state
+    guild = guild_payload(1, range(CHANNELS))
+    client._cache.add_guild(Guild(payload=guild, state=shared))
+    payloads = [message_payload(index, index % CHANNELS, 1) for index in range(events)]
+
+    def fresh(state: Callable[..., ClientState]) -> Callable[[], ClientState]:
+        return lambda: state(client, http=client.http, cache=client._cache)
+
+    modes: Dict[str, Callable[[], ClientState]] = {
+        "shared": lambda: shared,
+        "per event": fresh(ClientState),
+        "per event, no slots": fresh(_UnslottedState),
+    }
+
+    result: Dict[str, Tuple[int, int]] = {}
+    try:
+        for name, get_state in modes.items():
+            client._get_state = get_state  # type: ignore
+            result[name] = _measure(client, payloads)
+    finally:
+        await client.http.close()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmarks the memory of a shared state against one per event."
+    )
+    parser.add_argument("--events", type=int, default=100000)
+    args = parser.parse_args()
+
+    result = asyncio.run(benchmark_state(events=args.events))
+    for name, (current, peak) in result.items():
+        print(
+            "{}: {:.1f}MiB kept, {:.1f}MiB peak".format(
+                name, current / 2**20, peak / 2**20
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
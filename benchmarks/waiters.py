@@ -0,0 +1,107 @@
+"""
+Benchmarks dispatching ``MESSAGE_CREATE`` events to thousands
+of pending `Client.wait_for` calls, with the waiters indexed
+by channel and with the channel only checked in their predicates.
+
+    python -m benchmarks.waiters --waiters 10000 --events 10000 --channels 1000
+"""
+import argparse
+import asyncio
+import time
+
+from typing import Dict
+
+from discii import Client
+from discii.mock import message_payload
+
+
+async def benchmark_waiters(
+    *, waiters: int = 10000, events: int = 10000, channels: int = 1000
+) -> Dict[str, float]:
+    """
+    Dispatches ``MESSAGE_CREATE`` events to thousands
+    of concurrent `Client.wait_for` calls that stay
+    pending, once with the waiters indexed by channel
+    and once with the channel only checked in their
+    predicates.
+
+    Parameters
+    ----------
+    waiters: :class:`int`
+        The amount of waiters pending at once.
+    events: :class:`int`
+        The amount of events to dispatch.
+    channels: :class:`int`
+        The amount of channels the waiters
+        and events are spread across.
+
+    Returns
+    -------
+    result: :class:`Dict[str, float]`
+        The microseconds per dispatched event
+        of both runs.
+    """
+    client = Client()
+    await client.login("x" * 59)
+
+    result: Dict[str, float] = {}
+    try:
+        for name, indexed in (("indexed", True), ("unindexed", False)):
+            tasks = []
+            for index in range(waiters):
+                channel_id = index % channels
+                if indexed:
+                    coro = client.wait_for(
+                        "MESSAGE_CREATE",
+                        raw=True,
+                        timeout=60,
+                        check=lambda data: data["content"] == "stop",
+                        channel_id=channel_id,
+                    )
+                else:
+                    coro = client.wait_for(
+                        "MESSAGE_CREATE",
+                        raw=True,
+                        timeout=60,
+                        check=lambda data, c=str(channel_id): (
+                            data["channel_id"] == c and data["content"] == "stop"
+                        ),
+                    )
+                tasks.append(asyncio.ensure_future(coro))
+            await asyncio.sleep(0)
+
+            started = time.perf_counter()
+            for index in range(events):
+                await client.dispatch(
+                    "MESSAGE_CREATE", message_payload(index, index % channels)
+                )
+            result[name] = (time.perf_counter() - started) / events * 1e6
+
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+    finally:
+        await client.close()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmarks dispatching events to pending wait_for calls."
+    )
+    parser.add_argument("--waiters", type=int, default=10000)
+    parser.add_argument("--events", type=int, default=10000)
+    parser.add_argument("--channels", type=int, default=1000)
+    args = parser.parse_args()
+
+    timings = asyncio.run(
+        benchmark_waiters(
+            waiters=args.waiters, events=args.events, channels=args.channels
+        )
+    )
+    for name, micros in timings.items():
+        print("{}: {:.1f}us per event".format(name, micros))
+
+
+if __name__ == "__main__":
+    main()
@@ -5,7 +5,12 @@ __license__ = "MIT"
 
 from .channel import GuildCategory, ChannelType, DMChannel, TextChannel, VoiceChannel
 from .client import Client
+from .cluster import ClusterClient, ClusterManager
+from .codec import JSONCodec
+from .dispatcher import Dispatcher
 from .embed import Embed
+from .executor import EventSnapshot, HandlerExecutor
+from .filters import EventFilter
 from .errors import (
     DisciiException,
     InvalidBotToken,
@@ -13,6 +18,15 @@ from .errors import (
     SnowflakeNotFound,
     UserNotFound,
     ChannelNotFound,
+    HTTPException,
+    GatewayException,
 )
+from .flags import Intents
 from .message import Message
+from .metrics import Counter, Gauge, Histogram, MetricsRegistry
+from .profiler import HandlerStats, Profiler, ProfilerHooks
+from .replay import GatewayRecorder, ReplayGateway, read_recording
+from .shard import AutoShardedClient
+from .stats import LatencyHistogram
 from .user import Member, User
+from .waiters import EventWaiters
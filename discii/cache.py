@@ -1,8 +1,9 @@
 import collections
+import itertools
 
-from typing import Dict, Deque, List, Optional, Union, TYPE_CHECKING
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union, TYPE_CHECKING
 
-from .channel import TextChannel, DMChannel, GuildCategory, VoiceChannel
+from .channel import Channel, TextChannel, DMChannel, GuildCategory, VoiceChannel
 from .errors import ChannelNotFound, UserNotFound
 from .guild import Guild
 from .user import User
@@ -18,10 +19,26 @@ __all__ = (
 # fmt: on
 
 
+# a message, or its raw payload until it is first looked up.
+CachedMessage = Union["Message", Dict[str, Any]]
+
+
 class Cache:
     """
     The class that holds all the cached data.
 
+    Parameters
+    ----------
+    max_messages: :class:`Optional[int]`
+        The maximum amount of messages to keep
+        in the cache. ``None`` means unbounded
+        and ``0`` disables the message cache.
+    message_eviction: :class:`str`
+        The order messages are evicted in once
+        ``max_messages`` is reached. Either
+        ``"fifo"`` (oldest first) or ``"lru"``
+        (least recently looked up first).
+
     Attributes
     ----------
     user: :class:`Optional[User]`
@@ -32,19 +49,60 @@ class Cache:
         A dictionary of all users where the
         key is the user id. Can be easily
         conerted to a Member object.
-    _guilds: :class:`List[Guild]`
-        The list of guilds that the bot is in.
-    _messages: :class:`Deque["Message"]`
-        A `collections.deque` of message objects
-        to optimize speed-time access.
+    _guilds: :class:`Dict[int, Guild]`
+        A dictionary of the guilds that the bot
+        is in where the key is the guild id.
+    _channels: :class:`Dict[int, Channel]`
+        A dictionary of the channels across all
+        guilds where the key is the channel id.
+    _dm_channels: :class:`Dict[int, DMChannel]`
+        A dictionary of the dm channels where
+        the key is the channel id.
+    _user_dm_channels: :class:`Dict[int, DMChannel]`
+        A dictionary of the dm channels where
+        the key is the recipient's user id.
+    message_factory: :class:`Optional[Callable[..., Message]]`
+        Builds a message from its raw payload,
+        set by the client once logged in.
+    _messages: :class:`OrderedDict[int, Union[Message, Dict[str, Any]]]`
+        An ordered dictionary of messages, or their
+        raw payloads until first looked up, where
+        the key is the message id, ordered from the
+        next message to evict onwards.
+    _channel_messages: :class:`Dict[int, OrderedDict[int, CachedMessage]]`
+        The cached messages, or their raw payloads,
+        of every channel where the key is the channel
+        id, ordered from oldest to newest.
     """
 
-    def __init__(self) -> None:
+    MESSAGE_EVICTION_POLICIES = ("fifo", "lru")
+
+    def __init__(
+        self, *, max_messages: Optional[int] = 1000, message_eviction: str = "fifo"
+    ) -> None:
+        if message_eviction not in self.MESSAGE_EVICTION_POLICIES:
+            raise ValueError(
+                "message_eviction must be one of {} not ``{}``".format(
+                    self.MESSAGE_EVICTION_POLICIES, message_eviction
+                )
+            )
+
+        self.max_messages = max_messages
+        self.message_eviction = message_eviction
+        self.message_factory: Optional[Callable[..., "Message"]] = None
+
         self.user: Optional[User] = None
         self._users: Dict[int, User] = {}
-        self._guilds: List[Guild] = []
-        self._dm_channels: List[DMChannel] = []
-        self._messages: Deque["Message"] = collections.deque()
+        self._guilds: Dict[int, Guild] = {}
+        self._channels: Dict[int, Channel] = {}
+        self._dm_channels: Dict[int, DMChannel] = {}
+        self._user_dm_channels: Dict[int, DMChannel] = {}
+        self._messages: "collections.OrderedDict[int, CachedMessage]" = (
+            collections.OrderedDict()
+        )
+        self._channel_messages: Dict[
+            int, "collections.OrderedDict[int, CachedMessage]"
+        ] = {}
 
     def set_bot_user(self, user: User) -> None:
         """
@@ -66,18 +124,107 @@ class Cache:
         guild: :class:`Guild`
             The guild to add to the cache.
         """
-        self._guilds.append(guild)
+        self._guilds[guild.id] = guild
+        self._channels.update(guild._channels)
 
-    def add_message(self, message: "Message") -> None:
+    def add_channel(self, channel: Channel) -> None:
         """
-        Adds a message to the internal guild cache.
+        Adds a channel to the internal channel cache.
 
         Parameters
         ----------
-        message: :class:`Message`
-            The message to add to the cache.
+        channel: :class:`Channel`
+            The channel to add to the cache.
+        """
+        if isinstance(channel, DMChannel):
+            return self.add_dm_channel(channel)
+
+        guild = channel.guild
+        if guild.get_channel(channel.id) is None:
+            guild.channels.append(channel)
+        guild._channels[channel.id] = channel
+        self._channels[channel.id] = channel
+
+    @staticmethod
+    def _message_ids(message: CachedMessage) -> Tuple[int, int]:
+        if isinstance(message, dict):
+            return int(message["id"]), int(message["channel_id"])
+        return message.id, message.channel.id
+
+    def _build_message(self, message: CachedMessage) -> "Message":
+        if not isinstance(message, dict):
+            return message
+
+        assert self.message_factory is not None
+        built = self.message_factory(payload=message)
+        # replace the payload in place, keeping its eviction and channel order.
+        if built.id in self._messages:
+            self._messages[built.id] = built
+        channel_messages = self._channel_messages.get(built.channel.id)
+        if channel_messages is not None and built.id in channel_messages:
+            channel_messages[built.id] = built
+        return built
+
+    def add_message(self, message: CachedMessage) -> None:
+        """
+        Adds a message to the internal message cache,
+        evicting messages if the cache is full.
+
+        Parameters
+        ----------
+        message: :class:`Union[Message, Dict[str, Any]]`
+            The message to add to the cache, or its raw
+            payload to only build it once looked up.
+        """
+        if self.max_messages == 0:
+            return
+
+        message_id, channel_id = self._message_ids(message)
+        self._messages[message_id] = message
+        self._messages.move_to_end(message_id)
+
+        channel_messages = self._channel_messages.setdefault(
+            channel_id, collections.OrderedDict()
+        )
+        channel_messages[message_id] = message
+
+        if self.max_messages is not None:
+            while len(self._messages) > self.max_messages:
+                _, evicted = self._messages.popitem(last=False)
+                self._remove_channel_message(evicted)
+
+    def _remove_channel_message(self, message: CachedMessage) -> None:
+        message_id, channel_id = self._message_ids(message)
+        channel_messages = self._channel_messages.get(channel_id)
+        if channel_messages is None:
+            return
+
+        channel_messages.pop(message_id, None)
+        if not channel_messages:
+            del self._channel_messages[channel_id]
+
+    def remove_message(self, message_id: int) -> Optional[CachedMessage]:
+        """
+        Removes a message from the internal message cache.
+
+        Parameters
+        ----------
+        message_id: :class:`int`
+            The id of the message to remove.
+
+        Returns
+        -------
+        message: :class:`Optional[CachedMessage]`
+            The removed message if found, else `None`.
+            A message that was never looked up is
+            returned as its raw payload.
         """
-        self._messages.append(message)
+        message = self._messages.pop(message_id, None)
+        if message is None:
+            return None
+
+        self._remove_channel_message(message)
+        return message
 
     def add_user(self, user: User) -> None:
 
@@ -100,7 +247,8 @@ class Cache:
         channel: :class:`DMChannel`
             The dm channel to add to the cache.
         """
-        self._dm_channels.append(channel)
+        self._dm_channels[channel.id] = channel
+        self._user_dm_channels[channel.user.id] = channel
 
     def get_message(self, message_id: int) -> Optional["Message"]:
         """
@@ -116,8 +264,41 @@ class Cache:
         message: :class:`Message`
             The message if found, else `None`
         """
-        message = list(filter(lambda m: m.id == message_id, self._messages))
-        return message[0] if message else None
+        message = self._messages.get(message_id)
+        if message is None:
+            return None
+
+        if self.message_eviction == "lru":
+            self._messages.move_to_end(message_id)
+        return self._build_message(message)
+
+    def get_channel_messages(
+        self, channel_id: int, *, limit: Optional[int] = None
+    ) -> List["Message"]:
+        """
+        Gets the most recent cached messages
+        sent in a channel.
+
+        Parameters
+        ----------
+        channel_id: :class:`int`
+            The channel id to get the messages of.
+        limit: :class:`Optional[int]`
+            The maximum amount of messages to
+            return. ``None`` returns all of them.
+
+        Returns
+        -------
+        messages: :class:`List[Message]`
+            The messages, ordered from oldest to newest.
+        """
+        channel_messages = self._channel_messages.get(channel_id)
+        if not channel_messages:
+            return []
+
+        messages = list(itertools.islice(reversed(channel_messages.values()), limit))
+        messages.reverse()
+        return [self._build_message(message) for message in messages]
 
     def get_guild(self, guild_id: int) -> Optional[Guild]:
         """
@@ -133,8 +314,7 @@ class Cache:
         guild: :class:`Guild`
             The guild if found, else None
         """
-        guild = list(filter(lambda g: g.id == guild_id, self._guilds))
-        return guild[0] if guild else None
+        return self._guilds.get(guild_id)
 
     def get_channel(
         self, channel_id: int
@@ -152,16 +332,29 @@ class Cache:
         channel: :class:`TextChannel`
             The channel if found, else `None`
         """
-        for guild in self._guilds:
-            channel = guild.get_channel(channel_id)
-            if channel is not None:
-                return channel
-
-        dm_channel = list(filter(lambda d: d.id == channel_id, self._dm_channels))
-        if dm_channel:
-            return dm_channel[0]
+        if channel_id in self._channels:
+            return self._channels[channel_id]
+        if channel_id in self._dm_channels:
+            return self._dm_channels[channel_id]
         raise ChannelNotFound("Channel with id ``{}`` not found".format(channel_id))
 
+    def get_user_dm_channel(self, user_id: int) -> Optional[DMChannel]:
+        """
+        Searches the internal cache for the dm
+        channel with a user.
+
+        Parameters
+        ----------
+        user_id: :class:`int`
+            The id of the user the dm is with.
+
+        Returns
+        -------
+        channel: :class:`DMChannel`
+            The dm channel if found, else `None`
+        """
+        return self._user_dm_channels.get(user_id)
+
     def get_user(self, user_id: int) -> User:
         """
         Searches the internal cache for a user.
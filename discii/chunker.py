@@ -0,0 +1,322 @@
+import asyncio
+import collections
+import itertools
+
+from typing import Any, Deque, Dict, List, Optional, Sequence, Set, Tuple, TYPE_CHECKING
+
+from .errors import GatewayException
+from .user import User
+
+if TYPE_CHECKING:
+    from .gateway import DiscordWebSocket
+
+
+# fmt: off
+__all__ = (
+    'MemberChunker',
+)
+# fmt: on
+
+
+def _retrieve(future: "asyncio.Future[Any]") -> None:
+    # guilds are chunked without anyone awaiting them, so failures aren't logged.
+    if not future.cancelled():
+        future.exception()
+
+
+class _ChunkRequest:
+    __slots__ = ("guild_id", "received", "chunk_count", "timeout")
+
+    def __init__(self, guild_id: int) -> None:
+        self.guild_id = guild_id
+        self.received: Set[int] = set()
+        self.chunk_count: Optional[int] = None
+        self.timeout: Optional[asyncio.TimerHandle] = None
+
+
+class MemberChunker:
+    """
+    Requests the members of guilds over one gateway
+    connection, one guild per REQUEST_MEMBERS as
+    discord takes a single guild id, and tracks the
+    chunks discord answers with until every guild
+    has been fully chunked.
+
+    Parameters
+    ----------
+    ws: :class:`DiscordWebSocket`
+        The connection to send the requests through.
+
+    Attributes
+    ----------
+    chunked: :class:`Set[int]`
+        The ids of the guilds that have
+        been fully chunked.
+    idle: :class:`asyncio.Event`
+        Set while no guild is waiting to be
+        or being chunked.
+    MAX_IN_FLIGHT: :class:`int`
+        The maximum amount of requests being
+        answered at once, which spreads out the
+        memory used while starting up.
+    REQUEST_TIMEOUT: :class:`float`
+        The seconds to wait for the next chunk
+        of a request before failing its guild
+        and freeing its slot.
+    """
+
+    MAX_IN_FLIGHT = 2
+    REQUEST_TIMEOUT = 30.0
+
+    def __init__(self, ws: "DiscordWebSocket") -> None:
+        self.ws = ws
+        self.chunked: Set[int] = set()
+        self.idle = asyncio.Event()
+        self.idle.set()
+
+        self._nonces = itertools.count()
+        self._queue: Deque[int] = collections.deque()
+        self._requests: Dict[str, _ChunkRequest] = {}
+        self._members: Dict[int, List[User]] = {}
+        self._futures: Dict[int, "asyncio.Future[List[User]]"] = {}
+        self._queries: Dict[str, Tuple[List[User], "asyncio.Future[List[User]]"]] = {}
+        self._slots = asyncio.Semaphore(self.MAX_IN_FLIGHT)
+        self._runner: Optional["asyncio.Task[None]"] = None
+
+    def request(self, guild_id: int) -> "asyncio.Future[List[User]]":
+        """
+        Queues a guild to be chunked, unless
+        it already is being.
+
+        Parameters
+        ----------
+        guild_id: :class:`int`
+            The guild's id.
+
+        Returns
+        -------
+        future: :class:`asyncio.Future[List[User]]`
+            Resolves with the guild's members once
+            it has been fully chunked, or raises
+            `asyncio.TimeoutError` if discord stopped
+            answering and `GatewayException` if the
+            connection closed first.
+        """
+        future = self._futures.get(guild_id)
+        if future is not None:
+            return future
+
+        future = self.ws.loop.create_future()
+        future.add_done_callback(_retrieve)
+        self._futures[guild_id] = future
+        self._queue.append(guild_id)
+        self.chunked.discard(guild_id)
+        self.idle.clear()
+
+        if self._runner is None or self._runner.done():
+            self._runner = self.ws.loop.create_task(self._run())
+        return future
+
+    async def chunk(self, guild_id: int) -> List[User]:
+        """
+        Chunks a guild and waits until
+        every chunk has been received.
+
+        Parameters
+        ----------
+        guild_id: :class:`int`
+            The guild's id.
+
+        Returns
+        -------
+        members: :class:`List[User]`
+            The guild's members.
+        """
+        return await asyncio.shield(self.request(guild_id))
+
+    async def query(
+        self,
+        guild_id: int,
+        *,
+        query: Optional[str] = None,
+        limit: int = 5,
+        user_ids: Optional[Sequence[int]] = None,
+        timeout: Optional[float] = 30.0,
+    ) -> List[User]:
+        """
+        Searches a guild's members by username
+        prefix or id, without chunking the guild.
+
+        Parameters
+        ----------
+        guild_id: :class:`int`
+            The guild's id.
+        query: :class:`Optional[str]`
+            The username prefix to search for.
+        limit: :class:`int`
+            The maximum amount of members to return,
+            between 1 and 100.
+        user_ids: :class:`Optional[Sequence[int]]`
+            The ids of the members to get, up to 100.
+        timeout: :class:`Optional[float]`
+            The seconds to wait for the answer.
+
+        Returns
+        -------
+        members: :class:`List[User]`
+            The members found.
+
+        Raises
+        ------
+        asyncio.TimeoutError
+            Discord didn't answer in time.
+        """
+        if (query is None) == (user_ids is None):
+            raise ValueError("Exactly one of query and user_ids must be passed.")
+        if not 1 <= limit <= 100:
+            raise ValueError("limit must be between 1 and 100 not ``{}``".format(limit))
+        if user_ids is not None and not 1 <= len(user_ids) <= 100:
+            raise ValueError("user_ids must contain between 1 and 100 ids.")
+
+        payload: Dict[str, Any] = {"guild_id": guild_id, "nonce": str(next(self._nonces))}
+        if query is not None:
+            payload["query"] = query
+            payload["limit"] = limit
+        else:
+            payload["user_ids"] = list(user_ids)  # type: ignore
+
+        future = self.ws.loop.create_future()
+        self._queries[payload["nonce"]] = ([], future)
+        try:
+            await self.ws.send({"op": self.ws.REQUEST_MEMBERS, "d": payload})
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self._queries.pop(payload["nonce"], None)
+
+    async def _run(self) -> None:
+        while self._queue:
+            await self._slots.acquire()
+            if not self._queue:
+                self._slots.release()
+                continue
+
+            guild_id = self._queue.popleft()
+            nonce = str(next(self._nonces))
+            request = self._requests[nonce] = _ChunkRequest(guild_id)
+            self._schedule_timeout(nonce, request)
+            await self.ws.send(
+                {
+                    "op": self.ws.REQUEST_MEMBERS,
+                    "d": {"guild_id": guild_id, "query": "", "limit": 0, "nonce": nonce},
+                }
+            )
+
+    def _schedule_timeout(self, nonce: str, request: _ChunkRequest) -> None:
+        if request.timeout is not None:
+            request.timeout.cancel()
+        request.timeout = self.ws.loop.call_later(
+            self.REQUEST_TIMEOUT, self._expire_request, nonce
+        )
+
+    def _expire_request(self, nonce: str) -> None:
+        guild_id = self._requests[nonce].guild_id
+        self._finish_request(nonce)
+        self._fail_guild(
+            guild_id, asyncio.TimeoutError("guild ``{}`` wasn't chunked".format(guild_id))
+        )
+
+    def _finish_guild(self, guild_id: int) -> None:
+        members = self._members.pop(guild_id, [])
+        future = self._futures.pop(guild_id, None)
+        if future is not None and not future.done():
+            future.set_result(members)
+        self.chunked.add(guild_id)
+
+    def _fail_guild(self, guild_id: int, error: Exception) -> None:
+        self._members.pop(guild_id, None)
+        future = self._futures.pop(guild_id, None)
+        if future is not None and not future.done():
+            future.set_exception(error)
+
+    def _finish_request(self, nonce: str) -> None:
+        request = self._requests.pop(nonce)
+        if request.timeout is not None:
+            request.timeout.cancel()
+        self._slots.release()
+        if not self._queue and not self._requests:
+            self.idle.set()
+
+    def receive(self, data: Dict[str, Any]) -> None:
+        """
+        Handles a GUILD_MEMBERS_CHUNK, caching
+        its members.
+
+        Parameters
+        ----------
+        data: :class:`Dict[str, Any]`
+            The event data.
+        """
+        guild_id = int(data["guild_id"])
+        members = [
+            User(payload=member["user"], state=self.ws.state) for member in data["members"]
+        ]
+        for user in members:
+            self.ws.cache.add_user(user)
+
+        query = self._queries.get(data.get("nonce"))  # type: ignore
+        if query is not None:
+            found, future = query
+            found.extend(members)
+            if data["chunk_index"] + 1 >= data["chunk_count"] and not future.done():
+                future.set_result(found)
+            return
+
+        nonce = data.get("nonce")
+        request = self._requests.get(nonce)  # type: ignore
+        if request is None or request.guild_id != guild_id:
+            return
+
+        self._members.setdefault(guild_id, []).extend(members)
+        chunk_count = request.chunk_count = data["chunk_count"]
+        request.received.add(data["chunk_index"])
+
+        if len(request.received) >= chunk_count:
+            self._finish_request(nonce)  # type: ignore
+            self._finish_guild(guild_id)
+        else:
+            self._schedule_timeout(nonce, request)  # type: ignore
+
+    def reset(self) -> None:
+        """
+        Queues the guilds being chunked again,
+        as their chunks won't arrive once the
+        session has been invalidated.
+        """
+        for nonce, request in list(self._requests.items()):
+            self._members.pop(request.guild_id, None)
+            self._queue.appendleft(request.guild_id)
+            self._finish_request(nonce)
+
+        if self._queue:
+            self.idle.clear()
+            if self._runner is None or self._runner.done():
+                self._runner = self.ws.loop.create_task(self._run())
+
+    def stop(self) -> None:
+        """
+        Stops sending the queued requests and
+        fails every guild waiting to be chunked.
+        """
+        if self._runner is not None and not self._runner.done():
+            self._runner.cancel()
+        self._runner = None
+
+        for nonce in list(self._requests):
+            self._finish_request(nonce)
+        self._queue.clear()
+        for guild_id in list(self._futures):
+            error = GatewayException(
+                "The connection closed before guild ``{}`` was chunked".format(guild_id)
+            )
+            self._fail_guild(guild_id, error)
+        self.idle.set()
@@ -1,22 +1,45 @@
 import asyncio
+import collections
+import functools
 import sys
 import traceback
 
 from aiohttp import ClientSession
-from typing import Any, Dict, List, Optional, TypeVar, Callable, Coroutine, TYPE_CHECKING
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+    Callable,
+    Coroutine,
+    TYPE_CHECKING,
+)
 
 
 from .cache import Cache
+from .codec import JSONCodec
 from .converters import _event_to_object
+from .dispatcher import Dispatcher
+from .executor import HandlerExecutor
+from .filters import EventFilter
+from .flags import Intents
 from .errors import ChannelNotFound, InvalidBotToken, InvalidFunction, UserNotFound
 from .gateway import DiscordWebSocket
 from .http import HTTPClient
+from .message import Message
+from .metrics import MetricsRegistry
+from .profiler import Profiler
 from .state import ClientState
+from .stats import LatencyHistogram
+from .waiters import EventWaiters
 
 if TYPE_CHECKING:
     from .channel import Channel
     from .guild import Guild
-    from .message import Message
+    from .replay import GatewayRecorder
     from .user import User
 
 
@@ -28,6 +51,8 @@ __all__ = (
 
 
 Coro = TypeVar("Coro", bound=Callable[..., Coroutine[Any, Any, Any]])
+# a registered handler, its filter and whether it takes the raw data.
+EventHandler = Tuple[Callable[..., Coroutine[Any, Any, Any]], Optional[EventFilter], bool]
 
 
 class Client:
@@ -35,6 +60,69 @@ class Client:
     Represents a Client that interacts with
     the discord api and manages websocket connections.
 
+    Parameters
+    ----------
+    max_messages: :class:`Optional[int]`
+        The maximum amount of messages to cache.
+        ``None`` means unbounded and ``0`` disables
+        the message cache. Defaults to 1000.
+    message_eviction: :class:`str`
+        The order cached messages are evicted in,
+        either ``"fifo"`` or ``"lru"``.
+    compress: :class:`Optional[str]`
+        The gateway transport compression to use.
+        Either ``None`` or ``"zlib-stream"``.
+    codec: :class:`Optional[JSONCodec]`
+        The json codec to encode and decode every
+        payload with. Defaults to the fastest one
+        installed, see `JSONCodec.default`.
+    intents: :class:`Union[Intents, str, None]`
+        The gateway intents to identify with. ``"auto"``
+        works out the minimal intents from the registered
+        events when connecting. Defaults to `Intents.default`.
+    gateway_url: :class:`Optional[str]`
+        The gateway to connect to instead of discord's,
+        for example a `ReplayGateway`.
+    recorder: :class:`Optional[GatewayRecorder]`
+        Records every gateway message received so
+        the session can be replayed offline.
+    api_url: :class:`Optional[str]`
+        The api to send requests to instead of
+        discord's, for example a `MockRESTServer`.
+    chunk_guilds: :class:`bool`
+        Whether or not to download every member of
+        every guild when it becomes available. When
+        disabled use `Guild.chunk` or `Guild.query_members`.
+    max_in_flight: :class:`Optional[int]`
+        The maximum amount of event handlers running
+        at once, ``None`` means unbounded. Defaults to 1000.
+    event_concurrency: :class:`Optional[Dict[str, int]]`
+        The maximum amount of handlers running at
+        once per event name.
+    max_queued: :class:`int`
+        The maximum amount of handlers waiting to run.
+    overflow_policy: :class:`str`
+        What to do when too many handlers are waiting,
+        either ``"block"``, ``"drop_oldest"`` or
+        ``"drop_new"``. See `Dispatcher`.
+    executor_workers: :class:`Optional[int]`
+        The amount of workers of the thread and process
+        pools that ``executor`` handlers run on.
+    profile: :class:`bool`
+        Whether or not to time every handler and watch
+        for the loop being held, see `Profiler`.
+    stall_threshold: :class:`float`
+        The seconds a handler can hold the loop
+        for before the profiler flags it.
+    metrics: :class:`bool`
+        Whether or not to record the gateway, http,
+        cache and dispatch metrics. Disabled metrics
+        do nothing. See `MetricsRegistry`.
+    metrics_port: :class:`Optional[int]`
+        The local port to serve the metrics on for
+        prometheus to scrape once logged in, at
+        ``http://127.0.0.1:<port>/metrics``.
+
     Attributes
     ----------
     loop: :class:`AbstractEventLoop`
@@ -46,15 +134,101 @@ class Client:
     ws: :class:`DiscordWebSocket`
         The websocket to manage the gateway with
         the discord api.
+    shard_count: :class:`Optional[int]`
+        The amount of shards the bot is split
+        into, ``None`` if it isn't sharded.
+    heartbeat_latencies: :class:`LatencyHistogram`
+        The round trip of the most recent heartbeats
+        of every connection, in seconds.
+    dispatcher: :class:`Dispatcher`
+        Runs the event handlers and holds
+        the queue and handler metrics.
+    executor: :class:`HandlerExecutor`
+        The pools that ``executor`` handlers run on.
+    profiler: :class:`Optional[Profiler]`
+        The handler profiler if ``profile``
+        was passed, else None.
+    metrics: :class:`MetricsRegistry`
+        The registry of the client's metrics.
+    waiters: :class:`EventWaiters`
+        The pending `Client.wait_for` calls.
+    dropped_events: :class:`collections.Counter[str]`
+        A debug counter of the events received
+        that no handler or cache consumer wanted,
+        where the key is the event name.
     """
 
-    def __init__(self) -> None:
+    COMPRESSION_TYPES = (None, "zlib-stream")
+    HEARTBEAT_SAMPLES = 1000
+
+    def __init__(
+        self,
+        *,
+        max_messages: Optional[int] = 1000,
+        message_eviction: str = "fifo",
+        compress: Optional[str] = None,
+        codec: Optional[JSONCodec] = None,
+        intents: Union[Intents, str, None] = None,
+        gateway_url: Optional[str] = None,
+        recorder: Optional["GatewayRecorder"] = None,
+        api_url: Optional[str] = None,
+        chunk_guilds: bool = True,
+        max_in_flight: Optional[int] = 1000,
+        event_concurrency: Optional[Dict[str, int]] = None,
+        max_queued: int = 10000,
+        overflow_policy: str = "block",
+        executor_workers: Optional[int] = None,
+        profile: bool = False,
+        stall_threshold: float = 0.1,
+        metrics: bool = False,
+        metrics_port: Optional[int] = None,
+    ) -> None:
+        if compress not in self.COMPRESSION_TYPES:
+            raise ValueError(
+                "compress must be one of {} not ``{}``".format(
+                    self.COMPRESSION_TYPES, compress
+                )
+            )
+        if isinstance(intents, str) and intents != "auto":
+            raise ValueError(
+                "intents must be an Intents or ``auto`` not ``{}``".format(intents)
+            )
+
         self.loop: asyncio.AbstractEventLoop
         self.http: HTTPClient
         self.ws: DiscordWebSocket
-
-        self._cache = Cache()
-        self.events: Dict[str, List[Callable[..., Coroutine[Any, Any, Any]]]] = {}
+        self._state: ClientState
+
+        self.shard_count: Optional[int] = None
+        self.intents: Union[Intents, str] = (
+            Intents.default() if intents is None else intents
+        )
+        self.heartbeat_latencies = LatencyHistogram(self.HEARTBEAT_SAMPLES)
+        self.dropped_events: "collections.Counter[str]" = collections.Counter()
+        self._event_methods: Dict[str, bool] = {}
+        self.compress = compress
+        self.gateway_url = gateway_url
+        self.recorder = recorder
+        self.api_url = api_url
+        self.chunk_guilds = chunk_guilds
+        self.dispatcher = Dispatcher(
+            self,
+            max_in_flight=max_in_flight,
+            event_concurrency=event_concurrency,
+            max_queued=max_queued,
+            overflow_policy=overflow_policy,
+        )
+        self.executor = HandlerExecutor(max_workers=executor_workers)
+        self.profiler: Optional[Profiler] = (
+            Profiler(stall_threshold=stall_threshold) if profile else None
+        )
+        self.codec = codec or JSONCodec.default()
+        self._cache = Cache(max_messages=max_messages, message_eviction=message_eviction)
+        self.metrics = MetricsRegistry(enabled=metrics)
+        self.metrics_port = metrics_port
+        self._register_metrics()
+        self.waiters = EventWaiters()
+        self.events: Dict[str, List[EventHandler]] = {}
         self.error_handlers: Dict[
             str,
             List[Callable[..., Coroutine[Any, Any, Any]]],
@@ -65,14 +239,95 @@ class Client:
         """Returns the clients latency."""
         return self.ws.latency
 
+    @property
+    def missed_heartbeat_acks(self) -> int:
+        """Returns the amount of heartbeats that went
+        unacknowledged across every connection."""
+        return sum(ws.missed_acks for ws in self._get_websockets())
+
     @property
     def user(self) -> Optional["User"]:
         """Returns the user the client is logged
         in as. If its not logged in it will return None."""
         return self._cache.user
 
+    def _register_metrics(self) -> None:
+        # gauges are read when rendered, so they cost nothing on the hot path.
+        self.metrics.gauge(
+            "discii_cache_size",
+            "The amount of cached objects.",
+            ("cache",),
+            callback=lambda: {
+                ("users",): len(self._cache._users),
+                ("guilds",): len(self._cache._guilds),
+                ("messages",): len(self._cache._messages),
+            },
+        )
+        self.metrics.gauge(
+            "discii_handlers_queued",
+            "The amount of event handlers waiting to run.",
+            callback=lambda: self.dispatcher.queue_depth,
+        )
+        self.metrics.gauge(
+            "discii_handlers_in_flight",
+            "The amount of event handlers running.",
+            callback=lambda: self.dispatcher.in_flight,
+        )
+        self.metrics.gauge(
+            "discii_gateway_send_queue_depth",
+            "The amount of gateway commands waiting on the rate limit.",
+            callback=lambda: sum(ws.send_queue_depth for ws in self._get_websockets()),
+        )
+
     def _get_state(self) -> ClientState:
-        return ClientState(self, http=self.http, ws=self.ws, cache=self._cache)
+        return self._state
+
+    def _has_handlers(self, name: str) -> bool:
+        if name in self.events or name in self.waiters:
+            return True
+
+        # hasattr misses are slow and this runs for every frame, remember the answer.
+        has_method = self._event_methods.get(name)
+        if has_method is None:
+            has_method = self._event_methods[name] = hasattr(self, "on_" + name.lower())
+        return has_method
+
+    def _get_handled_events(self) -> List[str]:
+        events = set(self.events)
+        for attr in dir(self):
+            if attr.startswith("on_") and attr not in ("on_error", "on_command_error"):
+                events.add(attr[3:].upper())
+        return sorted(events)
+
+    def _get_intents(self) -> Intents:
+        """
+        Returns the intents to identify with,
+        working them out from the registered
+        events if ``intents`` is ``"auto"``.
+        """
+        if isinstance(self.intents, Intents):
+            return self.intents
+        return Intents.from_events(self._get_handled_events())
+
+    def _get_websocket(self, guild_id: Optional[int] = None) -> DiscordWebSocket:
+        return self.ws
+
+    def _get_websockets(self) -> List[DiscordWebSocket]:
+        # ws is only set once connected.
+        return [self.ws] if hasattr(self, "ws") else []
+
+    async def _before_identify(self, shard_id: Optional[int]) -> None:
+        """
+        Called by a websocket right before it
+        sends IDENTIFY, to respect the identify
+        rate limit when several connections start.
+
+        Parameters
+        ----------
+        shard_id: :class:`Optional[int]`
+            The shard that is identifying.
+        """
+        return None
 
     def _parse_event_data(self, name: str, data: Dict[Any, Any]) -> Any:
         """
@@ -97,7 +352,10 @@ class Client:
         return event_object
 
     async def _run_event(
-        self, coro: Callable[..., Coroutine[Any, Any, Any]], *args, **kwargs
+        self,
+        coro: Callable[..., Coroutine[Any, Any, Any]],
+        *args: Any,
+        event: Optional[str] = None,
     ) -> None:
         """
         Runs the event in a localised task.
@@ -106,9 +364,15 @@ class Client:
         ----------
         coro: :class:`Coro`
             The coroutine to run.
+        event: :class:`Optional[str]`
+            The name of the event being handled,
+            which the profiler keys the stats by.
         """
         try:
-            await coro(*args, **kwargs)
+            if self.profiler is not None and event is not None:
+                await self.profiler.run(event, coro, *args)
+            else:
+                await coro(*args)
         except Exception as error:
             await self.on_error(error, coro)
 
@@ -123,7 +387,9 @@ class Client:
         print(f"Exception in :command:``{coro.__name__}``", file=sys.stderr)
         traceback.print_exc()
 
-    async def dispatch(self, name: str, data: Dict[Any, Any]) -> None:
+    async def dispatch(
+        self, name: str, data: Dict[Any, Any], args: Optional[Tuple[Any, ...]] = None
+    ) -> Optional[Tuple[Any, ...]]:
         """
         Dispatch a user event.
 
@@ -133,23 +399,57 @@ class Client:
             The event name to dispatch
         data: :class:`Dict[Any, Any]`
             The data to pass through to the event.
-        """
+        args: :class:`Optional[Tuple[Any, ...]]`
+            The already parsed event objects. If not
+            passed the data is parsed once and shared
+            between every handler.
 
-        if name not in self.events:
-            return
+        Returns
+        -------
+        args: :class:`Optional[Tuple[Any, ...]]`
+            The parsed event objects, None if no
+            waiter or handler needed them parsed.
+        """
 
+        if name in self.waiters:
+            for waiter in self.waiters.match(name, data):
+                if waiter.raw:
+                    self.waiters.resolve(waiter, (data,))
+                    continue
+
+                if args is None:
+                    args = self._parse_event_data(name, data)
+                # events without models resolve with the raw data.
+                self.waiters.resolve(waiter, args or (data,))
+
+        if not self._has_handlers(name):
+            return args
+
+        # filters run on the raw data, so events no handler wants are never parsed.
+        handlers = []
+        for coro, event_filter, raw in self.events.get(name, ()):
+            if event_filter is not None:
+                try:
+                    if not event_filter(data):
+                        continue
+                except Exception as error:
+                    # a raising predicate skips its handler, not the gateway reader.
+                    await self.on_error(error, coro)
+                    continue
+            handlers.append((coro, raw))
         event = getattr(self, "on_" + name.lower(), None)
         if event is not None:
-            args = self._parse_event_data(name, data)
-            self.loop.create_task(self._run_event(event, *args))
-
-        for coro in self.events[name]:
-            args = (
-                self._parse_event_data(name, data)
-                if not getattr(coro, "__raw", False)
-                else data
-            )
-            self.loop.create_task(self._run_event(coro, *args))
+            handlers.insert(0, (event, False))
+
+        for coro, raw in handlers:
+            if raw:
+                await self.dispatcher.submit(name, coro, (data,))
+                continue
+
+            if args is None:
+                args = self._parse_event_data(name, data)
+            await self.dispatcher.submit(name, coro, args or ())
+        return args
 
     async def start(
         self,
@@ -172,7 +472,31 @@ class Client:
             The loop to to use in case the user has an
             event loop.
         """
+        await self.login(token, session=session, loop=loop)
+        await self.connect()  # blocking to keep code running.
+
+    async def login(
+        self,
+        token: str,
+        *,
+        session: Optional[ClientSession] = None,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+    ) -> None:
+        """
+        Sets up the http client without connecting
+        to the gateway, so requests can be made.
 
+        Parameters
+        ----------
+        token: :class:`str`
+            The bot token to start the client with.
+        session: :class:`Optional[ClientSession]`
+            The user-inputted session in case the user
+            has a pre-defined session.
+        loop: :class:`Optional[AbstractEventLoop]`
+            The loop to to use in case the user has an
+            event loop.
+        """
         if not isinstance(token, str) or len(token) != 59:
             raise InvalidBotToken(
                 "Make sure you enter a valid bot token instead of ``{}``".format(token)
@@ -181,9 +505,81 @@ class Client:
         self.loop = loop or asyncio.get_running_loop()
         session = session or ClientSession()
         self.http = HTTPClient(token=token, session=session, loop=self.loop, client=self)
+        self._state = ClientState(self, http=self.http, cache=self._cache)
+        # cached message payloads are only built once looked up.
+        self._cache.message_factory = functools.partial(Message, state=self._state)
+        if self.profiler is not None:
+            self.profiler.start(self.loop)
+        if self.metrics.enabled and self.metrics_port is not None:
+            await self.metrics.start(port=self.metrics_port)
+
+    async def connect(self) -> None:
+        """
+        Connects to the gateway and listens
+        to it until the connection closes.
+        """
         self.ws = await DiscordWebSocket.from_client(self)
+        self._state.ws = self.ws
 
-        await self.ws.listen()  # blocking to keep code running.
+        await self.ws.listen()
+
+    async def close(self) -> None:
+        """
+        Closes the gateway connection
+        and the http session.
+        """
+        for ws in self._get_websockets():
+            await ws.close()
+        await self.http.close()
+        self.executor.shutdown()
+        if self.profiler is not None:
+            self.profiler.stop()
+        await self.metrics.stop()
+        if self.recorder is not None:
+            self.recorder.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns a snapshot of the client's rolling
+        stats, latencies being in seconds.
+
+        Returns
+        -------
+        stats: :class:`Dict[str, Any]`
+            The heartbeat latency, the dispatcher's
+            queue and, when profiling, the stats of
+            every handler and of the loop lag.
+        """
+        dispatcher = self.dispatcher
+        stats: Dict[str, Any] = {
+            "heartbeat": {
+                "p50": self.heartbeat_latencies.p50,
+                "p95": self.heartbeat_latencies.p95,
+                "p99": self.heartbeat_latencies.p99,
+                "missed_acks": self.missed_heartbeat_acks,
+            },
+            "dispatcher": {
+                "in_flight": dispatcher.in_flight,
+                "queue_depth": dispatcher.queue_depth,
+                "dropped": dict(dispatcher.dropped),
+                "queue_p99": dispatcher.queue_latencies.p99,
+            },
+            "events": {
+                event: {"p50": histogram.p50, "p99": histogram.p99}
+                for event, histogram in dispatcher.handler_latencies.items()
+            },
+        }
+        if self.profiler is not None:
+            stats.update(self.profiler.stats())
+        return stats
+
+    async def wait_until_chunked(self) -> None:
+        """
+        Waits until every guild received so far
+        has had all of its members chunked.
+        """
+        for ws in self._get_websockets():
+            await ws.chunker.idle.wait()
 
     def error(self, *, command: bool = False) -> Any:
         """
@@ -213,10 +609,24 @@ class Client:
 
         return inner
 
-    def on(self, event_name: str, *, raw: bool = False) -> Any:
+    def on(
+        self,
+        event_name: str,
+        *,
+        raw: bool = False,
+        executor: Optional[str] = None,
+        guild_id: Optional[int] = None,
+        channel_id: Optional[int] = None,
+        ignore_bots: bool = False,
+        predicate: Optional[Callable[[Dict[str, Any]], bool]] = None,
+    ) -> Any:
         """
         Registers a coroutine as an event.
 
+        The filters are checked against the raw data before
+        it is parsed, so events that no handler passes are
+        never turned into models. See `EventFilter`.
+
         Parameters
         ----------
         event_name: :class:`str`
@@ -224,21 +634,116 @@ class Client:
         raw: :class:`bool`
             Whether or not to pass the raw data received
             from the event.
+        executor: :class:`Optional[str]`
+            Runs a synchronous function on a ``"thread"``
+            or ``"process"`` pool instead of a coroutine
+            on the loop, for cpu heavy handlers. See
+            `HandlerExecutor.run`.
+        guild_id: :class:`Optional[int]`
+            The guild the event must be in.
+        channel_id: :class:`Optional[int]`
+            The channel the event must be in.
+        ignore_bots: :class:`bool`
+            Whether or not to skip events whose
+            author or user is a bot.
+        predicate: :class:`Optional[Callable[[Dict[str, Any]], bool]]`
+            Called with the raw data, the handler
+            only runs if it returns True.
         """
+        HandlerExecutor.validate(executor)
+        event_filter = EventFilter.from_options(
+            event_name,
+            guild_id=guild_id,
+            channel_id=channel_id,
+            ignore_bots=ignore_bots,
+            predicate=predicate,
+        )
 
         def inner(coro: Coro) -> Coro:
-            if not asyncio.iscoroutinefunction(coro):
-                raise InvalidFunction("Your event must be a coroutine.")
-
-            coro.__raw = raw
-            if event_name in self.events:
-                self.events[event_name].append(coro)
+            handler = coro
+            if executor is None:
+                if not asyncio.iscoroutinefunction(coro):
+                    raise InvalidFunction("Your event must be a coroutine.")
             else:
-                self.events[event_name] = [coro]
+                if asyncio.iscoroutinefunction(coro):
+                    raise InvalidFunction("Your executor event must not be a coroutine.")
+                handler = self.executor.wrap(executor, coro)
+
+            # kept per registration, the same function can be registered with
+            # different filters.
+            self.events.setdefault(event_name, []).append((handler, event_filter, raw))
             return coro
 
         return inner
 
+    async def wait_for(
+        self,
+        event_name: str,
+        *,
+        check: Optional[Callable[..., bool]] = None,
+        timeout: Optional[float] = None,
+        raw: bool = False,
+        channel_id: Optional[int] = None,
+        author_id: Optional[int] = None,
+        guild_id: Optional[int] = None,
+    ) -> Any:
+        """
+        Waits for the next event that passes
+        ``check`` and the given ids.
+
+        Passing an id rather than checking it in ``check``
+        indexes the waiter by it, so events of other channels,
+        authors or guilds never run its check. With ``"auto"``
+        intents the event must be handled or cached to be
+        received at all.
+
+        Parameters
+        ----------
+        event_name: :class:`str`
+            The event name to wait for.
+        check: :class:`Optional[Callable[..., bool]]`
+            Called with the same arguments as a handler
+            would be, the event is only returned if it
+            returns True.
+        timeout: :class:`Optional[float]`
+            The seconds to wait for, ``None`` waits forever.
+        raw: :class:`bool`
+            Whether or not to pass the raw data
+            instead of the parsed models.
+        channel_id: :class:`Optional[int]`
+            The channel the event must be in.
+        author_id: :class:`Optional[int]`
+            The user the event must be from, the
+            ``author`` of messages or the ``user``
+            of other events.
+        guild_id: :class:`Optional[int]`
+            The guild the event must be in.
+
+        Returns
+        -------
+        event: :class:`Any`
+            The event's model, a tuple of them if there
+            are several, or the raw data if there are none.
+
+        Raises
+        ------
+        asyncio.TimeoutError
+            No event passed within ``timeout``.
+        """
+        future = asyncio.get_running_loop().create_future()
+        waiter = self.waiters.add(
+            event_name,
+            future,
+            check=check,
+            raw=raw,
+            keys={"channel_id": channel_id, "author_id": author_id, "guild_id": guild_id},
+        )
+        try:
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            # resolved waiters are already removed, this cleans up timeouts and cancels.
+            self.waiters.remove(waiter)
+
     def get_channel(self, channel_id: int) -> Optional["Channel"]:
         """
         Attempts to get a channel with an id
@@ -0,0 +1,555 @@
+import asyncio
+import collections
+import itertools
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+
+from multiprocessing.connection import Connection, wait
+from multiprocessing.process import BaseProcess
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    TYPE_CHECKING,
+)
+
+if TYPE_CHECKING:
+    from .shard import AutoShardedClient
+
+
+# fmt: off
+__all__ = (
+    'ClusterClient',
+    'ClusterManager',
+)
+# fmt: on
+
+
+ClientFactory = Callable[..., "AutoShardedClient"]
+
+
+class ClusterClient:
+    """
+    Represents a cluster's end of the IPC channel
+    to the supervisor, used to answer and send
+    cross-cluster queries.
+
+    Parameters
+    ----------
+    cluster_id: :class:`int`
+        The id of the cluster.
+    connection: :class:`multiprocessing.connection.Connection`
+        The pipe connected to the supervisor.
+    client: :class:`AutoShardedClient`
+        The client running in the cluster.
+
+    Attributes
+    ----------
+    handlers: :class:`Dict[str, Callable[..., Any]]`
+        The query handlers where the key is the
+        query name. Handlers receive the query
+        arguments and return a picklable result.
+    """
+
+    def __init__(
+        self, cluster_id: int, connection: Connection, client: "AutoShardedClient"
+    ) -> None:
+        self.cluster_id = cluster_id
+        self.connection = connection
+        self.client = client
+
+        self.handlers: Dict[str, Callable[..., Any]] = {
+            "guild_count": lambda: len(client._cache._guilds),
+            "find_guild": lambda guild_id: guild_id in client._cache._guilds,
+        }
+        self._nonce = itertools.count()
+        self._pending: Dict[int, "asyncio.Future[Any]"] = {}
+        self._closed: Optional["asyncio.Future[None]"] = None
+
+    def add_handler(self, name: str, handler: Callable[..., Any]) -> None:
+        """
+        Registers a query handler.
+
+        Parameters
+        ----------
+        name: :class:`str`
+            The query name.
+        handler: :class:`Callable[..., Any]`
+            The function or coroutine function
+            that answers the query.
+        """
+        self.handlers[name] = handler
+
+    async def _request(self, *message: Any, timeout: Optional[float] = None) -> Any:
+        nonce = next(self._nonce)
+        future = self.client.loop.create_future()
+        self._pending[nonce] = future
+
+        self.connection.send((message[0], nonce) + message[1:])
+        try:
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self._pending.pop(nonce, None)
+
+    async def query(
+        self, name: str, *args: Any, timeout: Optional[float] = 10.0
+    ) -> Dict[int, Any]:
+        """
+        Sends a query to every cluster, including
+        this one, and waits for all the answers.
+
+        Parameters
+        ----------
+        name: :class:`str`
+            The query name.
+        args: :class:`Any`
+            The picklable arguments to pass
+            to the handlers.
+        timeout: :class:`Optional[float]`
+            The seconds to wait for every answer
+            before raising `asyncio.TimeoutError`.
+            ``None`` waits forever.
+
+        Returns
+        -------
+        results: :class:`Dict[int, Any]`
+            The answer of every cluster that was
+            alive where the key is the cluster id.
+        """
+        return await self._request("query", name, args, timeout, timeout=timeout)
+
+    async def before_identify(self, shard_id: int) -> None:
+        """
+        Waits for the supervisor to hand out an
+        identify slot, so shards of every cluster
+        share the identify rate limit.
+
+        Parameters
+        ----------
+        shard_id: :class:`int`
+            The shard that is identifying.
+        """
+        await self._request("identify", shard_id)
+
+    async def guild_count(self) -> int:
+        """Returns the total amount of guilds across every cluster."""
+        return sum((await self.query("guild_count")).values())
+
+    async def find_guild(self, guild_id: int) -> Optional[int]:
+        """
+        Finds the cluster which a guild is in.
+
+        Parameters
+        ----------
+        guild_id: :class:`int`
+            The guild's id.
+
+        Returns
+        -------
+        cluster_id: :class:`Optional[int]`
+            The cluster id if found, else None
+        """
+        for cluster_id, found in (await self.query("find_guild", guild_id)).items():
+            if found:
+                return cluster_id
+        return None
+
+    async def _answer(self, key: Any, name: str, args: Tuple[Any, ...]) -> None:
+        try:
+            result = self.handlers[name](*args)
+            if asyncio.iscoroutine(result):
+                result = await result
+        except Exception:
+            traceback.print_exc()
+            result = None
+
+        self.connection.send(("response", key, self.cluster_id, result))
+
+    def _handle_message(self, message: Tuple[Any, ...]) -> None:
+        if message[0] == "query":
+            _, key, name, args = message
+            self.client.loop.create_task(self._answer(key, name, args))
+        elif message[0] == "result":
+            _, nonce, result = message
+            future = self._pending.get(nonce)
+            if future is not None and not future.done():
+                future.set_result(result)
+        elif message[0] == "close" and self._closed is not None:
+            self._closed.set_result(None)
+
+    def _on_readable(self) -> None:
+        assert self._closed is not None
+        try:
+            while not self._closed.done() and self.connection.poll():
+                self._handle_message(self.connection.recv())
+        except (EOFError, OSError):
+            if not self._closed.done():
+                self._closed.set_result(None)
+
+    async def listen(self) -> None:
+        """
+        Receives queries and results from the supervisor
+        until it asks the cluster to close or goes away.
+        The pipe is read when the loop sees it is readable,
+        so no executor thread is held waiting on it.
+        """
+        loop = self.client.loop
+        self._closed = loop.create_future()
+
+        fileno = self.connection.fileno()
+        loop.add_reader(fileno, self._on_readable)
+        try:
+            await self._closed
+        finally:
+            loop.remove_reader(fileno)
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(EOFError("the supervisor closed the connection"))
+
+
+def _run_cluster(
+    factory: ClientFactory,
+    token: str,
+    cluster_id: int,
+    shard_ids: Sequence[int],
+    shard_count: int,
+    connection: Connection,
+) -> None:
+    async def runner() -> None:
+        client = factory(shard_ids=shard_ids, shard_count=shard_count)
+        client.cluster = ClusterClient(cluster_id, connection, client)
+
+        # the client sets its loop in start, the ipc listener needs it right away.
+        loop = client.loop = asyncio.get_running_loop()
+        listener = loop.create_task(client.cluster.listen())
+        starter = loop.create_task(client.start(token))
+        await asyncio.wait({listener, starter}, return_when=asyncio.FIRST_COMPLETED)
+
+        listener.cancel()
+        if not starter.done():
+            # the supervisor is stopping or went away, nothing would restart the cluster.
+            starter.cancel()
+
+        # a client error is raised so the supervisor restarts the cluster.
+        try:
+            await starter
+        except asyncio.CancelledError:
+            pass
+        finally:
+            if hasattr(client, "http"):
+                await client.close()
+
+    asyncio.run(runner())
+
+
+class ClusterManager:
+    """
+    Supervises worker processes that each run
+    a subset of the shards with their own loop
+    and cache, so every cpu core can be used.
+
+    Parameters
+    ----------
+    factory: :class:`Callable[..., AutoShardedClient]`
+        A picklable, module level callable that
+        builds the client in each worker. It is
+        called with ``shard_ids`` and ``shard_count``.
+    token: :class:`str`
+        The bot token to start the clients with.
+    shard_count: :class:`int`
+        The total amount of shards.
+    clusters: :class:`Optional[int]`
+        The amount of worker processes. Defaults
+        to the amount of cpu cores.
+    restart_delay: :class:`float`
+        The seconds to wait before restarting
+        a worker that died.
+    max_concurrency: :class:`int`
+        The amount of shards that can identify at
+        the same time, across every cluster.
+
+    Attributes
+    ----------
+    processes: :class:`Dict[int, multiprocessing.process.BaseProcess]`
+        The worker processes where the key
+        is the cluster id.
+    restarts: :class:`Dict[int, int]`
+        The amount of times every cluster
+        has been restarted.
+    IDENTIFY_INTERVAL: :class:`float`
+        The seconds between two identifies
+        in the same concurrency bucket.
+    """
+
+    IDENTIFY_INTERVAL = 5.0
+
+    def __init__(
+        self,
+        factory: ClientFactory,
+        token: str,
+        *,
+        shard_count: int,
+        clusters: Optional[int] = None,
+        restart_delay: float = 5.0,
+        max_concurrency: int = 1,
+    ) -> None:
+        self.factory = factory
+        self.token = token
+        self.shard_count = shard_count
+        self.restart_delay = restart_delay
+        self.max_concurrency = max_concurrency
+
+        clusters = min(clusters or os.cpu_count() or 1, shard_count)
+        size, extra = divmod(shard_count, clusters)
+
+        self.cluster_shards: List[List[int]] = []
+        start = 0
+        for cluster_id in range(clusters):
+            end = start + size + (cluster_id < extra)
+            self.cluster_shards.append(list(range(start, end)))
+            start = end
+
+        self.processes: Dict[int, BaseProcess] = {}
+        self.restarts: Dict[int, int] = {c: 0 for c in range(clusters)}
+
+        self._context = multiprocessing.get_context("spawn")
+        self._connections: Dict[int, Connection] = {}
+        self._restart_at: Dict[int, float] = {}
+        # the clusters whose pipe broke before their sentinel was handled.
+        self._broken: Set[int] = set()
+        self._pending: Dict[Tuple[int, int], Dict[str, Any]] = {}
+        # the cluster and nonce of every shard waiting to identify, per bucket.
+        self._identifies: Dict[int, Deque[Tuple[int, int]]] = {}
+        self._next_identify: Dict[int, float] = {}
+        self._stopping = False
+
+    def _start_cluster(self, cluster_id: int) -> None:
+        parent, child = self._context.Pipe()
+        process = self._context.Process(
+            target=_run_cluster,
+            args=(
+                self.factory,
+                self.token,
+                cluster_id,
+                self.cluster_shards[cluster_id],
+                self.shard_count,
+                child,
+            ),
+            # not daemonic, so clusters can start processes of their own.
+            name="discii-cluster-{}".format(cluster_id),
+        )
+        process.start()
+        child.close()
+
+        self.processes[cluster_id] = process
+        self._connections[cluster_id] = parent
+
+    def _cluster_died(self, cluster_id: int) -> None:
+        process = self.processes[cluster_id]
+        process.join(timeout=1.0)
+
+        print(
+            "Cluster {} exited with code {}, restarting in {}s".format(
+                cluster_id, process.exitcode, self.restart_delay
+            ),
+            file=sys.stderr,
+        )
+        self._connections.pop(cluster_id).close()
+        self._broken.discard(cluster_id)
+        self._restart_at[cluster_id] = time.monotonic() + self.restart_delay
+
+        for key in list(self._pending):
+            self._pending[key]["waiting"].discard(cluster_id)
+            self._finish_query(key)
+
+        for bucket, waiting in self._identifies.items():
+            self._identifies[bucket] = collections.deque(
+                request for request in waiting if request[0] != cluster_id
+            )
+
+    def _finish_query(self, key: Tuple[int, int]) -> None:
+        query = self._pending[key]
+        if query["waiting"]:
+            return
+
+        del self._pending[key]
+        cluster_id, nonce = key
+        self._send(cluster_id, ("result", nonce, query["results"]))
+
+    def _send(self, cluster_id: int, message: Tuple[Any, ...]) -> bool:
+        # returns whether or not the message was sent to the cluster.
+        connection = self._connections.get(cluster_id)
+        if connection is None or cluster_id in self._broken:
+            return False
+
+        try:
+            connection.send(message)
+        except OSError:
+            # the worker died before its sentinel was handled. make sure it is
+            # stopped so the sentinel fires and restarts it on the next poll.
+            self._broken.add(cluster_id)
+            process = self.processes[cluster_id]
+            if process.is_alive():
+                process.terminate()
+            return False
+        return True
+
+    def _grant_identifies(self, now: float) -> Optional[float]:
+        # returns the seconds until the next slot opens for a waiting shard.
+        delay: Optional[float] = None
+        for bucket, waiting in self._identifies.items():
+            if not waiting:
+                continue
+
+            next_identify = self._next_identify.get(bucket, now)
+            if now >= next_identify:
+                cluster_id, nonce = waiting.popleft()
+                self._send(cluster_id, ("result", nonce, None))
+                next_identify = self._next_identify[bucket] = now + self.IDENTIFY_INTERVAL
+                if not waiting:
+                    continue
+
+            wait_for = next_identify - now
+            delay = wait_for if delay is None else min(delay, wait_for)
+        return delay
+
+    def _expire_queries(self, now: float) -> None:
+        # the querying cluster gave up, late answers are ignored.
+        for key, query in list(self._pending.items()):
+            if query["expires_at"] is not None and now >= query["expires_at"]:
+                del self._pending[key]
+
+    def _handle_message(self, cluster_id: int, message: Tuple[Any, ...]) -> None:
+        if message[0] == "query":
+            _, nonce, name, args, timeout = message
+            key = (cluster_id, nonce)
+            waiting = set(self._connections) - self._broken
+            self._pending[key] = {
+                "waiting": waiting,
+                "results": {},
+                "expires_at": None if timeout is None else time.monotonic() + timeout,
+            }
+
+            for responder in list(waiting):
+                if not self._send(responder, ("query", key, name, args)):
+                    waiting.discard(responder)
+            self._finish_query(key)
+        elif message[0] == "response":
+            _, key, responder, result = message
+            query = self._pending.get(key)
+            if query is not None:
+                query["results"][responder] = result
+                query["waiting"].discard(responder)
+                self._finish_query(key)
+        elif message[0] == "identify":
+            _, nonce, shard_id = message
+            bucket = shard_id % self.max_concurrency
+            waiting = self._identifies.setdefault(bucket, collections.deque())
+            waiting.append((cluster_id, nonce))
+
+    def start(self) -> None:
+        """Starts every cluster, without supervising them."""
+        for cluster_id in range(len(self.cluster_shards)):
+            self._start_cluster(cluster_id)
+
+    def poll(self, timeout: float = 1.0) -> None:
+        """
+        Supervises the clusters once, restarting dead
+        workers, routing queries and handing out identify
+        slots. `ClusterManager.run` calls it in a loop.
+
+        Parameters
+        ----------
+        timeout: :class:`float`
+            The most seconds to wait for a
+            cluster message or exit.
+        """
+        delay = self._grant_identifies(time.monotonic())
+        if delay is not None:
+            timeout = min(timeout, delay)
+
+        waitables: Dict[Any, Tuple[str, int]] = {}
+        for cluster_id, connection in self._connections.items():
+            waitables[connection] = ("connection", cluster_id)
+            waitables[self.processes[cluster_id].sentinel] = ("sentinel", cluster_id)
+
+        for ready in wait(list(waitables), timeout=timeout):
+            kind, cluster_id = waitables[ready]
+            if cluster_id not in self._connections:
+                continue
+
+            if kind == "sentinel":
+                self._cluster_died(cluster_id)
+                continue
+
+            try:
+                message = self._connections[cluster_id].recv()
+            except (EOFError, OSError):
+                # the worker exited, its sentinel restarts it.
+                continue
+            self._handle_message(cluster_id, message)
+
+        now = time.monotonic()
+        for cluster_id, restart_at in list(self._restart_at.items()):
+            if now >= restart_at:
+                del self._restart_at[cluster_id]
+                self.restarts[cluster_id] += 1
+                self._start_cluster(cluster_id)
+
+        self._grant_identifies(now)
+        self._expire_queries(now)
+
+    def run(self) -> None:
+        """
+        Starts every cluster and supervises them,
+        restarting dead workers and routing queries,
+        until interrupted.
+        """
+        self.start()
+        try:
+            while not self._stopping:
+                self.poll()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """
+        Asks every cluster to close its client and
+        waits for the workers to exit, terminating
+        the ones that are still running after that.
+
+        Parameters
+        ----------
+        timeout: :class:`float`
+            The seconds to wait for the clusters
+            to close before terminating them.
+        """
+        self._stopping = True
+        for connection in self._connections.values():
+            try:
+                connection.send(("close",))
+            except OSError:
+                pass
+
+        deadline = time.monotonic() + timeout
+        for process in self.processes.values():
+            process.join(max(0.0, deadline - time.monotonic()))
+        for process in self.processes.values():
+            if process.is_alive():
+                process.terminate()
+                process.join()
+
+        for connection in self._connections.values():
+            connection.close()
+        self._connections.clear()
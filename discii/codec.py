@@ -0,0 +1,100 @@
+import json
+
+from typing import Any, Callable, Union
+
+
+# fmt: off
+__all__ = (
+    'JSONCodec',
+)
+# fmt: on
+
+
+class JSONCodec:
+    """
+    Represents the json encoder and decoder
+    that every gateway and http payload goes
+    through.
+
+    Parameters
+    ----------
+    name: :class:`str`
+        The name of the json library.
+    loads: :class:`Callable[[Union[str, bytes]], Any]`
+        Decodes a json document.
+    dumps: :class:`Callable[[Any], str]`
+        Encodes an object to a json string.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        loads: Callable[[Union[str, bytes]], Any],
+        dumps: Callable[[Any], str],
+    ) -> None:
+        self.name = name
+        self.loads = loads
+        self.dumps = dumps
+
+    def __repr__(self) -> str:
+        return "<JSONCodec name={!r}>".format(self.name)
+
+    @classmethod
+    def stdlib(cls) -> "JSONCodec":
+        """Returns a codec using the standard library ``json`` module."""
+        return cls(
+            "json",
+            loads=json.loads,
+            dumps=lambda obj: json.dumps(obj, separators=(",", ":")),
+        )
+
+    @classmethod
+    def orjson(cls) -> "JSONCodec":
+        """
+        Returns a codec using ``orjson``.
+
+        Raises
+        ------
+        ImportError
+            ``orjson`` is not installed.
+        """
+        import orjson  # type: ignore[import]
+
+        return cls(
+            "orjson",
+            loads=orjson.loads,
+            dumps=lambda obj: orjson.dumps(obj).decode("utf-8"),
+        )
+
+    @classmethod
+    def ujson(cls) -> "JSONCodec":
+        """
+        Returns a codec using ``ujson``.
+
+        Raises
+        ------
+        ImportError
+            ``ujson`` is not installed.
+        """
+        import ujson  # type: ignore[import]
+
+        return cls(
+            "ujson",
+            loads=ujson.loads,
+            dumps=lambda obj: ujson.dumps(obj, ensure_ascii=False),
+        )
+
+    @classmethod
+    def default(cls) -> "JSONCodec":
+        """
+        Returns the fastest codec installed, trying
+        ``orjson`` then ``ujson`` and falling back
+        to the standard library.
+        """
+        for factory in (cls.orjson, cls.ujson):
+            try:
+                return factory()
+            except ImportError:
+                continue
+        return cls.stdlib()
@@ -5,6 +5,7 @@ import traceback
 
 from typing import TypeVar, Tuple, Optional, List, Dict, Coroutine, Callable, Any
 
+from discii.client import EventHandler
 from discii.errors import InvalidFunction, InvalidArgumentType, NotEnoughArguments
 from .core import Command, Context
 
@@ -29,17 +30,26 @@ class Bot(discii.Client):
     prefix: :class:`List[str]`
         The prefix that the bot listens to
         to check for commands.
+    options: :class:`Any`
+        The options passed through to `Client`.
     """
 
-    def __init__(self, *, prefixes: List[str]) -> None:
-        super().__init__()
+    def __init__(self, *, prefixes: List[str], **options: Any) -> None:
+        super().__init__(**options)
 
-        self.events: Dict[str, List[Callable[..., Coroutine[Any, Any, Any]]]] = {
-            "MESSAGE_CREATE": [self._message_create]
+        self.events: Dict[str, List[EventHandler]] = {
+            "MESSAGE_CREATE": [(self._message_create, None, False)]
         }
         self.prefixes: List[str] = prefixes
         self._all_commands: Dict[str, Command] = {}
 
+    def _get_intents(self) -> discii.Intents:
+        intents = super()._get_intents()
+        # prefixed commands can't be read without the privileged content intent.
+        if self.intents == "auto" and self._all_commands:
+            intents |= discii.Intents.MESSAGE_CONTENT
+        return intents
+
     def error(self, *, command: bool = False) -> Any:
         """
         Overrides the default error handler.
@@ -65,7 +75,13 @@ class Bot(discii.Client):
 
         return inner
 
-    def command(self, *, names: List[str], enforce_types: bool = False) -> Any:
+    def command(
+        self,
+        *,
+        names: List[str],
+        enforce_types: bool = False,
+        executor: Optional[str] = None,
+    ) -> Any:
         """
         A decorator that registers commands
         to the bot.
@@ -78,11 +94,22 @@ class Bot(discii.Client):
         enforce_types: :class:`bool`
             Whether or not to enforce types
             when calling the function
+        executor: :class:`Optional[str]`
+            Runs a synchronous function on a ``"thread"``
+            or ``"process"`` pool instead of a coroutine
+            on the loop.
         """
+        discii.HandlerExecutor.validate(executor)
 
         def inner(coro: Coro) -> Coro:
             coro._enforce_types = enforce_types
-            command = Command(coro, names=names)
+            handler = coro
+            if executor is not None:
+                if asyncio.iscoroutinefunction(coro):
+                    raise InvalidFunction("Your executor command can't be a coroutine.")
+                handler = self.executor.wrap(executor, coro)
+
+            command = Command(handler, names=names)
 
             for name in names:
                 self._all_commands[name] = command
@@ -0,0 +1,239 @@
+import asyncio
+import collections
+import time
+
+from typing import Any, Callable, Coroutine, Deque, Dict, Optional, Tuple, TYPE_CHECKING
+
+from .stats import LatencyHistogram
+
+if TYPE_CHECKING:
+    from .client import Client
+
+
+# fmt: off
+__all__ = (
+    'Dispatcher',
+)
+# fmt: on
+
+
+Handler = Callable[..., Coroutine[Any, Any, Any]]
+
+
+class _Job:
+    __slots__ = ("event", "coro", "args", "queued_at")
+
+    def __init__(self, event: str, coro: Handler, args: Tuple[Any, ...]) -> None:
+        self.event = event
+        self.coro = coro
+        self.args = args
+        self.queued_at = time.perf_counter()
+
+
+class Dispatcher:
+    """
+    Runs event handlers with a bounded amount in
+    flight, queueing the rest so bursts of events
+    can't pile up unbounded tasks. Queued handlers
+    start in order per event, taking turns between
+    the events that are below their concurrency.
+
+    Parameters
+    ----------
+    client: :class:`Client`
+        The client whose handlers are ran.
+    max_in_flight: :class:`Optional[int]`
+        The maximum amount of handlers running at
+        once. ``None`` means unbounded.
+    event_concurrency: :class:`Optional[Dict[str, int]]`
+        The maximum amount of handlers running at
+        once per event name, for example
+        ``{"MESSAGE_CREATE": 50}``.
+    max_queued: :class:`int`
+        The maximum amount of handlers waiting to run.
+    overflow_policy: :class:`str`
+        What to do when the queue is full. ``"block"``
+        holds the gateway reader back until there is
+        room, ``"drop_oldest"`` drops the handler that
+        waited longest and ``"drop_new"`` drops the
+        incoming one. Blocking deadlocks if every running
+        handler waits on a gateway event.
+
+    Attributes
+    ----------
+    in_flight: :class:`int`
+        The amount of handlers running.
+    dropped: :class:`collections.Counter[str]`
+        The amount of handlers dropped because the
+        queue was full, where the key is the event name.
+    queue_latencies: :class:`LatencyHistogram`
+        The seconds handlers waited in the queue.
+    handler_latencies: :class:`Dict[str, LatencyHistogram]`
+        The seconds handlers took to run, where
+        the key is the event name.
+    blocking: :class:`bool`
+        Whether or not the gateway reader is held
+        back waiting for room in the queue.
+    unblocked_at: :class:`float`
+        The ``time.perf_counter`` time the gateway
+        reader was last let through.
+    """
+
+    OVERFLOW_POLICIES = ("block", "drop_oldest", "drop_new")
+
+    def __init__(
+        self,
+        client: "Client",
+        *,
+        max_in_flight: Optional[int] = 1000,
+        event_concurrency: Optional[Dict[str, int]] = None,
+        max_queued: int = 10000,
+        overflow_policy: str = "block",
+    ) -> None:
+        if overflow_policy not in self.OVERFLOW_POLICIES:
+            raise ValueError(
+                "overflow_policy must be one of {} not ``{}``".format(
+                    self.OVERFLOW_POLICIES, overflow_policy
+                )
+            )
+        if max_in_flight is not None and max_in_flight < 1:
+            raise ValueError(
+                "max_in_flight must be at least 1 not ``{}``".format(max_in_flight)
+            )
+        if max_queued < 1:
+            raise ValueError(
+                "max_queued must be at least 1 not ``{}``".format(max_queued)
+            )
+        for event, limit in (event_concurrency or {}).items():
+            if limit < 1:
+                raise ValueError(
+                    "event_concurrency of ``{}`` must be at least 1 not ``{}``".format(
+                        event, limit
+                    )
+                )
+
+        self.client = client
+        self.max_in_flight = max_in_flight
+        self.event_concurrency: Dict[str, int] = event_concurrency or {}
+        self.max_queued = max_queued
+        self.overflow_policy = overflow_policy
+
+        self.in_flight = 0
+        self.dropped: "collections.Counter[str]" = collections.Counter()
+        self.queue_latencies = LatencyHistogram()
+        self.handler_latencies: Dict[str, LatencyHistogram] = {}
+        self.blocking = False
+        self.unblocked_at = 0.0
+
+        self._event_in_flight: "collections.Counter[str]" = collections.Counter()
+        self._queues: Dict[str, Deque[_Job]] = {}
+        self._queued = 0
+        # the events with queued handlers below their concurrency, an insertion
+        # ordered dict as a set so draining never looks at blocked events.
+        self._ready: Dict[str, None] = {}
+        self._space = asyncio.Event()
+
+    @property
+    def queue_depth(self) -> int:
+        """Returns the amount of handlers waiting to run."""
+        return self._queued
+
+    def _is_full(self) -> bool:
+        return self.max_in_flight is not None and self.in_flight >= self.max_in_flight
+
+    def _event_can_start(self, event: str) -> bool:
+        limit = self.event_concurrency.get(event)
+        return limit is None or self._event_in_flight[event] < limit
+
+    def _can_start(self, event: str) -> bool:
+        return not self._is_full() and self._event_can_start(event)
+
+    def _start(self, job: _Job) -> None:
+        self.in_flight += 1
+        self._event_in_flight[job.event] += 1
+        self.client.loop.create_task(self._run(job))
+
+    async def _run(self, job: _Job) -> None:
+        started = time.perf_counter()
+        self.queue_latencies.add(started - job.queued_at)
+
+        try:
+            await self.client._run_event(job.coro, *job.args, event=job.event)
+        finally:
+            histogram = self.handler_latencies.get(job.event)
+            if histogram is None:
+                histogram = self.handler_latencies[job.event] = LatencyHistogram()
+            histogram.add(time.perf_counter() - started)
+
+            self.in_flight -= 1
+            self._event_in_flight[job.event] -= 1
+            if job.event in self._queues:
+                self._ready[job.event] = None
+            self._drain()
+
+    def _pop(self, event: str) -> _Job:
+        queue = self._queues[event]
+        job = queue.popleft()
+        self._queued -= 1
+        if not queue:
+            del self._queues[event]
+            self._ready.pop(event, None)
+        return job
+
+    def _drain(self) -> None:
+        while self._ready and not self._is_full():
+            event = next(iter(self._ready))
+            del self._ready[event]
+            self._start(self._pop(event))
+
+            # readd behind the other ready events so they take turns.
+            if event in self._queues and self._event_can_start(event):
+                self._ready[event] = None
+
+        if self._queued < self.max_queued:
+            self._space.set()
+
+    async def submit(self, event: str, coro: Handler, args: Tuple[Any, ...]) -> None:
+        """
+        Runs a handler, or queues it if too
+        many are already running.
+
+        Parameters
+        ----------
+        event: :class:`str`
+            The name of the event being handled.
+        coro: :class:`Callable[..., Coroutine[Any, Any, Any]]`
+            The handler.
+        args: :class:`Tuple[Any, ...]`
+            The arguments to call the handler with.
+        """
+        job = _Job(event, coro, args)
+        if event not in self._queues and self._can_start(event):
+            self._start(job)
+            return
+
+        if self._queued >= self.max_queued:
+            if self.overflow_policy == "drop_new":
+                self.dropped[event] += 1
+                return
+            elif self.overflow_policy == "drop_oldest":
+                # the oldest handler is at the front of one of the event queues.
+                oldest = min(
+                    self._queues, key=lambda name: self._queues[name][0].queued_at
+                )
+                self.dropped[self._pop(oldest).event] += 1
+            else:
+                self.blocking = True
+                try:
+                    while self._queued >= self.max_queued:
+                        self._space.clear()
+                        await self._space.wait()
+                finally:
+                    self.blocking = False
+                    self.unblocked_at = time.perf_counter()
+
+        self._queues.setdefault(event, collections.deque()).append(job)
+        self._queued += 1
+        if self._event_can_start(event):
+            self._ready[event] = None
+        self._drain()
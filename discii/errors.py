@@ -6,6 +6,8 @@ __all__ = (
     'SnowflakeNotFound',
     'UserNotFound',
     'ChannelNotFound',
+    'HTTPException',
+    'GatewayException',
 )
 # fmt: on
 
@@ -34,6 +36,14 @@ class ChannelNotFound(SnowflakeNotFound):
     """Raised when a user tried to get a non-existant channel."""
 
 
+class HTTPException(DisciiException):
+    """Raised when a request to the discord api could not be completed."""
+
+
+class GatewayException(DisciiException):
+    """Raised when the gateway closes the connection and it can't be resumed."""
+
+
 class InvalidArgumentType(DisciiException):
     """Raised when a command is called but ``enforce_types`` is ``True``
     and the argument types were invalid."""
@@ -0,0 +1,188 @@
+import asyncio
+import functools
+import multiprocessing
+
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+# fmt: off
+__all__ = (
+    'EventSnapshot',
+    'HandlerExecutor',
+)
+# fmt: on
+
+
+class EventSnapshot:
+    """
+    Represents a picklable copy of a discord
+    model, handed to handlers that run in
+    another process instead of the model.
+
+    Parameters
+    ----------
+    type: :class:`str`
+        The name of the model's class,
+        for example ``Message``.
+    payload: :class:`Dict[str, Any]`
+        The raw data the model was built from,
+        which can also be read by indexing the
+        snapshot.
+    """
+
+    __slots__ = ("type", "payload")
+
+    def __init__(self, type: str, payload: Dict[str, Any]) -> None:
+        self.type = type
+        self.payload = payload
+
+    def __repr__(self) -> str:
+        return "<EventSnapshot type={} id={}>".format(self.type, self.payload.get("id"))
+
+    def __getitem__(self, key: str) -> Any:
+        return self.payload[key]
+
+    @classmethod
+    def from_value(cls, value: Any) -> Any:
+        """
+        Snapshots a model, leaving anything
+        that isn't one as it is.
+
+        Parameters
+        ----------
+        value: :class:`Any`
+            The model, or any other value.
+
+        Returns
+        -------
+        snapshot: :class:`Any`
+            The snapshot if ``value`` is a model,
+            else ``value``.
+        """
+        payload = getattr(value, "_raw_payload", None)
+        if payload is not None:
+            return cls(type(value).__name__, payload)
+
+        message = getattr(value, "message", None)
+        if message is not None and hasattr(message, "_raw_payload"):
+            # a command context, which only the message of is worth sending across.
+            return cls(type(value).__name__, {"message": cls.from_value(message)})
+        return value
+
+
+class HandlerExecutor:
+    """
+    Runs synchronous, cpu heavy handlers on a thread
+    or process pool so they can't stall the loop,
+    and with it heartbeats and every other event.
+
+    Parameters
+    ----------
+    max_workers: :class:`Optional[int]`
+        The amount of workers of each pool,
+        defaults to the pool's own default.
+
+    Attributes
+    ----------
+    EXECUTOR_TYPES: :class:`Tuple[Optional[str], ...]`
+        The executors a handler can run on,
+        ``None`` meaning the loop itself.
+    """
+
+    EXECUTOR_TYPES = (None, "thread", "process")
+
+    def __init__(self, *, max_workers: Optional[int] = None) -> None:
+        self.max_workers = max_workers
+        self._pools: Dict[str, Executor] = {}
+
+    @classmethod
+    def validate(cls, executor: Optional[str]) -> None:
+        """
+        Raises if ``executor`` isn't a known executor.
+
+        Parameters
+        ----------
+        executor: :class:`Optional[str]`
+            The executor to check.
+        """
+        if executor not in cls.EXECUTOR_TYPES:
+            raise ValueError(
+                "executor must be one of {} not ``{}``".format(
+                    cls.EXECUTOR_TYPES, executor
+                )
+            )
+
+    def _get_pool(self, executor: str) -> Executor:
+        pool = self._pools.get(executor)
+        if pool is None:
+            if executor == "thread":
+                pool = ThreadPoolExecutor(
+                    self.max_workers, thread_name_prefix="discii-handler"
+                )
+            else:
+                # forking a process running a loop and sockets isn't safe, spawn instead.
+                pool = ProcessPoolExecutor(
+                    self.max_workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            self._pools[executor] = pool
+        return pool
+
+    async def run(
+        self, executor: str, func: Callable[..., Any], args: Tuple[Any, ...]
+    ) -> Any:
+        """
+        Runs a function on a pool and waits
+        for its result on the loop.
+
+        Parameters
+        ----------
+        executor: :class:`str`
+            Either ``"thread"`` or ``"process"``. For
+            processes ``func`` must be defined at module
+            level and models are passed as `EventSnapshot`.
+        func: :class:`Callable[..., Any]`
+            The synchronous function to run.
+        args: :class:`Tuple[Any, ...]`
+            The arguments to call ``func`` with.
+
+        Returns
+        -------
+        result: :class:`Any`
+            What ``func`` returned.
+        """
+        if executor == "process":
+            args = tuple(EventSnapshot.from_value(arg) for arg in args)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_pool(executor), func, *args)
+
+    def wrap(self, executor: str, func: Callable[..., Any]) -> Callable[..., Any]:
+        """
+        Wraps a synchronous function in a coroutine
+        function that runs it on a pool.
+
+        Parameters
+        ----------
+        executor: :class:`str`
+            Either ``"thread"`` or ``"process"``.
+        func: :class:`Callable[..., Any]`
+            The synchronous function to wrap.
+
+        Returns
+        -------
+        wrapper: :class:`Callable[..., Coroutine[Any, Any, Any]]`
+            The coroutine function.
+        """
+
+        @functools.wraps(func)
+        async def wrapper(*args: Any) -> Any:
+            return await self.run(executor, func, args)
+
+        return wrapper
+
+    def shutdown(self) -> None:
+        """Shuts every pool down without waiting on running handlers."""
+        for pool in self._pools.values():
+            pool.shutdown(wait=False)
+        self._pools.clear()
@@ -0,0 +1,106 @@
+from typing import Any, Callable, Dict, Optional
+
+
+# fmt: off
+__all__ = (
+    'EventFilter',
+)
+# fmt: on
+
+
+# guild events carry their guild's id as ``id`` instead of ``guild_id``.
+_GUILD_EVENTS = ("GUILD_CREATE", "GUILD_UPDATE", "GUILD_DELETE")
+
+
+def _get_author(data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    # messages have an author, member and reaction events a user or a member.
+    author = data.get("author") or data.get("user")
+    if author is None:
+        author = (data.get("member") or {}).get("user")
+    return author
+
+
+class EventFilter:
+    """
+    Represents the conditions an event's raw data
+    must meet for a handler to run, checked before
+    the data is parsed into models.
+
+    Parameters
+    ----------
+    event_name: :class:`str`
+        The event name the filter is for.
+    guild_id: :class:`Optional[int]`
+        The guild the event must be in.
+    channel_id: :class:`Optional[int]`
+        The channel the event must be in.
+    ignore_bots: :class:`bool`
+        Whether or not to skip events whose
+        author or user is a bot.
+    predicate: :class:`Optional[Callable[[Dict[str, Any]], bool]]`
+        Called with the raw data, the handler
+        only runs if it returns True.
+    """
+
+    __slots__ = ("event_name", "guild_id", "channel_id", "ignore_bots", "predicate")
+
+    def __init__(
+        self,
+        event_name: str,
+        *,
+        guild_id: Optional[int] = None,
+        channel_id: Optional[int] = None,
+        ignore_bots: bool = False,
+        predicate: Optional[Callable[[Dict[str, Any]], bool]] = None,
+    ) -> None:
+        self.event_name = event_name
+        # raw ids are strings, compare against strings instead of converting every event.
+        self.guild_id = None if guild_id is None else str(guild_id)
+        self.channel_id = None if channel_id is None else str(channel_id)
+        self.ignore_bots = ignore_bots
+        self.predicate = predicate
+
+    def __repr__(self) -> str:
+        return "<EventFilter event_name={} guild_id={} channel_id={}>".format(
+            self.event_name, self.guild_id, self.channel_id
+        )
+
+    @classmethod
+    def from_options(cls, event_name: str, **options: Any) -> Optional["EventFilter"]:
+        """
+        Builds a filter, or returns None if
+        none of the options filter anything.
+
+        Parameters
+        ----------
+        event_name: :class:`str`
+            The event name the filter is for.
+        options: :class:`Any`
+            The parameters of `EventFilter`.
+
+        Returns
+        -------
+        event_filter: :class:`Optional[EventFilter]`
+            The filter if any option is set, else None.
+        """
+        if all(value is None or value is False for value in options.values()):
+            return None
+        return cls(event_name, **options)
+
+    def __call__(self, data: Dict[str, Any]) -> bool:
+        if self.guild_id is not None:
+            guild_id = data.get("guild_id")
+            if guild_id is None and self.event_name in _GUILD_EVENTS:
+                guild_id = data.get("id")
+            if guild_id != self.guild_id:
+                return False
+
+        if self.channel_id is not None and data.get("channel_id") != self.channel_id:
+            return False
+
+        if self.ignore_bots:
+            author = _get_author(data)
+            if author is not None and author.get("bot"):
+                return False
+
+        return self.predicate is None or bool(self.predicate(data))
@@ -0,0 +1,146 @@
+import enum
+
+from typing import Dict, Iterable
+
+
+# fmt: off
+__all__ = (
+    'Intents',
+)
+# fmt: on
+
+
+class Intents(enum.IntFlag):
+    """
+    Represents the gateway intents, which decide
+    the events discord sends to the client.
+    Intents can be combined with ``|``.
+
+    Attributes
+    ----------
+    GUILDS
+        Guild, role, channel and thread events.
+    GUILD_MEMBERS
+        Privileged. Member events and member chunking.
+    GUILD_BANS
+        Ban events.
+    GUILD_EMOJIS_AND_STICKERS
+        Emoji and sticker update events.
+    GUILD_INTEGRATIONS
+        Integration events.
+    GUILD_WEBHOOKS
+        Webhook update events.
+    GUILD_INVITES
+        Invite events.
+    GUILD_VOICE_STATES
+        Voice state events.
+    GUILD_PRESENCES
+        Privileged. Presence update events.
+    GUILD_MESSAGES
+        Message events in guilds.
+    GUILD_MESSAGE_REACTIONS
+        Reaction events in guilds.
+    GUILD_MESSAGE_TYPING
+        Typing events in guilds.
+    DIRECT_MESSAGES
+        Message events in dms.
+    DIRECT_MESSAGE_REACTIONS
+        Reaction events in dms.
+    DIRECT_MESSAGE_TYPING
+        Typing events in dms.
+    MESSAGE_CONTENT
+        Privileged. The content of messages.
+    """
+
+    # fmt: off
+    GUILDS                    = 1 << 0 # noqa: ignore
+    GUILD_MEMBERS             = 1 << 1 # noqa: ignore
+    GUILD_BANS                = 1 << 2 # noqa: ignore
+    GUILD_EMOJIS_AND_STICKERS = 1 << 3 # noqa: ignore
+    GUILD_INTEGRATIONS        = 1 << 4 # noqa: ignore
+    GUILD_WEBHOOKS            = 1 << 5 # noqa: ignore
+    GUILD_INVITES             = 1 << 6 # noqa: ignore
+    GUILD_VOICE_STATES        = 1 << 7 # noqa: ignore
+    GUILD_PRESENCES           = 1 << 8 # noqa: ignore
+    GUILD_MESSAGES            = 1 << 9 # noqa: ignore
+    GUILD_MESSAGE_REACTIONS   = 1 << 10 # noqa: ignore
+    GUILD_MESSAGE_TYPING      = 1 << 11 # noqa: ignore
+    DIRECT_MESSAGES           = 1 << 12 # noqa: ignore
+    DIRECT_MESSAGE_REACTIONS  = 1 << 13 # noqa: ignore
+    DIRECT_MESSAGE_TYPING     = 1 << 14 # noqa: ignore
+    MESSAGE_CONTENT           = 1 << 15 # noqa: ignore
+    # fmt: on
+
+    @classmethod
+    def all(cls) -> "Intents":
+        """Returns every intent, including the privileged ones."""
+        value = cls(0)
+        for intent in cls:
+            value |= intent
+        return value
+
+    @classmethod
+    def default(cls) -> "Intents":
+        """Returns every intent apart from ``MESSAGE_CONTENT``."""
+        return cls.all() & ~cls.MESSAGE_CONTENT
+
+    @classmethod
+    def from_events(cls, events: Iterable[str]) -> "Intents":
+        """
+        Works out the minimal intents needed to
+        receive a set of events. ``GUILDS`` is
+        always included as the cache relies on it.
+
+        Parameters
+        ----------
+        events: :class:`Iterable[str]`
+            The event names, for example ``MESSAGE_CREATE``.
+
+        Returns
+        -------
+        intents: :class:`Intents`
+            The intents needed.
+        """
+        intents = cls.GUILDS
+        for event in events:
+            intents |= _EVENT_INTENTS.get(event, cls(0))
+        return intents
+
+
+_EVENT_INTENTS: Dict[str, Intents] = {
+    "GUILD_MEMBER_ADD": Intents.GUILD_MEMBERS,
+    "GUILD_MEMBER_UPDATE": Intents.GUILD_MEMBERS,
+    "GUILD_MEMBER_REMOVE": Intents.GUILD_MEMBERS,
+    "THREAD_MEMBERS_UPDATE": Intents.GUILD_MEMBERS,
+    "GUILD_MEMBERS_CHUNK": Intents.GUILD_MEMBERS,
+    "GUILD_BAN_ADD": Intents.GUILD_BANS,
+    "GUILD_BAN_REMOVE": Intents.GUILD_BANS,
+    "GUILD_EMOJIS_UPDATE": Intents.GUILD_EMOJIS_AND_STICKERS,
+    "GUILD_STICKERS_UPDATE": Intents.GUILD_EMOJIS_AND_STICKERS,
+    "GUILD_INTEGRATIONS_UPDATE": Intents.GUILD_INTEGRATIONS,
+    "INTEGRATION_CREATE": Intents.GUILD_INTEGRATIONS,
+    "INTEGRATION_UPDATE": Intents.GUILD_INTEGRATIONS,
+    "INTEGRATION_DELETE": Intents.GUILD_INTEGRATIONS,
+    "WEBHOOKS_UPDATE": Intents.GUILD_WEBHOOKS,
+    "INVITE_CREATE": Intents.GUILD_INVITES,
+    "INVITE_DELETE": Intents.GUILD_INVITES,
+    "VOICE_STATE_UPDATE": Intents.GUILD_VOICE_STATES,
+    "PRESENCE_UPDATE": Intents.GUILD_PRESENCES,
+    "MESSAGE_CREATE": Intents.GUILD_MESSAGES | Intents.DIRECT_MESSAGES,
+    "MESSAGE_UPDATE": Intents.GUILD_MESSAGES | Intents.DIRECT_MESSAGES,
+    "MESSAGE_DELETE": Intents.GUILD_MESSAGES | Intents.DIRECT_MESSAGES,
+    "MESSAGE_DELETE_BULK": Intents.GUILD_MESSAGES,
+    "MESSAGE_REACTION_ADD": (
+        Intents.GUILD_MESSAGE_REACTIONS | Intents.DIRECT_MESSAGE_REACTIONS
+    ),
+    "MESSAGE_REACTION_REMOVE": (
+        Intents.GUILD_MESSAGE_REACTIONS | Intents.DIRECT_MESSAGE_REACTIONS
+    ),
+    "MESSAGE_REACTION_REMOVE_ALL": (
+        Intents.GUILD_MESSAGE_REACTIONS | Intents.DIRECT_MESSAGE_REACTIONS
+    ),
+    "MESSAGE_REACTION_REMOVE_EMOJI": (
+        Intents.GUILD_MESSAGE_REACTIONS | Intents.DIRECT_MESSAGE_REACTIONS
+    ),
+    "TYPING_START": Intents.GUILD_MESSAGE_TYPING | Intents.DIRECT_MESSAGE_TYPING,
+}
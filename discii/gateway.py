@@ -1,21 +1,28 @@
 from __future__ import annotations
 
 import asyncio
-import json
+import collections
+import random
 import sys
 import time
+import zlib
 
-from aiohttp import ClientWebSocketResponse, WSMsgType
-from typing import Any, Dict, Optional, TYPE_CHECKING
+from aiohttp import ClientError, ClientWebSocketResponse, WSMsgType
+from typing import Any, Deque, Dict, Optional, Tuple, Union, TYPE_CHECKING
 
 from . import __version__
+from .chunker import MemberChunker
+from .errors import GatewayException
+from .flags import Intents
 from .guild import Guild
-from .message import Message
+from .ratelimit import GatewayRateLimiter
 from .user import User
 
 if TYPE_CHECKING:
     from .cache import Cache
     from .client import Client
+    from .codec import JSONCodec
+    from .replay import GatewayRecorder
     from .state import ClientState
 
 
@@ -62,8 +69,61 @@ class DiscordWebSocket:
         a connection issue.
     GUILD_SYNC
         Send only. Requests a guild sync.
+    ZLIB_SUFFIX
+        The bytes every complete zlib-stream
+        message ends with.
+    GATEWAY_URL
+        The default gateway url to connect to.
+    FATAL_CLOSE_CODES
+        The close codes after which the connection
+        can't be resumed or identified again.
+    SESSION_CLOSE_CODES
+        The close codes that invalidate the session,
+        so the next connection has to IDENTIFY.
+    RECONNECT_BACKOFF_BASE
+        The seconds the reconnect backoff starts at.
+    RECONNECT_BACKOFF_MAX
+        The maximum seconds the reconnect backoff
+        waits between two attempts.
+    SEND_LIMIT
+        The amount of commands discord allows
+        per connection every ``SEND_PER`` seconds.
+    SEND_PER
+        The length of the send rate limit window.
+    SEND_RESERVED
+        The commands of every window kept for
+        heartbeats, identifies and resumes.
     token
         The authentication token for the discord api.
+    shard_id
+        The shard this connection is, ``None`` if
+        the client isn't sharded.
+    shard_count
+        The amount of shards the client is split into.
+    intents
+        The intents the session was identified with.
+    recorder
+        The recorder every received message is
+        written to, if any.
+    send_limiter
+        The token bucket queued commands wait on.
+    chunker
+        Requests and tracks the members of
+        the connection's guilds.
+    missed_acks
+        The amount of heartbeats that weren't
+        acknowledged before the next was due.
+    commands_sent
+        The amount of commands sent.
+    last_send_wait
+        The seconds the last queued command
+        waited before being sent.
+    max_send_wait
+        The longest seconds a queued command
+        waited before being sent.
+    total_send_wait
+        The seconds every queued command waited
+        in total, for working out averages.
     _heartbeat_interval
         The seconds to wait before sending another heartbeat.
     """
@@ -84,6 +144,31 @@ class DiscordWebSocket:
     GUILD_SYNC         = 12 # noqa: ignore
     # fmt: on
 
+    ZLIB_SUFFIX = b"\x00\x00\xff\xff"
+
+    GATEWAY_URL = "wss://gateway.discord.gg"
+    FATAL_CLOSE_CODES = (4004, 4010, 4011, 4012, 4013, 4014)
+    SESSION_CLOSE_CODES = (4007, 4009)
+    RECONNECT_BACKOFF_BASE = 1.0
+    RECONNECT_BACKOFF_MAX = 60.0
+    SEND_LIMIT = 120
+    SEND_PER = 60.0
+    SEND_RESERVED = 10
+
+    # events the cache or the connection consume even without a handler.
+    _CACHED_EVENTS = (
+        "READY",
+        "RESUMED",
+        "GUILD_CREATE",
+        "MESSAGE_CREATE",
+        "MESSAGE_DELETE",
+        "GUILD_MEMBERS_CHUNK",
+    )
+    # discord sends dispatches as {"t":..,"s":..,"op":0,"d":..} so the name and
+    # sequence can be read off the start of the frame without decoding ``d``.
+    _DISPATCH_PREFIX = ('{"t":"', '","s":', ",")
+    _DISPATCH_PREFIX_BYTES = (b'{"t":"', b'","s":', b",")
+
     token: str
     _heartbeat_interval: float
     _last_heartbeat: float
@@ -96,79 +181,332 @@ class DiscordWebSocket:
         socket: ClientWebSocketResponse,
         loop: asyncio.AbstractEventLoop,
         cache: "Cache",
+        shard_id: Optional[int] = None,
+        shard_count: Optional[int] = None,
     ) -> None:
         self.client: Client = client
         self.socket: ClientWebSocketResponse = socket
         self.loop: asyncio.AbstractEventLoop = loop
         self.cache: "Cache" = cache
+        self.codec: "JSONCodec" = client.codec
+        self.recorder: Optional["GatewayRecorder"] = client.recorder
+        self.shard_id: Optional[int] = shard_id
+        self.shard_count: Optional[int] = shard_count
 
+        self.gateway_url: str = client.gateway_url or self.GATEWAY_URL
+        self.resume_gateway_url: Optional[str] = None
         self.session_id: Optional[str] = None
+        self.intents: Intents = Intents(0)
         self.sequence: int = 0
         self.latency: float = 0
+        self.missed_acks: int = 0
+
+        self.send_limiter = GatewayRateLimiter(
+            loop, limit=self.SEND_LIMIT, per=self.SEND_PER, reserved=self.SEND_RESERVED
+        )
+        self.commands_sent: int = 0
+        self.last_send_wait: float = 0.0
+        self.max_send_wait: float = 0.0
+        self.total_send_wait: float = 0.0
+        self.chunker = MemberChunker(self)
+
+        metrics = client.metrics
+        self._events_received = metrics.counter(
+            "discii_gateway_events_received_total",
+            "The dispatch events received from the gateway.",
+            ("event",),
+        )
+        self._bytes_received = metrics.counter(
+            "discii_gateway_received_bytes_total",
+            "The bytes received from the gateway, before decompressing.",
+        )
+        self._reconnects = metrics.counter(
+            "discii_gateway_reconnects_total",
+            "The times a gateway connection closed and was reconnected.",
+            ("code",),
+        )
+
+        self._keep_alive: Optional["asyncio.Task[None]"] = None
+        self._handshake: Optional["asyncio.Task[None]"] = None
+        self._awaiting_ack: bool = False
+        self._sender: Optional["asyncio.Task[None]"] = None
+        self._send_queue: Deque[Tuple[str, float]] = collections.deque()
+        self._send_ready = asyncio.Event()
+        self._reconnect_attempts: int = 0
+        self._closed: bool = False
+
+        # one inflater per connection, zlib-stream shares its context across messages.
+        self._inflator = zlib.decompressobj()
+        self._buffer = bytearray()
 
     @classmethod
-    async def from_client(cls, client: "Client") -> DiscordWebSocket:
+    async def from_client(
+        cls,
+        client: "Client",
+        *,
+        shard_id: Optional[int] = None,
+        shard_count: Optional[int] = None,
+    ) -> DiscordWebSocket:
         http = client.http
-        socket = await http.ws_connect("wss://gateway.discord.gg/?v=9&encoding=json")
+        gateway_url = client.gateway_url or cls.GATEWAY_URL
+        socket = await http.ws_connect(cls._build_url(client, gateway_url))
 
-        self = cls(client=client, socket=socket, loop=http.loop, cache=client._cache)
+        self = cls(
+            client=client,
+            socket=socket,
+            loop=http.loop,
+            cache=client._cache,
+            shard_id=shard_id,
+            shard_count=shard_count,
+        )
         self.token = http.token
 
         return self
 
+    @staticmethod
+    def _build_url(client: "Client", gateway_url: str) -> str:
+        url = gateway_url.rstrip("/") + "/?v=9&encoding=json"
+        if client.compress is not None:
+            url += "&compress=" + client.compress
+        return url
+
+    async def _connect(self) -> None:
+        """
+        Opens a new connection to the gateway,
+        resuming through ``resume_gateway_url``
+        if there is a session to resume.
+        """
+        gateway_url = self.gateway_url
+        if self.session_id is not None and self.resume_gateway_url is not None:
+            gateway_url = self.resume_gateway_url
+
+        self.socket = await self.client.http.ws_connect(
+            self._build_url(self.client, gateway_url)
+        )
+        self._inflator = zlib.decompressobj()
+        self._buffer = bytearray()
+        self.send_limiter.reset()
+
+    async def _reconnect(self) -> None:
+        """
+        Reconnects to the gateway, waiting an exponential
+        backoff with jitter between every attempt.
+        """
+        while not self._closed:
+            backoff = min(
+                self.RECONNECT_BACKOFF_MAX,
+                self.RECONNECT_BACKOFF_BASE * 2 ** self._reconnect_attempts,
+            )
+            self._reconnect_attempts += 1
+            await asyncio.sleep(random.uniform(0, backoff))
+            if self._closed:
+                return
+
+            try:
+                await self._connect()
+                return
+            except (ClientError, asyncio.TimeoutError, OSError):
+                continue
+
+    def _reset_session(self) -> None:
+        self.session_id = None
+        self.resume_gateway_url = None
+        self.sequence = 0
+        # the queued commands belong to the old session.
+        self._send_queue.clear()
+        self.chunker.reset()
+
+    def _start_keep_alive(self) -> None:
+        self._stop_keep_alive()
+        self._awaiting_ack = False
+        self._keep_alive = self.loop.create_task(self.keep_alive())
+
+    def _stop_keep_alive(self) -> None:
+        if self._keep_alive is not None and not self._keep_alive.done():
+            self._keep_alive.cancel()
+        self._keep_alive = None
+
+    async def _identify_or_resume(self, delay: float = 0.0) -> None:
+        if delay:
+            await asyncio.sleep(delay)
+        if self.session_id is not None:
+            await self.resume()
+        else:
+            await self.identify()
+        self._start_sender()
+
+    def _start_handshake(self, *, delay: float = 0.0) -> None:
+        # ran aside from the reader so heartbeat acks are still read while
+        # waiting on the identify rate limit of the other shards.
+        self._stop_handshake()
+        self._handshake = self.loop.create_task(self._identify_or_resume(delay))
+
+    def _stop_handshake(self) -> None:
+        if self._handshake is not None and not self._handshake.done():
+            self._handshake.cancel()
+        self._handshake = None
+
+    def _start_sender(self) -> None:
+        self._stop_sender()
+        self._sender = self.loop.create_task(self._send_loop())
+
+    def _stop_sender(self) -> None:
+        if self._sender is not None and not self._sender.done():
+            self._sender.cancel()
+        self._sender = None
+
+    @property
+    def send_queue_depth(self) -> int:
+        """Returns the amount of commands waiting to be sent."""
+        return len(self._send_queue)
+
+    async def close(self, code: int = 1000) -> None:
+        """
+        Closes the connection without reconnecting.
+
+        Parameters
+        ----------
+        code: :class:`int`
+            The close code to send, ``1000``
+            invalidates the session.
+        """
+        self._closed = True
+        self._stop_keep_alive()
+        self._stop_handshake()
+        self._stop_sender()
+        self.chunker.stop()
+        await self.socket.close(code=code)
+
+    async def send(self, payload: Dict[str, Any], *, priority: bool = False) -> None:
+        """
+        Encodes a payload and queues it to be sent
+        through the websocket within the rate limit.
+
+        Parameters
+        ----------
+        payload: :class:`Dict[str, Any]`
+            The payload to send.
+        priority: :class:`bool`
+            Whether or not to skip the queue and send
+            the payload right away, from the reserved
+            part of the rate limit.
+        """
+        data = self.codec.dumps(payload)
+        if priority:
+            self.send_limiter.consume()
+            self.commands_sent += 1
+            await self.socket.send_str(data)
+            return
+
+        self._send_queue.append((data, self.loop.time()))
+        self._send_ready.set()
+
+    async def _send_loop(self) -> None:
+        """
+        Sends the queued payloads in order, waiting
+        on the rate limit between them.
+        """
+        while True:
+            while not self._send_queue:
+                self._send_ready.clear()
+                await self._send_ready.wait()
+
+            await self.send_limiter.acquire()
+            if not self._send_queue:
+                # the session was reset while waiting, which cleared the queue.
+                continue
+            data, queued_at = self._send_queue.popleft()
+            try:
+                await self.socket.send_str(data)
+            except (ClientError, ConnectionError):
+                # the connection dropped, send it once the next one is up.
+                self._send_queue.appendleft((data, queued_at))
+                return
+
+            wait = self.loop.time() - queued_at
+            self.commands_sent += 1
+            self.last_send_wait = wait
+            self.max_send_wait = max(self.max_send_wait, wait)
+            self.total_send_wait += wait
+
     async def identify(self) -> None:
         """Sends the IDENTIFY payload through the websocket."""
-        return await self.socket.send_json(
+        self.intents = self.client._get_intents()
+        payload: Dict[str, Any] = {
+            "token": self.token,
+            "intents": int(self.intents),
+            "properties": {
+                "$os": sys.platform,
+                "$browser": f"Discii {__version__}",
+                "$device": f"Discii {__version__}",
+            },
+        }
+        if self.shard_id is not None and self.shard_count is not None:
+            payload["shard"] = [self.shard_id, self.shard_count]
+
+        await self.client._before_identify(self.shard_id)
+        self.sequence = 0
+        return await self.send({"op": self.IDENTIFY, "d": payload}, priority=True)
+
+    async def resume(self) -> None:
+        """Sends the RESUME payload through the websocket."""
+        return await self.send(
             {
-                "op": self.IDENTIFY,
+                "op": self.RESUME,
                 "d": {
                     "token": self.token,
-                    "intents": 32767,
-                    "properties": {
-                        "$os": sys.platform,
-                        "$browser": f"Discii {__version__}",
-                        "$device": f"Discii {__version__}",
-                    },
+                    "session_id": self.session_id,
+                    "seq": self.sequence,
                 },
-            }
+            },
+            priority=True,
         )
 
+    def _reader_held_back(self) -> bool:
+        # the ack can be sitting unread behind the dispatch backpressure, so
+        # it only counts as missed once the reader had a chance to read it.
+        dispatcher = self.client.dispatcher
+        return dispatcher.blocking or dispatcher.unblocked_at > self._last_heartbeat
+
     async def keep_alive(self) -> None:
         """
-        Keeps the bot alive by
-        sending a heartbeat every 30
-        seconds.
+        Keeps the bot alive by sending a heartbeat
+        every heartbeat interval, reconnecting if
+        the last one wasn't acknowledged.
         """
+        # discord asks for the first heartbeat to be jittered across the interval.
+        await asyncio.sleep(self._heartbeat_interval * random.random())
+
         while True:
-            await self.socket.send_json({"op": self.HEARTBEAT, "d": self.sequence})
+            if self._awaiting_ack and not self._reader_held_back():
+                self.missed_acks += 1
+                # the connection is a zombie, close it with a code that keeps the session
+                # resumable. shielded so stopping the heartbeat can't cancel the close.
+                await asyncio.shield(self.socket.close(code=4000))
+                return
+
+            self._awaiting_ack = True
+            await self.send(
+                {"op": self.HEARTBEAT, "d": self.sequence or None}, priority=True
+            )
             self._last_heartbeat = time.perf_counter()
             await asyncio.sleep(self._heartbeat_interval)
 
-    async def _request_guild_members(self, guild_id: int) -> None:
-        return await self.socket.send_json(
-            {
-                "op": self.REQUEST_MEMBERS,
-                "d": {"guild_id": guild_id, "query": "", "limit": 0},
-            }
-        )
-
-    async def _cache_event(self, name: str, data: Dict[Any, Any]) -> None:
-        events: Dict[str, Dict[str, Any]] = {
-            "GUILD_CREATE": {"o": Guild, "d": data, "f": self.cache.add_guild},
-            "MESSAGE_CREATE": {"o": Message, "d": data, "f": self.cache.add_message},
-            "READY": {"o": User, "d": data.get("user"), "f": self.cache.set_bot_user},
-        }
-
-        if name in events:
-            obj, data, func = events[name].values()
-            func(obj(payload=data, state=self.state))
-
-        if name == "GUILD_CREATE":
-            await self._request_guild_members(data["id"])
+    async def _cache_event(
+        self, name: str, data: Dict[Any, Any], args: Optional[Tuple[Any, ...]]
+    ) -> None:
+        if name == "READY":
+            self.cache.set_bot_user(User(payload=data["user"], state=self.state))
+        elif name == "GUILD_CREATE":
+            self.cache.add_guild(Guild(payload=data, state=self.state))
+            if self.client.chunk_guilds and self.intents & Intents.GUILD_MEMBERS:
+                self.chunker.request(int(data["id"]))
+        elif name == "MESSAGE_CREATE":
+            self.cache.add_message(args[0] if args else data)
+        elif name == "MESSAGE_DELETE":
+            self.cache.remove_message(int(data["id"]))
         elif name == "GUILD_MEMBERS_CHUNK":
-            for _user in data["members"]:
-                user = User(payload=_user["user"], state=self.state)
-                self.cache.add_user(user)
+            self.chunker.receive(data)
 
     async def _parse_message(self, payload: Dict[Any, Any]) -> None:
         """
@@ -185,30 +523,184 @@ class DiscordWebSocket:
         d = payload["d"]
 
         if op == self.HEARTBEAT_ACK:
-            self.latency = time.perf_counter() - self._last_heartbeat
+            if self._awaiting_ack:
+                self._awaiting_ack = False
+                self.latency = time.perf_counter() - self._last_heartbeat
+                self.client.heartbeat_latencies.add(self.latency)
+            return
+        elif op == self.HEARTBEAT:
+            await self.send(
+                {"op": self.HEARTBEAT, "d": self.sequence or None}, priority=True
+            )
             return
-        elif op == self.DISPATCH and t == "READY":
-            self.session_id = d["session_id"]
         elif op == self.HELLO:
-            await self.identify()
+            # heartbeat straight away, identifying can wait on the identify rate limit.
             self._heartbeat_interval = d["heartbeat_interval"] / 1000
-            self.loop.create_task(self.keep_alive())
-        elif op == self.DISPATCH:
-            self.sequence += 1
-            await self.client.dispatch(t, d)
+            self._start_keep_alive()
+            self._start_handshake()
+            return
+        elif op == self.RECONNECT:
+            # any close code other than 1000 and 1001 keeps the session resumable.
+            await self.socket.close(code=4000)
+            return
+        elif op == self.INVALIDATE_SESSION:
+            if not d:
+                self._reset_session()
+            self._start_handshake(delay=random.uniform(1, 5))
+            return
+        elif op != self.DISPATCH:
+            return
+
+        s = payload.get("s")
+        if s is not None:
+            if s <= self.sequence:
+                return  # already received before the session was resumed.
+            self.sequence = s
+        self._events_received.inc(t)
+
+        if t == "READY":
+            self.session_id = d["session_id"]
+            self.resume_gateway_url = d.get("resume_gateway_url")
+            self._reconnect_attempts = 0
+        elif t == "RESUMED":
+            self._reconnect_attempts = 0
+
+        if not self._wants_event(t):
+            self.client.dropped_events[t] += 1
+            return
+
+        # dispatch only parses once a waiter or a handler's filters accept the event,
+        # the cache shares those models or keeps the raw payload to build on lookup.
+        args = await self.client.dispatch(t, d)
+        await self._cache_event(t, d, args)
 
-        await self._cache_event(t, d)
+    def _wants_event(self, name: str) -> bool:
+        return name in self._CACHED_EVENTS or self.client._has_handlers(name)
+
+    def _skip_frame(self, data: Union[str, bytes]) -> bool:
+        """
+        Reads the event name off the start of a raw
+        frame and skips it before decoding if nothing
+        wants the event, keeping the sequence up to date.
+
+        Parameters
+        ----------
+        data: :class:`Union[str, bytes]`
+            The raw frame.
+
+        Returns
+        -------
+        skipped: :class:`bool`
+            Whether or not the frame was skipped.
+        """
+        start, middle, end = (
+            self._DISPATCH_PREFIX if isinstance(data, str) else self._DISPATCH_PREFIX_BYTES
+        )
+        if not data.startswith(start):  # type: ignore
+            return False
+
+        name_end = data.find(middle, 6)  # type: ignore
+        sequence_end = data.find(end, name_end + 6, name_end + 32)  # type: ignore
+        if name_end == -1 or sequence_end == -1:
+            return False
+
+        name = data[6:name_end]
+        if isinstance(name, bytes):
+            name = name.decode("ascii")
+        if self._wants_event(name):
+            return False
+
+        try:
+            sequence = int(data[name_end + 6 : sequence_end])  # noqa: E203
+        except ValueError:
+            return False
+
+        if sequence > self.sequence:
+            self.sequence = sequence
+            self.client.dropped_events[name] += 1
+            self._events_received.inc(name)
+        return True
+
+    def _decompress(self, data: bytes) -> Optional[bytes]:
+        """
+        Buffers a zlib-stream frame and inflates
+        it once the message is complete.
+
+        Parameters
+        ----------
+        data: :class:`bytes`
+            The binary frame received.
+
+        Returns
+        -------
+        message: :class:`Optional[bytes]`
+            The decompressed message, or None
+            if more frames are needed.
+        """
+        self._buffer.extend(data)
+        if self._buffer[-4:] != self.ZLIB_SUFFIX:
+            return None
+
+        message = self._inflator.decompress(self._buffer)
+        self._buffer = bytearray()
+        return message
+
+    async def _receive(self) -> None:
+        """
+        Receives messages from the current connection
+        until it closes.
+        """
+        try:
+            async for message in self.socket:
+                if message.type is WSMsgType.TEXT:
+                    data = message.data
+                    self._bytes_received.inc(amount=len(data))
+                elif message.type is WSMsgType.BINARY:
+                    self._bytes_received.inc(amount=len(message.data))
+                    data = self._decompress(message.data)
+                    if data is None:
+                        continue
+                else:
+                    break
+
+                if self.recorder is not None:
+                    self.recorder.write(data)
+                if not self._skip_frame(data):
+                    await self._parse_message(self.codec.loads(data))
+        except (ClientError, asyncio.TimeoutError):
+            return
 
     async def listen(self) -> None:
         """
         Starts listening in to events being sent
-        from the gateway. Sends IDENTIFY payload.
+        from the gateway, resuming the session
+        whenever the connection drops.
+
+        Raises
+        ------
+        GatewayException
+            The gateway closed the connection with
+            a code that can't be recovered from.
         """
 
         self.state = self.client._get_state()
-        async for message in self.socket:
-            if message.type is WSMsgType.TEXT:
-                await self._parse_message(json.loads(message.data))
-            else:
-                print(f"\n\n\n\n\n W H A T {message}")
+        while not self._closed:
+            await self._receive()
+            self._stop_keep_alive()
+            self._stop_handshake()
+            self._stop_sender()
+            if self._closed:
                 return
+
+            close_code = self.socket.close_code
+            if close_code in self.FATAL_CLOSE_CODES:
+                raise GatewayException(
+                    "The gateway closed the connection with code ``{}``".format(
+                        close_code
+                    )
+                )
+            elif close_code in self.SESSION_CLOSE_CODES:
+                self._reset_session()
+
+            self._reconnects.inc(str(close_code))
+            await self._reconnect()
@@ -1,9 +1,12 @@
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Sequence, TYPE_CHECKING
 
 from .abc import Snowflake
 from .channel import Channel, GuildCategory, TextChannel, VoiceChannel
 from .state import ClientState
 
+if TYPE_CHECKING:
+    from .user import User
+
 
 # fmt: off
 __all__ = (
@@ -33,8 +36,67 @@ class Guild(Snowflake):
         self.channels: List[Optional[Channel]] = [
             self._get_channel(payload=data) for data in payload["channels"]
         ]
+        self._channels: Dict[int, Channel] = {
+            channel.id: channel for channel in self.channels if channel is not None
+        }
         self.member_count = payload["member_count"]
 
+    @property
+    def shard_id(self) -> int:
+        """Returns the id of the shard that
+        receives the guild's events."""
+        return (self.id >> 22) % (self._state.client.shard_count or 1)
+
+    @property
+    def chunked(self) -> bool:
+        """Returns whether or not every member
+        of the guild has been received."""
+        return self.id in self._state.client._get_websocket(self.id).chunker.chunked
+
+    async def chunk(self) -> List["User"]:
+        """
+        Requests every member of the guild
+        and waits until they have all been
+        received and cached.
+
+        Returns
+        -------
+        members: :class:`List[User]`
+            The guild's members.
+        """
+        return await self._state.client._get_websocket(self.id).chunker.chunk(self.id)
+
+    async def query_members(
+        self,
+        prefix: Optional[str] = None,
+        *,
+        limit: int = 5,
+        user_ids: Optional[Sequence[int]] = None,
+    ) -> List["User"]:
+        """
+        Searches the guild's members over the
+        gateway and caches the ones found, without
+        downloading every member.
+
+        Parameters
+        ----------
+        prefix: :class:`Optional[str]`
+            The username prefix to search for.
+        limit: :class:`int`
+            The maximum amount of members to return,
+            between 1 and 100.
+        user_ids: :class:`Optional[Sequence[int]]`
+            The ids of the members to get instead
+            of searching by ``prefix``, up to 100.
+
+        Returns
+        -------
+        members: :class:`List[User]`
+            The members found.
+        """
+        chunker = self._state.client._get_websocket(self.id).chunker
+        return await chunker.query(self.id, query=prefix, limit=limit, user_ids=user_ids)
+
     def _get_channel(self, payload: Dict[Any, Any]) -> Optional[Channel]:
         """
         Gets a channel object from the payload.
@@ -57,19 +119,15 @@ class Guild(Snowflake):
 
     def get_channel(self, channel_id: int) -> Optional[Channel]:
         """
-        Searches through the guilds channels
-        to see whether or not the id matches
-        ``channel_id``.
+        Gets a channel in the guild with
+        an id of ``channel_id``.
 
         Parameters
         ----------
         channel_id: :class:`int`
             The channel id to search for.
         """
-        for channel in self.channels:
-            if isinstance(channel, Channel):
-                if channel.id == channel_id:
-                    return channel
+        return self._channels.get(channel_id)
 
     async def ban(self, user_id: int) -> None:
         """
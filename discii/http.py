@@ -1,5 +1,6 @@
-import json
+import asyncio
 import sys
+import time
 import aiohttp
 
 from asyncio import AbstractEventLoop
@@ -9,7 +10,9 @@ from typing import Dict, Any, TYPE_CHECKING
 from discii.channel import DMChannel
 
 from . import __version__
+from .errors import HTTPException
 from .message import Message
+from .ratelimit import RateLimiter
 from .user import User
 
 if TYPE_CHECKING:
@@ -36,19 +39,38 @@ class Route:
     method: :class:`str`
         The method to send to the api.
     path: :class:`str`
-        The api path to send the data to.
+        The api path to send the data to,
+        with parameters in braces.
+    parameters: :class:`Any`
+        The parameters to format the path with.
 
     Attributes
     ----------
     BASE_URL: :class:`str`
-        The base api url.
+        The default base api url, see
+        the ``api_url`` option of `Client`.
+    path: :class:`str`
+        The formatted path, relative to
+        the base api url.
+    bucket: :class:`str`
+        The method and unformatted path, which
+        identifies the route's rate limit bucket.
+    major_parameters: :class:`str`
+        The parameters that discord rate limits
+        separately, joined together.
     """
 
     BASE_URL = "https://discord.com/api/v9"
 
-    def __init__(self, method: str, path: str) -> None:
+    def __init__(self, method: str, path: str, **parameters: Any) -> None:
         self.method = method
-        self.path = self.BASE_URL + path
+        self.path = path.format(**parameters)
+
+        self.bucket = method + " " + path
+        self.major_parameters = ":".join(
+            str(parameters.get(key, ""))
+            for key in ("channel_id", "guild_id", "webhook_id")
+        )
 
 
 class HTTPClient:
@@ -74,8 +96,23 @@ class HTTPClient:
     user_agent: :class:`str`
         The user agent to pass through authorization
         so that the discord api is less suspicious.
+    ratelimiter: :class:`RateLimiter`
+        The rate limiter that holds requests back
+        before discord would reject them.
+    base_url: :class:`str`
+        The api url every route is relative to.
+    MAX_RETRIES: :class:`int`
+        The amount of times a request is sent
+        before giving up on being rate limited
+        or on discord's server errors.
+    RETRY_BACKOFF: :class:`float`
+        The seconds to wait after the first server
+        error, doubled after every following one.
     """
 
+    MAX_RETRIES = 5
+    RETRY_BACKOFF = 1.0
+
     def __init__(
         self,
         *,
@@ -89,6 +126,20 @@ class HTTPClient:
         self.client: "Client" = client
         self.cache: "Cache" = client._cache
         self._session: ClientSession = session
+        self.base_url: str = client.api_url or Route.BASE_URL
+        self.ratelimiter: RateLimiter = RateLimiter(loop)
+        self._dm_requests: Dict[int, "asyncio.Task[int]"] = {}
+
+        self._requests = client.metrics.counter(
+            "discii_http_requests_total",
+            "The requests sent to the api, including retries.",
+            ("route", "status"),
+        )
+        self._request_latency = client.metrics.histogram(
+            "discii_http_request_duration_seconds",
+            "The seconds until the api responded.",
+            ("route",),
+        )
 
         user_agent = "DiscordBot (https://github.com/CaedenPH/discii {0}) Python/{1[0]}.{1[1]} aiohttp/{2}"
         self.user_agent: str = user_agent.format(
@@ -106,6 +157,10 @@ class HTTPClient:
         """
         return await self._session.ws_connect(gateway_url)
 
+    async def close(self) -> None:
+        """Closes the session."""
+        await self._session.close()
+
     async def request(self, route: Route, **kwargs: Any) -> Any:
         """
         Sends a request through the session
@@ -120,6 +175,12 @@ class HTTPClient:
             to be passed into the request. If found,
             the json param will be auto-converted to
             the headers passed.
+
+        Raises
+        ------
+        HTTPException
+            The request was still rate limited or
+            erroring after ``MAX_RETRIES`` tries.
         """
 
         headers: Dict = {"User-Agent": self.user_agent}
@@ -127,12 +188,64 @@ class HTTPClient:
 
         if "json" in kwargs:
             headers["Content-Type"] = "application/json"
-            kwargs["data"] = json.dumps(kwargs.pop("json"))
+            kwargs["data"] = self.client.codec.dumps(kwargs.pop("json"))
 
         kwargs["headers"] = headers
 
-        async with self._session.request(route.method, route.path, **kwargs) as req:
-            return await req.json()
+        url = self.base_url + route.path
+        bucket = self.ratelimiter.get_bucket(route)
+        try:
+            for tries in range(self.MAX_RETRIES):
+                await self.ratelimiter.wait_global()
+                await bucket.acquire()
+
+                started = time.perf_counter()
+                try:
+                    async with self._session.request(route.method, url, **kwargs) as req:
+                        latency = time.perf_counter() - started
+                        self._request_latency.observe(latency, route.bucket)
+                        self._requests.inc(route.bucket, str(req.status))
+                        self.ratelimiter.update(route, bucket, req.headers)
+
+                        if req.status == 204:
+                            return None
+                        if req.status < 500:
+                            data = await req.json(loads=self.client.codec.loads)
+                            if req.status != 429:
+                                return data
+
+                            retry_after = float(data.get("retry_after", 1))
+                            is_global = data.get("global", False)
+                            if is_global or "X-RateLimit-Global" in req.headers:
+                                await self.ratelimiter.set_global(retry_after)
+                            else:
+                                bucket.exhaust(retry_after)
+                            continue
+                finally:
+                    bucket.settle()
+
+                # a server error, discord is struggling so back off before retrying.
+                await asyncio.sleep(self.RETRY_BACKOFF * 2**tries)
+
+            raise HTTPException(
+                "``{} {}`` still failed after {} tries".format(
+                    route.method, route.path, self.MAX_RETRIES
+                )
+            )
+        finally:
+            self.ratelimiter.release(bucket)
+
+    async def get_bot_gateway(self) -> Dict[str, Any]:
+        """
+        Gets the gateway url, the recommended shard
+        count and the session start limit of the bot.
+
+        Returns
+        -------
+        payload: :class:`Dict[str, Any]`
+            The data returned from the api.
+        """
+        return await self.request(Route("GET", "/gateway/bot"))
 
     async def send_message(self, channel_id: int, **kwargs: Any) -> Message:
         """
@@ -147,9 +260,7 @@ class HTTPClient:
             to be passed into the message.
         """
 
-        route = Route(
-            "POST", "/channels/{channel_id}/messages".format(channel_id=channel_id)
-        )
+        route = Route("POST", "/channels/{channel_id}/messages", channel_id=channel_id)
 
         if kwargs["embeds"]:
             embeds = [embed._to_dict() for embed in kwargs["embeds"]]
@@ -191,9 +302,9 @@ class HTTPClient:
 
         route = Route(
             "PATCH",
-            "/channels/{channel_id}/messages/{message_id}".format(
-                channel_id=channel_id, message_id=message_id
-            ),
+            "/channels/{channel_id}/messages/{message_id}",
+            channel_id=channel_id,
+            message_id=message_id,
         )
 
         if kwargs["embeds"]:
@@ -226,16 +337,17 @@ class HTTPClient:
 
         route = Route(
             "DELETE",
-            "/channels/{channel_id}/messages/{message_id}".format(
-                channel_id=channel_id, message_id=message_id
-            ),
+            "/channels/{channel_id}/messages/{message_id}",
+            channel_id=channel_id,
+            message_id=message_id,
         )
         await self.request(route)
 
     async def create_dm(self, user_id: int) -> int:
         """
         Creates a dm between the client user
-        and the user with id ``user_id``
+        and the user with id ``user_id``. Concurrent
+        calls for the same user share one request.
 
         Parameters
         ----------
@@ -249,16 +361,24 @@ class HTTPClient:
             creating the dm.
         """
 
+        task = self._dm_requests.get(user_id)
+        if task is None:
+            task = self.loop.create_task(self._create_dm(user_id))
+            self._dm_requests[user_id] = task
+            task.add_done_callback(lambda _: self._dm_requests.pop(user_id, None))
+
+        return await asyncio.shield(task)
+
+    async def _create_dm(self, user_id: int) -> int:
         route = Route("POST", "/users/@me/channels")
         payload = await self.request(route, json={"recipient_id": user_id})
 
-        user = User(payload=payload["recipients"][0], state=self.client._get_state())
+        state = self.client._get_state()
+        user = User(payload=payload["recipients"][0], state=state)
         self.cache.add_user(user)
-        self.cache.add_dm_channel(
-            DMChannel(payload=payload, state=self.client._get_state(), user=user)
-        )
+        self.cache.add_dm_channel(DMChannel(payload=payload, state=state, user=user))
 
-        return payload["id"]
+        return int(payload["id"])
 
     async def ban_user(self, *, guild_id: int, user_id: int) -> Any:
         """
@@ -273,10 +393,7 @@ class HTTPClient:
         """
 
         route = Route(
-            "PUT",
-            "/guilds/{guild_id}/bans/{user_id}".format(
-                guild_id=guild_id, user_id=user_id
-            ),
+            "PUT", "/guilds/{guild_id}/bans/{user_id}", guild_id=guild_id, user_id=user_id
         )
         payload = await self.request(route)
         return payload
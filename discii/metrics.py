@@ -0,0 +1,421 @@
+import bisect
+
+from aiohttp import web
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+
+# fmt: off
+__all__ = (
+    'Counter',
+    'Gauge',
+    'Histogram',
+    'MetricsRegistry',
+)
+# fmt: on
+
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    body = ",".join('{}="{}"'.format(n, _escape(str(v))) for n, v in zip(names, values))
+    return "{" + body + "}"
+
+
+class _Metric:
+    TYPE = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str]) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+
+    def _samples(self) -> Iterator[Tuple[str, Labels, Labels, float]]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        """
+        Renders the metric in the
+        prometheus text format.
+
+        Returns
+        -------
+        lines: :class:`List[str]`
+            The lines of the metric.
+        """
+        lines = [
+            "# HELP {} {}".format(self.name, self.documentation.replace("\n", " ")),
+            "# TYPE {} {}".format(self.name, self.TYPE),
+        ]
+        for suffix, names, values, value in self._samples():
+            lines.append(
+                "{}{}{} {}".format(
+                    self.name, suffix, _format_labels(names, values), _format_value(value)
+                )
+            )
+        return lines
+
+
+class Counter(_Metric):
+    """
+    Represents a value that only goes up,
+    one per set of label values.
+
+    Parameters
+    ----------
+    name: :class:`str`
+        The metric name.
+    documentation: :class:`str`
+        What the metric counts.
+    labels: :class:`Sequence[str]`
+        The label names.
+    """
+
+    TYPE = "counter"
+
+    def __init__(
+        self, name: str, documentation: str, labels: Sequence[str] = ()
+    ) -> None:
+        super().__init__(name, documentation, labels)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        """
+        Increments the counter.
+
+        Parameters
+        ----------
+        labels: :class:`str`
+            The label values, in the order
+            of the label names.
+        amount: :class:`float`
+            The amount to increment by.
+        """
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def get(self, *labels: str) -> float:
+        """Returns the value for the label values."""
+        return self._values.get(labels, 0)
+
+    def _samples(self) -> Iterator[Tuple[str, Labels, Labels, float]]:
+        for values, value in self._values.items():
+            yield "", self.labels, values, value
+
+
+class Gauge(_Metric):
+    """
+    Represents a value that goes up and down, either
+    set directly or read from a callback whenever
+    the metrics are rendered.
+
+    Parameters
+    ----------
+    name: :class:`str`
+        The metric name.
+    documentation: :class:`str`
+        What the metric measures.
+    labels: :class:`Sequence[str]`
+        The label names.
+    callback: :class:`Optional[Callable[[], Union[float, Dict[Labels, float]]]]`
+        Called on render to read the value, returning
+        a dict of label values to values if the gauge
+        has labels. Costs nothing until rendered.
+    """
+
+    TYPE = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        *,
+        callback: Optional[Callable[[], Union[float, Dict[Labels, float]]]] = None,
+    ) -> None:
+        super().__init__(name, documentation, labels)
+        self.callback = callback
+        self._values: Dict[Labels, float] = {}
+
+    def set(self, value: float, *labels: str) -> None:
+        """
+        Sets the gauge.
+
+        Parameters
+        ----------
+        value: :class:`float`
+            The value to set.
+        labels: :class:`str`
+            The label values, in the order
+            of the label names.
+        """
+        self._values[labels] = value
+
+    def _samples(self) -> Iterator[Tuple[str, Labels, Labels, float]]:
+        values: Dict[Labels, float] = self._values
+        if self.callback is not None:
+            result = self.callback()
+            values = result if isinstance(result, dict) else {(): result}
+
+        for label_values, value in values.items():
+            yield "", self.labels, label_values, value
+
+
+class Histogram(_Metric):
+    """
+    Represents observations counted into
+    cumulative buckets, along with their sum.
+
+    Parameters
+    ----------
+    name: :class:`str`
+        The metric name.
+    documentation: :class:`str`
+        What the metric observes.
+    labels: :class:`Sequence[str]`
+        The label names.
+    buckets: :class:`Sequence[float]`
+        The upper bounds of the buckets, in seconds
+        for latencies. ``+Inf`` is always added.
+    """
+
+    TYPE = "histogram"
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        *,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        # per label values, the count of every bucket then the sum.
+        self._values: Dict[Labels, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        """
+        Records an observation.
+
+        Parameters
+        ----------
+        value: :class:`float`
+            The observed value.
+        labels: :class:`str`
+            The label values, in the order
+            of the label names.
+        """
+        entry = self._values.get(labels)
+        if entry is None:
+            entry = self._values[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+
+        entry[0][bisect.bisect_left(self.buckets, value)] += 1
+        entry[1][0] += value
+
+    def _samples(self) -> Iterator[Tuple[str, Labels, Labels, float]]:
+        names = self.labels + ("le",)
+        bounds = self.buckets + (float("inf"),)
+        for values, (counts, total) in self._values.items():
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                yield "_bucket", names, values + (_format_value(bound),), cumulative
+            yield "_sum", self.labels, values, total[0]
+            yield "_count", self.labels, values, cumulative
+
+
+class _NullMetric:
+    # handed out by a disabled registry so instrumented code needs no checks.
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        pass
+
+    def set(self, value: float, *labels: str) -> None:
+        pass
+
+    def observe(self, value: float, *labels: str) -> None:
+        pass
+
+    def get(self, *labels: str) -> float:
+        return 0
+
+
+_NULL_METRIC: Any = _NullMetric()
+
+
+class MetricsRegistry:
+    """
+    Holds every metric by name and renders them
+    in the prometheus text format. A disabled registry
+    hands out metrics that do nothing.
+
+    Parameters
+    ----------
+    enabled: :class:`bool`
+        Whether or not to record anything.
+
+    Attributes
+    ----------
+    metrics: :class:`Dict[str, Union[Counter, Gauge, Histogram]]`
+        The registered metrics where the key is the name.
+    url: :class:`Optional[str]`
+        The url the metrics are served at,
+        None if they aren't being served.
+    """
+
+    CONTENT_TYPE = "text/plain; version=0.0.4"
+
+    def __init__(self, *, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self.metrics: Dict[str, Any] = {}
+        self.url: Optional[str] = None
+        self._runner: Optional[web.AppRunner] = None
+
+    def _register(self, cls: Any, name: str, *args: Any, **kwargs: Any) -> Any:
+        if not self.enabled:
+            return _NULL_METRIC
+
+        # several connections register the same metrics, they share them.
+        metric = self.metrics.get(name)
+        if metric is None:
+            metric = self.metrics[name] = cls(name, *args, **kwargs)
+        elif not isinstance(metric, cls):
+            raise ValueError(
+                "metric ``{}`` is already registered as a {}".format(name, metric.TYPE)
+            )
+        return metric
+
+    def counter(
+        self, name: str, documentation: str, labels: Sequence[str] = ()
+    ) -> Counter:
+        """
+        Gets or registers a `Counter`.
+
+        Parameters
+        ----------
+        name: :class:`str`
+            The metric name.
+        documentation: :class:`str`
+            What the metric counts.
+        labels: :class:`Sequence[str]`
+            The label names.
+        """
+        return self._register(Counter, name, documentation, labels)
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        *,
+        callback: Optional[Callable[[], Union[float, Dict[Labels, float]]]] = None,
+    ) -> Gauge:
+        """
+        Gets or registers a `Gauge`.
+
+        Parameters
+        ----------
+        name: :class:`str`
+            The metric name.
+        documentation: :class:`str`
+            What the metric measures.
+        labels: :class:`Sequence[str]`
+            The label names.
+        callback: :class:`Optional[Callable[[], Union[float, Dict[Labels, float]]]]`
+            Called on render to read the value.
+        """
+        return self._register(Gauge, name, documentation, labels, callback=callback)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        *,
+        buckets: Sequence[float] = Histogram.DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """
+        Gets or registers a `Histogram`.
+
+        Parameters
+        ----------
+        name: :class:`str`
+            The metric name.
+        documentation: :class:`str`
+            What the metric observes.
+        labels: :class:`Sequence[str]`
+            The label names.
+        buckets: :class:`Sequence[float]`
+            The upper bounds of the buckets.
+        """
+        return self._register(Histogram, name, documentation, labels, buckets=buckets)
+
+    def render(self) -> str:
+        """
+        Renders every metric in the
+        prometheus text format.
+
+        Returns
+        -------
+        text: :class:`str`
+            The rendered metrics.
+        """
+        lines: List[str] = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    async def _handler(self, request: web.Request) -> web.Response:
+        return web.Response(
+            body=self.render().encode(), headers={"Content-Type": self.CONTENT_TYPE}
+        )
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """
+        Starts serving the metrics over http
+        for prometheus to scrape.
+
+        Parameters
+        ----------
+        host: :class:`str`
+            The host to listen on.
+        port: :class:`int`
+            The port to listen on, ``0`` picks a free one.
+
+        Returns
+        -------
+        url: :class:`str`
+            The url the metrics are served at.
+        """
+        app = web.Application()
+        app.router.add_get("/metrics", self._handler)
+
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+
+        port = self._runner.addresses[0][1]
+        self.url = "http://{}:{}/metrics".format(host, port)
+        return self.url
+
+    async def stop(self) -> None:
+        """Stops serving the metrics."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+            self.url = None
@@ -0,0 +1,432 @@
+import asyncio
+import collections
+import hashlib
+import itertools
+import json
+import random
+import time
+
+from aiohttp import web
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .replay import GatewayRecorder
+
+
+# fmt: off
+__all__ = (
+    'guild_payload',
+    'message_payload',
+    'dispatch_frame',
+    'write_recording',
+    'MockRESTServer',
+)
+# fmt: on
+
+
+DISCORD_EPOCH = 1420070400000
+
+
+def guild_payload(guild_id: int, channel_ids: Sequence[int] = ()) -> Dict[str, Any]:
+    """
+    Builds a ``GUILD_CREATE`` payload with text channels.
+
+    Parameters
+    ----------
+    guild_id: :class:`int`
+        The guild's id.
+    channel_ids: :class:`Sequence[int]`
+        The ids of the guild's text channels.
+
+    Returns
+    -------
+    payload: :class:`Dict[str, Any]`
+        The guild payload.
+    """
+    channels = [
+        {
+            "id": str(channel_id),
+            "type": 0,
+            "position": position,
+            "rate_limit_per_user": 0,
+            "name": "channel-{}".format(position),
+            "topic": None,
+        }
+        for position, channel_id in enumerate(channel_ids)
+    ]
+    return {"id": str(guild_id), "channels": channels, "member_count": 1}
+
+
+def message_payload(
+    message_id: int, channel_id: int, guild_id: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Builds a ``MESSAGE_CREATE`` payload. Its channel
+    must be cached for a `Message` to be built from it.
+
+    Parameters
+    ----------
+    message_id: :class:`int`
+        The message's id.
+    channel_id: :class:`int`
+        The id of the channel the message is sent in.
+    guild_id: :class:`Optional[int]`
+        The id of the channel's guild, if any.
+
+    Returns
+    -------
+    payload: :class:`Dict[str, Any]`
+        The message payload.
+    """
+    payload = {
+        "id": str(message_id),
+        "type": 0,
+        "channel_id": str(channel_id),
+        "author": {"id": "1", "username": "user", "discriminator": "0", "avatar": None},
+        "content": "message {}".format(message_id),
+        "embeds": [],
+        "attachments": [],
+        "mentions": [],
+        "mention_roles": [],
+        "mention_everyone": False,
+        "pinned": False,
+        "tts": False,
+        "timestamp": "2022-01-01T00:00:00+00:00",
+        "edited_timestamp": None,
+    }
+    if guild_id is not None:
+        payload["guild_id"] = str(guild_id)
+    return payload
+
+
+def dispatch_frame(name: str, sequence: int, data: Any) -> Dict[str, Any]:
+    """
+    Builds a dispatch frame in discord's key order,
+    which skipping unhandled events relies on.
+
+    Parameters
+    ----------
+    name: :class:`str`
+        The event name.
+    sequence: :class:`int`
+        The frame's sequence number.
+    data: :class:`Any`
+        The event data.
+
+    Returns
+    -------
+    frame: :class:`Dict[str, Any]`
+        The gateway frame.
+    """
+    return {"t": name, "s": sequence, "op": 0, "d": data}
+
+
+def write_recording(path: str, frames: Sequence[Dict[str, Any]]) -> None:
+    """
+    Writes gateway frames to a recording
+    a `ReplayGateway` can play.
+
+    Parameters
+    ----------
+    path: :class:`str`
+        The file to write the recording to.
+    frames: :class:`Sequence[Dict[str, Any]]`
+        The frames to record, in order.
+    """
+    recorder = GatewayRecorder(path)
+    for frame in frames:
+        recorder.write(json.dumps(frame, separators=(",", ":")))
+    recorder.close()
+
+
+class MockRESTServer:
+    """
+    A local stand in for the discord api that
+    answers the routes `HTTPClient` uses with
+    realistic payloads, so requests can be load
+    tested offline. Point a client at it through
+    ``Client(api_url=...)``.
+
+    Parameters
+    ----------
+    latency: :class:`float`
+        The seconds every response is delayed by.
+    jitter: :class:`float`
+        The maximum random seconds added
+        to the latency.
+    rate_limit: :class:`Optional[Tuple[int, float]]`
+        The requests allowed per bucket and the
+        window in seconds, sent back through the
+        rate limit headers. ``None`` disables it.
+    server_error_rate: :class:`float`
+        The chance of answering a request with
+        a random 5xx error.
+    rate_limit_error_rate: :class:`float`
+        The chance of answering a request with a
+        429 even though its bucket has room.
+    seed: :class:`Optional[int]`
+        Seeds the latency and error injection
+        so runs are repeatable.
+
+    Attributes
+    ----------
+    requests: :class:`int`
+        The amount of requests received.
+    responses: :class:`collections.Counter[int]`
+        The amount of responses sent where
+        the key is the status code.
+    """
+
+    def __init__(
+        self,
+        *,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        rate_limit: Optional[Tuple[int, float]] = (5, 5.0),
+        server_error_rate: float = 0.0,
+        rate_limit_error_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit
+        self.server_error_rate = server_error_rate
+        self.rate_limit_error_rate = rate_limit_error_rate
+
+        self.requests = 0
+        self.responses: "collections.Counter[int]" = collections.Counter()
+
+        self._random = random.Random(seed)
+        self._increment = itertools.count()
+        self._buckets: Dict[Tuple[str, str], List[float]] = {}
+        self._messages: Dict[int, Dict[str, Any]] = {}
+        self._dm_channels: Dict[int, int] = {}
+        self._runner: Optional[web.AppRunner] = None
+
+        self.user = self._user(self._snowflake(), bot=True)
+
+    def _snowflake(self) -> str:
+        timestamp = int(time.time() * 1000) - DISCORD_EPOCH
+        return str((timestamp << 22) | (next(self._increment) & 0xFFF))
+
+    @staticmethod
+    def _user(user_id: str, *, bot: bool = False) -> Dict[str, Any]:
+        return {
+            "id": user_id,
+            "username": "user" + user_id[-4:],
+            "discriminator": "0000",
+            "avatar": None,
+            "bot": bot,
+            "public_flags": 0,
+        }
+
+    @staticmethod
+    def _json(status: int, data: Any, headers: Dict[str, str]) -> web.Response:
+        return web.json_response(data, status=status, headers=headers)
+
+    def _ratelimit(self, request: web.Request) -> Tuple[bool, Dict[str, str]]:
+        if self.rate_limit is None:
+            return True, {}
+
+        limit, window = self.rate_limit
+        resource = request.match_info.route.resource
+        # every route is registered through a resource, the path is a fallback.
+        canonical = request.path if resource is None else resource.canonical
+        route = request.method + " " + canonical
+        major = request.match_info.get("channel_id") or request.match_info.get(
+            "guild_id", ""
+        )
+
+        now = time.time()
+        bucket = self._buckets.setdefault((route, major), [limit, now + window])
+        if now >= bucket[1]:
+            bucket[0], bucket[1] = limit, now + window
+
+        allowed = bucket[0] > 0
+        if allowed:
+            bucket[0] -= 1
+
+        headers = {
+            "X-RateLimit-Bucket": hashlib.sha1(route.encode()).hexdigest()[:16],
+            "X-RateLimit-Limit": str(limit),
+            "X-RateLimit-Remaining": str(int(bucket[0])),
+            "X-RateLimit-Reset": "{:.3f}".format(bucket[1]),
+            "X-RateLimit-Reset-After": "{:.3f}".format(bucket[1] - now),
+        }
+        return allowed, headers
+
+    async def _respond(
+        self,
+        request: web.Request,
+        handler: Callable[[web.Request, Dict[str, str]], Awaitable[web.Response]],
+    ) -> web.Response:
+        self.requests += 1
+
+        delay = self.latency + self._random.uniform(0, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        allowed, headers = self._ratelimit(request)
+        roll = self._random.random()
+
+        if roll < self.server_error_rate:
+            response = self._json(
+                self._random.choice((500, 502, 503)),
+                {"message": "Internal Server Error", "code": 0},
+                {},
+            )
+        elif not allowed or roll < self.server_error_rate + self.rate_limit_error_rate:
+            retry_after = float(headers.get("X-RateLimit-Reset-After", 1.0))
+            if allowed and self.rate_limit is not None:
+                retry_after = self.rate_limit[1] / self.rate_limit[0]
+            response = self._json(
+                429,
+                {
+                    "message": "You are being rate limited.",
+                    "retry_after": retry_after,
+                    "global": False,
+                },
+                headers,
+            )
+        else:
+            response = await handler(request, headers)
+
+        self.responses[response.status] += 1
+        return response
+
+    def _message(self, channel_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "id": self._snowflake(),
+            "type": 0,
+            "channel_id": channel_id,
+            "author": self.user,
+            "content": data.get("content") or "",
+            "embeds": data.get("embeds") or [],
+            "attachments": [],
+            "mentions": [],
+            "mention_roles": [],
+            "mention_everyone": False,
+            "pinned": False,
+            "tts": False,
+            "flags": 0,
+            "components": [],
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "edited_timestamp": None,
+            "message_reference": data.get("message_reference"),
+        }
+
+    async def _send_message(
+        self, request: web.Request, headers: Dict[str, str]
+    ) -> web.Response:
+        message = self._message(request.match_info["channel_id"], await request.json())
+        self._messages[int(message["id"])] = message
+        return self._json(200, message, headers)
+
+    async def _edit_message(
+        self, request: web.Request, headers: Dict[str, str]
+    ) -> web.Response:
+        message = self._messages.get(int(request.match_info["message_id"]))
+        if message is None:
+            return self._json(404, {"message": "Unknown Message", "code": 10008}, headers)
+
+        data = await request.json()
+        message["content"] = data.get("content") or ""
+        message["embeds"] = data.get("embeds") or []
+        message["edited_timestamp"] = datetime.now(timezone.utc).isoformat()
+        return self._json(200, message, headers)
+
+    async def _delete_message(
+        self, request: web.Request, headers: Dict[str, str]
+    ) -> web.Response:
+        if self._messages.pop(int(request.match_info["message_id"]), None) is None:
+            return self._json(404, {"message": "Unknown Message", "code": 10008}, headers)
+        return web.Response(status=204, headers=headers)
+
+    async def _create_dm(self, request: web.Request, headers: Dict[str, str]) -> web.Response:
+        recipient_id = int((await request.json())["recipient_id"])
+        channel_id = self._dm_channels.setdefault(recipient_id, int(self._snowflake()))
+
+        channel = {
+            "id": str(channel_id),
+            "type": 1,
+            "last_message_id": None,
+            "recipients": [self._user(str(recipient_id))],
+        }
+        return self._json(200, channel, headers)
+
+    async def _ban_user(self, request: web.Request, headers: Dict[str, str]) -> web.Response:
+        return web.Response(status=204, headers=headers)
+
+    async def _get_bot_gateway(
+        self, request: web.Request, headers: Dict[str, str]
+    ) -> web.Response:
+        gateway = {
+            "url": "wss://gateway.discord.gg",
+            "shards": 1,
+            "session_start_limit": {
+                "total": 1000,
+                "remaining": 1000,
+                "reset_after": 86400000,
+                "max_concurrency": 1,
+            },
+        }
+        return self._json(200, gateway, headers)
+
+    def _route(
+        self, handler: Callable[[web.Request, Dict[str, str]], Awaitable[web.Response]]
+    ) -> Callable[[web.Request], Awaitable[web.Response]]:
+        return lambda request: self._respond(request, handler)
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """
+        Starts serving the api.
+
+        Parameters
+        ----------
+        host: :class:`str`
+            The host to listen on.
+        port: :class:`int`
+            The port to listen on, ``0`` picks a free one.
+
+        Returns
+        -------
+        url: :class:`str`
+            The api url to pass to the client.
+        """
+        app = web.Application()
+        app.router.add_routes(
+            [
+                web.get("/api/v9/gateway/bot", self._route(self._get_bot_gateway)),
+                web.post(
+                    "/api/v9/channels/{channel_id}/messages",
+                    self._route(self._send_message),
+                ),
+                web.patch(
+                    "/api/v9/channels/{channel_id}/messages/{message_id}",
+                    self._route(self._edit_message),
+                ),
+                web.delete(
+                    "/api/v9/channels/{channel_id}/messages/{message_id}",
+                    self._route(self._delete_message),
+                ),
+                web.post("/api/v9/users/@me/channels", self._route(self._create_dm)),
+                web.put(
+                    "/api/v9/guilds/{guild_id}/bans/{user_id}",
+                    self._route(self._ban_user),
+                ),
+            ]
+        )
+
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+
+        port = self._runner.addresses[0][1]
+        return "http://{}:{}/api/v9".format(host, port)
+
+    async def stop(self) -> None:
+        """Stops serving the api."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
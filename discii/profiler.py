@@ -0,0 +1,301 @@
+import asyncio
+import sys
+import time
+import types
+
+from typing import Any, Callable, Coroutine, Dict, Generator, List, Optional, Tuple
+
+from .stats import LatencyHistogram
+
+
+# fmt: off
+__all__ = (
+    'ProfilerHooks',
+    'HandlerStats',
+    'Profiler',
+)
+# fmt: on
+
+
+class ProfilerHooks:
+    """
+    The interface to forward profiling data to
+    your own metrics. Subclass it, override the
+    methods you need and pass it to `Profiler.add_hook`.
+    Hooks are called on the loop so should be quick.
+    """
+
+    def on_handler(
+        self, event: str, handler: str, duration: float, blocked: float
+    ) -> None:
+        """
+        Called after every handler invocation.
+
+        Parameters
+        ----------
+        event: :class:`str`
+            The event name.
+        handler: :class:`str`
+            The handler's ``__qualname__``.
+        duration: :class:`float`
+            The seconds from start to finish,
+            including the time spent awaiting.
+        blocked: :class:`float`
+            The longest seconds the handler held
+            the loop for without awaiting.
+        """
+
+    def on_stall(self, event: str, handler: str, blocked: float) -> None:
+        """
+        Called when a handler held the loop
+        for longer than the stall threshold.
+
+        Parameters
+        ----------
+        event: :class:`str`
+            The event name.
+        handler: :class:`str`
+            The handler's ``__qualname__``.
+        blocked: :class:`float`
+            The seconds the loop was held for.
+        """
+
+    def on_loop_lag(self, lag: float) -> None:
+        """
+        Called when the loop woke up later than
+        scheduled by more than the stall threshold,
+        whatever held it.
+
+        Parameters
+        ----------
+        lag: :class:`float`
+            The seconds the loop was late by.
+        """
+
+
+class HandlerStats:
+    """
+    Represents the rolling stats of one handler
+    for one event.
+
+    Attributes
+    ----------
+    calls: :class:`int`
+        The amount of times the handler ran.
+    errors: :class:`int`
+        The amount of times the handler raised.
+    stalls: :class:`int`
+        The amount of times the handler held the
+        loop for longer than the stall threshold.
+    max_blocked: :class:`float`
+        The longest seconds the handler held the loop for.
+    durations: :class:`LatencyHistogram`
+        The seconds every invocation took.
+    """
+
+    __slots__ = ("calls", "errors", "stalls", "max_blocked", "durations")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.errors = 0
+        self.stalls = 0
+        self.max_blocked = 0.0
+        self.durations = LatencyHistogram()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns the stats as a dict."""
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "stalls": self.stalls,
+            "max_blocked": self.max_blocked,
+            "p50": self.durations.p50,
+            "p95": self.durations.p95,
+            "p99": self.durations.p99,
+        }
+
+
+class Profiler:
+    """
+    Times every handler invocation, keyed by event
+    name and the handler's ``__qualname__``, and flags
+    handlers that hold the loop for too long.
+
+    Parameters
+    ----------
+    stall_threshold: :class:`float`
+        The seconds a handler can hold the
+        loop for before being flagged.
+    lag_interval: :class:`float`
+        The seconds between two checks of how
+        late the loop is running.
+
+    Attributes
+    ----------
+    handlers: :class:`Dict[Tuple[str, str], HandlerStats]`
+        The stats of every handler where the key is
+        the event name and the handler's qualname.
+    loop_lag: :class:`LatencyHistogram`
+        The seconds the loop woke up late by.
+    hooks: :class:`List[ProfilerHooks]`
+        The hooks the data is forwarded to.
+    """
+
+    def __init__(
+        self, *, stall_threshold: float = 0.1, lag_interval: float = 0.5
+    ) -> None:
+        self.stall_threshold = stall_threshold
+        self.lag_interval = lag_interval
+
+        self.handlers: Dict[Tuple[str, str], HandlerStats] = {}
+        self.loop_lag = LatencyHistogram()
+        self.hooks: List[ProfilerHooks] = []
+
+        self._monitor: Optional["asyncio.Task[None]"] = None
+
+    def add_hook(self, hook: ProfilerHooks) -> None:
+        """
+        Registers a hook.
+
+        Parameters
+        ----------
+        hook: :class:`ProfilerHooks`
+            The hook to forward the data to.
+        """
+        self.hooks.append(hook)
+
+    def _call_hooks(self, name: str, *args: Any) -> None:
+        for hook in self.hooks:
+            try:
+                getattr(hook, name)(*args)
+            except Exception:
+                print("Exception in profiler hook ``{}``".format(name), file=sys.stderr)
+
+    @types.coroutine
+    def _drive(
+        self, coroutine: Coroutine[Any, Any, Any], blocked: List[float]
+    ) -> Generator[Any, Any, Any]:
+        # steps the coroutine like a task would, keeping the longest a step held
+        # the loop in ``blocked[0]`` so long running handlers use constant memory.
+        value: Any = None
+        error: Optional[BaseException] = None
+
+        while True:
+            started = time.perf_counter()
+            try:
+                if error is None:
+                    yielded = coroutine.send(value)
+                else:
+                    yielded = coroutine.throw(error)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                step = time.perf_counter() - started
+                if step > blocked[0]:
+                    blocked[0] = step
+
+            try:
+                value, error = (yield yielded), None
+            except GeneratorExit:
+                coroutine.close()
+                raise
+            except BaseException as exception:
+                value, error = None, exception
+
+    async def run(
+        self, event: str, coro: Callable[..., Coroutine[Any, Any, Any]], *args: Any
+    ) -> Any:
+        """
+        Runs a handler and records its stats.
+
+        Parameters
+        ----------
+        event: :class:`str`
+            The event name.
+        coro: :class:`Callable[..., Coroutine[Any, Any, Any]]`
+            The handler.
+        args: :class:`Any`
+            The arguments to call the handler with.
+
+        Returns
+        -------
+        result: :class:`Any`
+            What the handler returned.
+        """
+        name = getattr(coro, "__qualname__", repr(coro))
+        stats = self.handlers.get((event, name))
+        if stats is None:
+            stats = self.handlers[(event, name)] = HandlerStats()
+
+        longest_step = [0.0]
+        started = time.perf_counter()
+        try:
+            return await self._drive(coro(*args), longest_step)
+        except Exception:
+            stats.errors += 1
+            raise
+        finally:
+            duration = time.perf_counter() - started
+            blocked = longest_step[0]
+
+            stats.calls += 1
+            stats.durations.add(duration)
+            stats.max_blocked = max(stats.max_blocked, blocked)
+            if blocked > self.stall_threshold:
+                stats.stalls += 1
+                print(
+                    "Handler ``{}`` for ``{}`` held the loop for {:.3f}s".format(
+                        name, event, blocked
+                    ),
+                    file=sys.stderr,
+                )
+                self._call_hooks("on_stall", event, name, blocked)
+            self._call_hooks("on_handler", event, name, duration, blocked)
+
+    async def _monitor_lag(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.lag_interval
+            await asyncio.sleep(self.lag_interval)
+
+            lag = max(loop.time() - expected, 0.0)
+            self.loop_lag.add(lag)
+            if lag > self.stall_threshold:
+                self._call_hooks("on_loop_lag", lag)
+
+    def start(self, loop: asyncio.AbstractEventLoop) -> None:
+        """
+        Starts measuring how late the loop runs.
+
+        Parameters
+        ----------
+        loop: :class:`asyncio.AbstractEventLoop`
+            The loop to measure.
+        """
+        if self._monitor is None or self._monitor.done():
+            self._monitor = loop.create_task(self._monitor_lag())
+
+    def stop(self) -> None:
+        """Stops measuring how late the loop runs."""
+        if self._monitor is not None and not self._monitor.done():
+            self._monitor.cancel()
+        self._monitor = None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns the stats of every handler, grouped
+        by event name then handler qualname, and
+        of the loop lag.
+        """
+        handlers: Dict[str, Dict[str, Any]] = {}
+        for (event, name), stats in self.handlers.items():
+            handlers.setdefault(event, {})[name] = stats.to_dict()
+
+        return {
+            "handlers": handlers,
+            "loop_lag": {
+                "p50": self.loop_lag.p50,
+                "p99": self.loop_lag.p99,
+                "max": max(self.loop_lag.samples, default=0.0),
+            },
+        }
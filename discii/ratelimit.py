@@ -0,0 +1,351 @@
+import asyncio
+import collections
+
+from typing import Deque, Dict, Mapping, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .http import Route
+
+
+# fmt: off
+__all__ = (
+    'Bucket',
+    'RateLimiter',
+    'GatewayRateLimiter',
+)
+# fmt: on
+
+
+class Bucket:
+    """
+    Represents a discord rate limit bucket
+    which is shared between every request
+    that hashes to it.
+
+    Parameters
+    ----------
+    loop: :class:`asyncio.AbstractEventLoop`
+        The loop used to measure and sleep
+        until the bucket resets.
+
+    Attributes
+    ----------
+    limit: :class:`Optional[int]`
+        The amount of requests the bucket allows
+        per window. ``None`` until it is learned
+        from a response.
+    remaining: :class:`Optional[int]`
+        The amount of requests left in the
+        current window.
+    reset_at: :class:`float`
+        The loop time at which the current
+        window resets.
+    reset_after: :class:`float`
+        The length of the last window discord
+        sent, in seconds.
+    users: :class:`int`
+        The amount of requests holding the bucket.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.loop = loop
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self.reset_at: float = 0.0
+        self.reset_after: float = 0.0
+        self.users = 0
+
+        self._lock = asyncio.Lock()
+        self._probing = False
+        self._learned = asyncio.Event()
+
+    @property
+    def idle(self) -> bool:
+        """Returns whether or not no request holds the
+        bucket and its window has reset, so forgetting
+        it loses nothing but the learned limit."""
+        return not self.users and self.loop.time() >= self.reset_at
+
+    async def acquire(self) -> None:
+        """
+        Waits until a request can be made in
+        this bucket without being rejected and
+        reserves it. While the bucket is unknown
+        only one request is let through to learn it.
+        """
+        async with self._lock:
+            if self.limit is None:
+                if not self._probing:
+                    self._probing = True
+                    return
+
+                await self._learned.wait()
+                if self.remaining is None:
+                    return
+
+            now = self.loop.time()
+            while (
+                now < self.reset_at and self.remaining is not None and self.remaining <= 0
+            ):
+                await asyncio.sleep(self.reset_at - now)
+                now = self.loop.time()
+
+            if now >= self.reset_at:
+                # the window has passed, assume a new one until a response says otherwise.
+                self.remaining = self.limit
+                self.reset_at = now + self.reset_after
+
+            if self.remaining is not None:
+                self.remaining -= 1
+
+    def settle(self) -> None:
+        """
+        Lets the requests waiting for the bucket
+        to be learned through, whether or not the
+        response had rate limit headers.
+        """
+        self._learned.set()
+
+    def update(self, headers: Mapping[str, str]) -> None:
+        """
+        Updates the bucket from the rate limit
+        headers of a response.
+
+        Parameters
+        ----------
+        headers: :class:`Mapping[str, str]`
+            The response headers.
+        """
+        self.settle()
+        if "X-RateLimit-Remaining" not in headers:
+            return
+
+        now = self.loop.time()
+        remaining = int(headers["X-RateLimit-Remaining"])
+        reset_after = float(headers.get("X-RateLimit-Reset-After", 0))
+        reset_at = now + reset_after
+
+        if self.remaining is not None and now < self.reset_at:
+            # responses can arrive out of order, never give back reserved requests.
+            remaining = min(remaining, self.remaining)
+
+        self.limit = int(headers.get("X-RateLimit-Limit", remaining))
+        self.remaining = remaining
+        self.reset_at = reset_at
+        self.reset_after = max(self.reset_after, reset_after)
+
+    def exhaust(self, retry_after: float) -> None:
+        """
+        Marks the bucket as empty until
+        ``retry_after`` seconds have passed.
+
+        Parameters
+        ----------
+        retry_after: :class:`float`
+            The seconds until the bucket resets.
+        """
+        self.remaining = 0
+        self.reset_at = self.loop.time() + retry_after
+        self.settle()
+
+
+class RateLimiter:
+    """
+    Manages the rate limit buckets of every
+    route and the global rate limit.
+
+    Routes are mapped to the bucket hash that
+    discord sends through ``X-RateLimit-Bucket``
+    once it has been learned, and buckets are
+    kept per major parameter. Idle buckets are
+    forgotten every ``SWEEP_INTERVAL`` seconds, so
+    one off major parameters don't pile up.
+
+    Parameters
+    ----------
+    loop: :class:`asyncio.AbstractEventLoop`
+        The loop that all tasks run from.
+
+    Attributes
+    ----------
+    SWEEP_INTERVAL: :class:`float`
+        The seconds between two sweeps
+        of the idle buckets.
+    """
+
+    SWEEP_INTERVAL = 60.0
+
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.loop = loop
+
+        self._bucket_hashes: Dict[str, str] = {}
+        self._buckets: Dict[str, Bucket] = {}
+        self._next_sweep = loop.time() + self.SWEEP_INTERVAL
+        self._global = asyncio.Event()
+        self._global.set()
+
+    def _sweep(self) -> None:
+        for key, bucket in list(self._buckets.items()):
+            if bucket.idle:
+                del self._buckets[key]
+
+    def _get_key(self, route: "Route") -> str:
+        bucket_hash = self._bucket_hashes.get(route.bucket, route.bucket)
+        return bucket_hash + ":" + route.major_parameters
+
+    def get_bucket(self, route: "Route") -> Bucket:
+        """
+        Gets the bucket that a route belongs to and
+        holds it until `RateLimiter.release` is called.
+
+        Parameters
+        ----------
+        route: :class:`Route`
+            The route to get the bucket of.
+
+        Returns
+        -------
+        bucket: :class:`Bucket`
+            The bucket, created if it didn't exist.
+        """
+        if self.loop.time() >= self._next_sweep:
+            self._sweep()
+            self._next_sweep = self.loop.time() + self.SWEEP_INTERVAL
+
+        key = self._get_key(route)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = Bucket(self.loop)
+        bucket.users += 1
+        return bucket
+
+    def release(self, bucket: Bucket) -> None:
+        """
+        Stops holding a bucket once a request
+        is done with it.
+
+        Parameters
+        ----------
+        bucket: :class:`Bucket`
+            The bucket returned by `RateLimiter.get_bucket`.
+        """
+        bucket.users -= 1
+
+    def update(self, route: "Route", bucket: Bucket, headers: Mapping[str, str]) -> None:
+        """
+        Updates a bucket from the headers of a
+        response and learns the route's bucket hash.
+
+        Parameters
+        ----------
+        route: :class:`Route`
+            The route the request was sent to.
+        bucket: :class:`Bucket`
+            The bucket the request was made in.
+        headers: :class:`Mapping[str, str]`
+            The response headers.
+        """
+        bucket_hash = headers.get("X-RateLimit-Bucket")
+        if bucket_hash is not None and self._bucket_hashes.get(route.bucket) != bucket_hash:
+            # the bucket moves to its hashed key instead of being kept under both.
+            old_key = self._get_key(route)
+            if self._buckets.get(old_key) is bucket:
+                del self._buckets[old_key]
+
+            self._bucket_hashes[route.bucket] = bucket_hash
+            self._buckets.setdefault(self._get_key(route), bucket)
+
+        bucket.update(headers)
+
+    async def wait_global(self) -> None:
+        """Waits until the global rate limit is over."""
+        await self._global.wait()
+
+    async def set_global(self, retry_after: float) -> None:
+        """
+        Holds back every request until
+        ``retry_after`` seconds have passed.
+
+        Parameters
+        ----------
+        retry_after: :class:`float`
+            The seconds until the global
+            rate limit is over.
+        """
+        self._global.clear()
+        try:
+            await asyncio.sleep(retry_after)
+        finally:
+            self._global.set()
+
+
+class GatewayRateLimiter:
+    """
+    A token bucket for the commands sent over one
+    gateway connection, where every token is given
+    back ``per`` seconds after it was taken, so no
+    window of ``per`` seconds goes over ``limit``.
+
+    Parameters
+    ----------
+    loop: :class:`asyncio.AbstractEventLoop`
+        The loop used to measure and sleep
+        until a token is given back.
+    limit: :class:`int`
+        The amount of commands allowed per window.
+    per: :class:`float`
+        The length of the window in seconds.
+    reserved: :class:`int`
+        The tokens only priority commands,
+        like heartbeats, can take.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        *,
+        limit: int = 120,
+        per: float = 60.0,
+        reserved: int = 0,
+    ) -> None:
+        self.loop = loop
+        self.limit = limit
+        self.per = per
+        self.reserved = reserved
+
+        self._taken: Deque[float] = collections.deque()
+
+    @property
+    def tokens(self) -> int:
+        """Returns the tokens left, including the reserved ones."""
+        self._refill()
+        return max(self.limit - len(self._taken), 0)
+
+    def reset(self) -> None:
+        """Gives every token back, for a new connection."""
+        self._taken.clear()
+
+    def _refill(self) -> float:
+        now = self.loop.time()
+        while self._taken and self._taken[0] <= now - self.per:
+            self._taken.popleft()
+        return now
+
+    def consume(self) -> None:
+        """
+        Takes a token for a priority command
+        without waiting, dipping into the
+        reserved tokens if needed.
+        """
+        self._taken.append(self._refill())
+
+    async def acquire(self) -> None:
+        """
+        Waits until a token outside of the
+        reserved ones is left and takes it.
+        """
+        now = self._refill()
+        while len(self._taken) >= self.limit - self.reserved:
+            await asyncio.sleep(self._taken[0] + self.per - now)
+            now = self._refill()
+        self._taken.append(now)
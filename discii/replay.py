@@ -0,0 +1,243 @@
+import asyncio
+import gzip
+import json
+import struct
+import time
+import zlib
+
+from aiohttp import WSMsgType, web
+from typing import IO, Any, Dict, Iterator, List, Optional, Tuple, Union
+
+
+# fmt: off
+__all__ = (
+    'GatewayRecorder',
+    'read_recording',
+    'ReplayGateway',
+)
+# fmt: on
+
+
+MAGIC = b"DSCR\x01"
+RECORD_HEADER = struct.Struct(">dI")
+
+
+class GatewayRecorder:
+    """
+    Records every gateway message received with
+    the seconds since recording started, to a
+    compact length-prefixed file.
+
+    Parameters
+    ----------
+    path: :class:`str`
+        The file to write the recording to.
+    compress: :class:`bool`
+        Whether or not to gzip the file.
+
+    Attributes
+    ----------
+    count: :class:`int`
+        The amount of messages recorded.
+    """
+
+    def __init__(self, path: str, *, compress: bool = False) -> None:
+        self.path = path
+        self.compress = compress
+        self.count = 0
+
+        self._file: Union[IO[bytes], gzip.GzipFile] = (
+            gzip.open(path, "wb") if compress else open(path, "wb")
+        )
+        self._file.write(MAGIC)
+        self._started = time.monotonic()
+
+    def write(self, data: Union[str, bytes]) -> None:
+        """
+        Records a message.
+
+        Parameters
+        ----------
+        data: :class:`Union[str, bytes]`
+            The decompressed json message.
+        """
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+
+        timestamp = time.monotonic() - self._started
+        self._file.write(RECORD_HEADER.pack(timestamp, len(data)))
+        self._file.write(data)
+        self.count += 1
+
+    def close(self) -> None:
+        """Flushes and closes the recording."""
+        self._file.close()
+
+
+def read_recording(path: str) -> Iterator[Tuple[float, bytes]]:
+    """
+    Reads a recording made by `GatewayRecorder`.
+
+    Parameters
+    ----------
+    path: :class:`str`
+        The recording to read, gzipped or not.
+
+    Yields
+    ------
+    record: :class:`Tuple[float, bytes]`
+        The seconds since recording started
+        and the json message.
+    """
+    with open(path, "rb") as file:
+        gzipped = file.read(2) == b"\x1f\x8b"
+
+    with (gzip.open(path, "rb") if gzipped else open(path, "rb")) as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError("``{}`` is not a discii gateway recording".format(path))
+
+        while True:
+            header = file.read(RECORD_HEADER.size)
+            if len(header) < RECORD_HEADER.size:
+                return
+
+            timestamp, length = RECORD_HEADER.unpack(header)
+            yield timestamp, file.read(length)
+
+
+class ReplayGateway:
+    """
+    A local gateway that plays a recording back
+    to every client that connects and identifies,
+    for repeatable offline benchmarks. Point a client
+    at it through ``Client(gateway_url=...)``.
+
+    Parameters
+    ----------
+    path: :class:`str`
+        The recording made by `GatewayRecorder`.
+    speed: :class:`Optional[float]`
+        How many times faster than real time to
+        play the recording back. ``None`` plays it
+        as fast as possible.
+    heartbeat_interval: :class:`float`
+        The heartbeat interval in seconds sent
+        in HELLO.
+
+    Attributes
+    ----------
+    sent: :class:`int`
+        The amount of messages played back.
+    finished: :class:`asyncio.Event`
+        Set once a playback finishes.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        speed: Optional[float] = 1.0,
+        heartbeat_interval: float = 41.25,
+    ) -> None:
+        self.speed = speed
+        self.heartbeat_interval = heartbeat_interval
+        self.sent = 0
+        self.finished = asyncio.Event()
+
+        # connection bookkeeping frames are answered live instead of replayed.
+        self._records: List[Tuple[float, bytes]] = [
+            (timestamp, data)
+            for timestamp, data in read_recording(path)
+            if json.loads(data)["op"] == 0
+        ]
+        self._runner: Optional[web.AppRunner] = None
+
+    async def _send(
+        self, socket: web.WebSocketResponse, data: bytes, deflator: Optional[Any]
+    ) -> None:
+        if deflator is None:
+            await socket.send_str(data.decode("utf-8"))
+        else:
+            data = deflator.compress(data) + deflator.flush(zlib.Z_SYNC_FLUSH)
+            await socket.send_bytes(data)
+
+    async def _play(self, socket: web.WebSocketResponse, deflator: Optional[Any]) -> None:
+        started = time.monotonic()
+        first = self._records[0][0] if self._records else 0.0
+
+        for timestamp, data in self._records:
+            if self.speed is not None:
+                delay = (timestamp - first) / self.speed - (time.monotonic() - started)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+            await self._send(socket, data, deflator)
+            self.sent += 1
+
+        self.finished.set()
+
+    async def _handler(self, request: web.Request) -> web.WebSocketResponse:
+        socket = web.WebSocketResponse(max_msg_size=0)
+        await socket.prepare(request)
+
+        deflator = None
+        if request.query.get("compress") == "zlib-stream":
+            deflator = zlib.compressobj()
+
+        hello: Dict[str, Any] = {
+            "op": 10,
+            "t": None,
+            "s": None,
+            "d": {"heartbeat_interval": int(self.heartbeat_interval * 1000)},
+        }
+        await self._send(socket, json.dumps(hello).encode(), deflator)
+
+        play: Optional["asyncio.Task[None]"] = None
+        async for message in socket:
+            if message.type is not WSMsgType.TEXT:
+                break
+
+            op = json.loads(message.data)["op"]
+            if op == 1:
+                ack = {"op": 11, "t": None, "s": None, "d": None}
+                await self._send(socket, json.dumps(ack).encode(), deflator)
+            elif op in (2, 6) and play is None:
+                loop = asyncio.get_running_loop()
+                play = loop.create_task(self._play(socket, deflator))
+
+        if play is not None:
+            play.cancel()
+        return socket
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """
+        Starts serving the gateway.
+
+        Parameters
+        ----------
+        host: :class:`str`
+            The host to listen on.
+        port: :class:`int`
+            The port to listen on, ``0`` picks a free one.
+
+        Returns
+        -------
+        url: :class:`str`
+            The gateway url to pass to the client.
+        """
+        app = web.Application()
+        app.router.add_get("/", self._handler)
+
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+
+        port = self._runner.addresses[0][1]
+        return "ws://{}:{}".format(host, port)
+
+    async def stop(self) -> None:
+        """Stops serving the gateway."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
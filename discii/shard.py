@@ -0,0 +1,168 @@
+import asyncio
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple, TYPE_CHECKING
+
+from .client import Client
+from .gateway import DiscordWebSocket
+
+if TYPE_CHECKING:
+    from .cluster import ClusterClient
+
+
+# fmt: off
+__all__ = (
+    'AutoShardedClient',
+)
+# fmt: on
+
+
+class AutoShardedClient(Client):
+    """
+    Represents a Client that splits its guilds
+    between several gateway connections, all ran
+    off of one loop with a shared cache and
+    http client.
+
+    Parameters
+    ----------
+    shard_count: :class:`Optional[int]`
+        The amount of shards to split the bot
+        into. If not passed the amount discord
+        recommends is used.
+    shard_ids: :class:`Optional[Sequence[int]]`
+        The shards this client should run. Defaults
+        to every shard.
+    options: :class:`Any`
+        The options passed through to `Client`.
+
+    Attributes
+    ----------
+    shards: :class:`Dict[int, DiscordWebSocket]`
+        The connected shards where the key
+        is the shard id.
+    max_concurrency: :class:`int`
+        The amount of shards that can identify
+        at the same time.
+    cluster: :class:`Optional[ClusterClient]`
+        The IPC channel to the other clusters when
+        ran through a `ClusterManager`, else None.
+    IDENTIFY_INTERVAL: :class:`float`
+        The seconds between two identifies
+        in the same concurrency bucket.
+    """
+
+    IDENTIFY_INTERVAL = 5.0
+
+    def __init__(
+        self,
+        *,
+        shard_count: Optional[int] = None,
+        shard_ids: Optional[Sequence[int]] = None,
+        **options: Any,
+    ) -> None:
+        super().__init__(**options)
+
+        if shard_ids is not None and shard_count is None:
+            raise TypeError("shard_count must be passed along with shard_ids.")
+
+        self.shard_count: Optional[int] = shard_count
+        self.shard_ids: Optional[Sequence[int]] = shard_ids
+        self.shards: Dict[int, DiscordWebSocket] = {}
+        self.max_concurrency: int = 1
+        self.cluster: Optional["ClusterClient"] = None
+
+        self._identify_locks: Dict[int, asyncio.Lock] = {}
+        self._last_identify: Dict[int, float] = {}
+
+    @property
+    def latency(self) -> float:
+        """Returns the average latency of every shard."""
+        if not self.shards:
+            return 0.0
+        return sum(ws.latency for ws in self.shards.values()) / len(self.shards)
+
+    @property
+    def latencies(self) -> List[Tuple[int, float]]:
+        """Returns a list of every shard id and its latency."""
+        return [(shard_id, ws.latency) for shard_id, ws in self.shards.items()]
+
+    def shard_id_for(self, guild_id: int) -> int:
+        """
+        Gets the shard that a guild belongs to.
+
+        Parameters
+        ----------
+        guild_id: :class:`int`
+            The guild's id.
+
+        Returns
+        -------
+        shard_id: :class:`int`
+            The id of the shard that receives
+            the guild's events.
+        """
+        return (guild_id >> 22) % (self.shard_count or 1)
+
+    def get_shard(self, shard_id: int) -> Optional[DiscordWebSocket]:
+        """
+        Attempts to get a shard with an id
+        of ``shard_id``.
+
+        Parameters
+        ----------
+        shard_id: :class:`int`
+            The shard's id.
+
+        Returns
+        -------
+        shard: :class:`DiscordWebSocket`
+            The shard if connected, else None
+        """
+        return self.shards.get(shard_id)
+
+    def _get_websocket(self, guild_id: Optional[int] = None) -> DiscordWebSocket:
+        if guild_id is None:
+            return self.ws
+        return self.shards[self.shard_id_for(guild_id)]
+
+    def _get_websockets(self) -> List[DiscordWebSocket]:
+        return list(self.shards.values())
+
+    async def _before_identify(self, shard_id: Optional[int]) -> None:
+        if self.cluster is not None:
+            # the supervisor spaces identifies out across every cluster.
+            return await self.cluster.before_identify(shard_id or 0)
+
+        bucket = (shard_id or 0) % self.max_concurrency
+        lock = self._identify_locks.setdefault(bucket, asyncio.Lock())
+
+        async with lock:
+            last_identify = self._last_identify.get(bucket)
+            if last_identify is not None:
+                delay = last_identify + self.IDENTIFY_INTERVAL - self.loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            self._last_identify[bucket] = self.loop.time()
+
+    async def connect(self) -> None:
+        """
+        Connects every shard to the gateway and
+        listens to them until they all close.
+        """
+        shard_count = self.shard_count
+        if shard_count is None:
+            data = await self.http.get_bot_gateway()
+            shard_count = self.shard_count = data["shards"]
+            self.max_concurrency = data["session_start_limit"]["max_concurrency"]
+
+        shard_ids = self.shard_ids or range(shard_count)
+
+        for shard_id in shard_ids:
+            self.shards[shard_id] = await DiscordWebSocket.from_client(
+                self, shard_id=shard_id, shard_count=shard_count
+            )
+
+        self.ws = self.shards[shard_ids[0]]
+        self._state.ws = self.ws
+
+        await asyncio.gather(*(ws.listen() for ws in self.shards.values()))
@@ -1,4 +1,4 @@
-from typing import TYPE_CHECKING
+from typing import Optional, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from .cache import Cache
@@ -17,7 +17,8 @@ __all__ = (
 class ClientState:
     """
     Represents a State with all the properties
-    of `Client`.
+    of `Client`. A single state is owned by the
+    client and shared between every model.
 
     Parameters
     ----------
@@ -29,20 +30,23 @@ class ClientState:
     loop: :class:`asyncio.AbstractEventLoop`
         The loop that all tasks and events are
         ran off of.
-    ws: :class:`DiscordWebSocket`
-        The websocket connected to the gateway.
+    ws: :class:`Optional[DiscordWebSocket]`
+        The websocket connected to the gateway,
+        set once the connection is made.
     cache: :class:`Cache`
         The cache which holds all the data sent
         and received from the gateway.
     """
 
+    __slots__ = ("client", "http", "loop", "ws", "cache")
+
     def __init__(
         self,
         client: "Client",
         *,
         http: "HTTPClient",
-        ws: "DiscordWebSocket",
-        cache: "Cache"
+        cache: "Cache",
+        ws: Optional["DiscordWebSocket"] = None
     ) -> None:
         self.client = client
         self.http = http
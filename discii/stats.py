@@ -0,0 +1,95 @@
+import collections
+
+from typing import Deque, List
+
+
+# fmt: off
+__all__ = (
+    'LatencyHistogram',
+)
+# fmt: on
+
+
+class LatencyHistogram:
+    """
+    Keeps the most recent latency samples
+    to work out percentiles over them.
+
+    Parameters
+    ----------
+    size: :class:`int`
+        The amount of samples to keep, older
+        ones are dropped as new ones come in.
+
+    Attributes
+    ----------
+    count: :class:`int`
+        The amount of samples ever added.
+    """
+
+    def __init__(self, size: int = 1000) -> None:
+        self.size = size
+        self.count = 0
+        self._samples: Deque[float] = collections.deque(maxlen=size)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def __repr__(self) -> str:
+        return "<LatencyHistogram samples={} p50={:.4f} p99={:.4f}>".format(
+            len(self), self.p50, self.p99
+        )
+
+    @property
+    def samples(self) -> List[float]:
+        """Returns the kept samples, oldest first."""
+        return list(self._samples)
+
+    def add(self, sample: float) -> None:
+        """
+        Adds a sample.
+
+        Parameters
+        ----------
+        sample: :class:`float`
+            The latency in seconds.
+        """
+        self._samples.append(sample)
+        self.count += 1
+
+    def percentile(self, percentile: float) -> float:
+        """
+        Gets a percentile of the kept samples.
+
+        Parameters
+        ----------
+        percentile: :class:`float`
+            The percentile between 0 and 100.
+
+        Returns
+        -------
+        latency: :class:`float`
+            The latency in seconds, ``0.0``
+            if there are no samples.
+        """
+        if not self._samples:
+            return 0.0
+
+        samples = sorted(self._samples)
+        index = int(len(samples) * percentile / 100)
+        return samples[min(index, len(samples) - 1)]
+
+    @property
+    def p50(self) -> float:
+        """Returns the median latency."""
+        return self.percentile(50)
+
+    @property
+    def p95(self) -> float:
+        """Returns the 95th percentile latency."""
+        return self.percentile(95)
+
+    @property
+    def p99(self) -> float:
+        """Returns the 99th percentile latency."""
+        return self.percentile(99)
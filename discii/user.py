@@ -1,8 +1,9 @@
-from typing import Any, Dict, TYPE_CHECKING
+from typing import Any, Dict, Optional, TYPE_CHECKING
 
 from .abc import Messageable
 
 if TYPE_CHECKING:
+    from .channel import DMChannel
     from .state import ClientState
 
 
@@ -34,7 +35,17 @@ class User(Messageable):
         self.id = int(payload["id"])
         self.bot: bool = payload.get("bot", False)
 
+    @property
+    def dm_channel(self) -> Optional["DMChannel"]:
+        """Returns the cached dm channel with the
+        user. If it hasn't been created it will return None."""
+        return self._state.cache.get_user_dm_channel(self.id)
+
     async def _get_channel_id(self) -> int:
+        channel = self.dm_channel
+        if channel is not None:
+            return channel.id
+
         channel_id = await self._state.http.create_dm(self.id)
         return channel_id
 
@@ -0,0 +1,223 @@
+import asyncio
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .filters import _get_author
+
+
+# fmt: off
+__all__ = (
+    'EventWaiters',
+)
+# fmt: on
+
+
+def _author_id(data: Dict[str, Any]) -> Optional[str]:
+    author = _get_author(data)
+    return author.get("id") if author else None
+
+
+_KEY_GETTERS: Dict[str, Callable[[Dict[str, Any]], Optional[str]]] = {
+    "channel_id": lambda data: data.get("channel_id"),
+    "guild_id": lambda data: data.get("guild_id"),
+    "author_id": _author_id,
+}
+
+
+class _Waiter:
+    __slots__ = ("event", "future", "check", "raw", "keys")
+
+    def __init__(
+        self,
+        event: str,
+        future: "asyncio.Future[Any]",
+        check: Optional[Callable[..., bool]],
+        raw: bool,
+        keys: Tuple[Tuple[str, str], ...],
+    ) -> None:
+        self.event = event
+        self.future = future
+        self.check = check
+        self.raw = raw
+        self.keys = keys
+
+
+class EventWaiters:
+    """
+    Holds the pending `Client.wait_for` calls, indexed
+    by event name and by their first key, so an event
+    only runs the checks of the waiters that could want it.
+
+    Attributes
+    ----------
+    KEYS: :class:`Tuple[str, ...]`
+        The keys waiters can be indexed by, read
+        from the raw event data.
+    """
+
+    KEYS = tuple(_KEY_GETTERS)
+
+    def __init__(self) -> None:
+        # an insertion ordered dict as a set, so removing on timeout is O(1).
+        self._unkeyed: Dict[str, Dict[_Waiter, None]] = {}
+        self._keyed: Dict[str, Dict[str, Dict[str, Dict[_Waiter, None]]]] = {}
+        self._counts: Dict[str, int] = {}
+
+    def __contains__(self, event: str) -> bool:
+        return event in self._counts
+
+    def __len__(self) -> int:
+        return sum(self._counts.values())
+
+    def add(
+        self,
+        event: str,
+        future: "asyncio.Future[Any]",
+        *,
+        check: Optional[Callable[..., bool]] = None,
+        raw: bool = False,
+        keys: Optional[Dict[str, Any]] = None,
+    ) -> _Waiter:
+        """
+        Registers a waiter.
+
+        Parameters
+        ----------
+        event: :class:`str`
+            The event name to wait for.
+        future: :class:`asyncio.Future`
+            The future to set the event's result on.
+        check: :class:`Optional[Callable[..., bool]]`
+            Called with the event's arguments, the
+            waiter is only resolved if it returns True.
+        raw: :class:`bool`
+            Whether or not to pass the raw data
+            instead of the parsed models.
+        keys: :class:`Optional[Dict[str, Any]]`
+            The values the raw data must have, where the
+            key is one of `EventWaiters.KEYS`. The first
+            one is what the waiter is indexed by.
+
+        Returns
+        -------
+        waiter: :class:`_Waiter`
+            The waiter, to pass to `EventWaiters.remove`.
+        """
+        pairs: List[Tuple[str, str]] = []
+        for key, value in (keys or {}).items():
+            if key not in _KEY_GETTERS:
+                raise ValueError(
+                    "key must be one of {} not ``{}``".format(self.KEYS, key)
+                )
+            if value is not None:
+                pairs.append((key, str(value)))
+
+        waiter = _Waiter(event, future, check, raw, tuple(pairs))
+        if waiter.keys:
+            key, value = waiter.keys[0]
+            fields = self._keyed.setdefault(event, {})
+            fields.setdefault(key, {}).setdefault(value, {})[waiter] = None
+        else:
+            self._unkeyed.setdefault(event, {})[waiter] = None
+        self._counts[event] = self._counts.get(event, 0) + 1
+        return waiter
+
+    def remove(self, waiter: _Waiter) -> None:
+        """
+        Unregisters a waiter, doing nothing
+        if it was already removed.
+
+        Parameters
+        ----------
+        waiter: :class:`_Waiter`
+            The waiter returned by `EventWaiters.add`.
+        """
+        event = waiter.event
+        if waiter.keys:
+            key, value = waiter.keys[0]
+            fields = self._keyed.get(event, {})
+            values = fields.get(key, {})
+            waiters = values.get(value)
+            if waiters is None or waiter not in waiters:
+                return
+            del waiters[waiter]
+
+            # drop the empty indexes so lookups stay exact.
+            if not waiters:
+                del values[value]
+                if not values:
+                    del fields[key]
+                    if not fields:
+                        del self._keyed[event]
+        else:
+            waiters = self._unkeyed.get(event)
+            if waiters is None or waiter not in waiters:
+                return
+            del waiters[waiter]
+            if not waiters:
+                del self._unkeyed[event]
+
+        self._counts[event] -= 1
+        if not self._counts[event]:
+            del self._counts[event]
+
+    def match(self, event: str, data: Dict[str, Any]) -> List[_Waiter]:
+        """
+        Gets the waiters of an event whose keys
+        match the raw data, without running checks.
+
+        Parameters
+        ----------
+        event: :class:`str`
+            The event name.
+        data: :class:`Dict[str, Any]`
+            The raw event data.
+
+        Returns
+        -------
+        waiters: :class:`List[_Waiter]`
+            The matching waiters, in the order added
+            within the index they were found in.
+        """
+        candidates: List[_Waiter] = list(self._unkeyed.get(event, ()))
+        for key, values in self._keyed.get(event, {}).items():
+            value = _KEY_GETTERS[key](data)
+            if value is not None:
+                candidates.extend(values.get(str(value), ()))
+
+        matched: List[_Waiter] = []
+        for waiter in candidates:
+            if waiter.future.done():
+                continue
+            if all(_KEY_GETTERS[key](data) == value for key, value in waiter.keys[1:]):
+                matched.append(waiter)
+        return matched
+
+    def resolve(self, waiter: _Waiter, args: Tuple[Any, ...]) -> bool:
+        """
+        Runs a waiter's check and resolves it if it
+        passes, or fails it if the check raises.
+
+        Parameters
+        ----------
+        waiter: :class:`_Waiter`
+            The waiter to resolve.
+        args: :class:`Tuple[Any, ...]`
+            The event's arguments.
+
+        Returns
+        -------
+        resolved: :class:`bool`
+            Whether or not the waiter was resolved
+            and removed.
+        """
+        try:
+            if waiter.check is not None and not waiter.check(*args):
+                return False
+        except Exception as error:
+            waiter.future.set_exception(error)
+        else:
+            waiter.future.set_result(args[0] if len(args) == 1 else args)
+
+        self.remove(waiter)
+        return True
@@ -0,0 +1,49 @@
+import asyncio
+
+import pytest
+
+from typing import Any, Callable, Dict, List
+
+from discii import mock
+
+
+# the most seconds a test coroutine can take before it is failed.
+TIMEOUT = 30.0
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_pyfunc_call(pyfuncitem: Any) -> Any:
+    # runs ``async def`` tests on a fresh loop, without needing a plugin.
+    if not asyncio.iscoroutinefunction(pyfuncitem.obj):
+        return None
+
+    names = pyfuncitem._fixtureinfo.argnames
+    arguments = {name: pyfuncitem.funcargs[name] for name in names}
+    asyncio.run(asyncio.wait_for(pyfuncitem.obj(**arguments), TIMEOUT))
+    return True
+
+
+@pytest.fixture
+def dispatch_frame() -> Callable[[str, int, Dict[str, Any]], Dict[str, Any]]:
+    return mock.dispatch_frame
+
+
+@pytest.fixture
+def guild_payload() -> Callable[..., Dict[str, Any]]:
+    return mock.guild_payload
+
+
+@pytest.fixture
+def message_payload() -> Callable[..., Dict[str, Any]]:
+    return mock.message_payload
+
+
+@pytest.fixture
+def record(tmp_path: Any) -> Callable[[List[Dict[str, Any]]], str]:
+    # writes dispatch frames to a recording for a `ReplayGateway` to play.
+    def write(frames: List[Dict[str, Any]]) -> str:
+        path = str(tmp_path / "recording.bin")
+        mock.write_recording(path, frames)
+        return path
+
+    return write
@@ -0,0 +1,41 @@
+import multiprocessing
+import time
+
+import discii
+
+
+def test_query_to_a_dead_cluster_does_not_stop_the_supervisor() -> None:
+    manager = discii.ClusterManager(
+        discii.AutoShardedClient, "x" * 59, shard_count=2, clusters=2, restart_delay=60
+    )
+    context = multiprocessing.get_context("spawn")
+
+    # cluster 0 is alive, cluster 1 exited without its sentinel being handled yet.
+    alive, alive_worker = context.Pipe()
+    dead, dead_worker = context.Pipe()
+    dead_worker.close()
+    running = context.Process(target=time.sleep, args=(30,))
+    running.start()
+    exited = context.Process(target=int)
+    exited.start()
+    exited.join()
+
+    manager._connections = {0: alive, 1: dead}
+    manager.processes = {0: running, 1: exited}
+
+    try:
+        manager._handle_message(0, ("query", 1, "guild_count", (), 10.0))
+        assert alive_worker.recv() == ("query", (0, 1), "guild_count", ())
+        assert manager._pending[0, 1]["waiting"] == {0}
+
+        # cluster 0 answering finishes the query without the dead cluster.
+        manager._handle_message(0, ("response", (0, 1), 0, 5))
+        assert alive_worker.recv() == ("result", 1, {0: 5})
+
+        manager.poll(timeout=1.0)
+        assert 1 not in manager._connections
+        assert 1 in manager._restart_at
+        assert manager._broken == set()
+    finally:
+        running.terminate()
+        running.join()
@@ -0,0 +1,62 @@
+import asyncio
+import json
+import zlib
+
+import discii
+
+from typing import Any, Callable, Dict, List
+
+from discii.gateway import DiscordWebSocket
+from discii.replay import ReplayGateway
+
+
+async def test_zlib_stream_receives_every_event(
+    record: Callable[..., str], dispatch_frame: Callable[..., Dict[str, Any]]
+) -> None:
+    path = record(
+        [dispatch_frame("TYPING_START", index + 1, {"n": index}) for index in range(50)]
+    )
+    gateway = ReplayGateway(path, speed=None)
+    client = discii.Client(gateway_url=await gateway.start(), compress="zlib-stream")
+    received: List[int] = []
+    done = asyncio.Event()
+
+    @client.on("TYPING_START", raw=True)
+    async def typing_start(data: Dict[str, Any]) -> None:
+        received.append(data["n"])
+        if len(received) == 50:
+            done.set()
+
+    await client.login("x" * 59)
+    connect = asyncio.ensure_future(client.connect())
+    try:
+        await asyncio.wait_for(done.wait(), 10)
+    finally:
+        await client.close()
+        await connect
+        await gateway.stop()
+
+    assert received == list(range(50))
+
+
+async def test_zlib_stream_buffers_split_frames() -> None:
+    client = discii.Client(compress="zlib-stream")
+    await client.login("x" * 59)
+    ws = DiscordWebSocket(
+        client=client,
+        socket=None,  # type: ignore
+        loop=client.http.loop,
+        cache=client._cache,
+    )
+
+    deflator = zlib.compressobj()
+    messages = [json.dumps({"op": 11, "n": index}).encode() for index in range(3)]
+    try:
+        for message in messages:
+            data = deflator.compress(message) + deflator.flush(zlib.Z_SYNC_FLUSH)
+            middle = len(data) // 2
+            # the first half doesn't end in the suffix, so nothing is inflated yet.
+            assert ws._decompress(data[:middle]) is None
+            assert ws._decompress(data[middle:]) == message
+    finally:
+        await client.http.close()
@@ -0,0 +1,117 @@
+import asyncio
+
+import discii
+import pytest
+
+from typing import Any, Callable, Dict, List
+
+from discii.replay import ReplayGateway
+
+
+class RecordingClient(discii.Client):
+    def __init__(self, **options: Any) -> None:
+        super().__init__(**options)
+        self.received: List[Any] = []
+        self.done = asyncio.Event()
+
+    def receive(self, value: Any) -> None:
+        self.received.append(value)
+        # three listeners, the method and the raw listener.
+        if len(self.received) == 5:
+            self.done.set()
+
+    async def on_message_create(self, message: discii.Message) -> None:
+        self.receive(message)
+
+
+@pytest.fixture
+def constructions(monkeypatch: Any) -> List[discii.Message]:
+    # every message built while the test runs.
+    built: List[discii.Message] = []
+    message_init = discii.Message.__init__
+
+    def counting_init(self: discii.Message, **kwargs: Any) -> None:
+        built.append(self)
+        message_init(self, **kwargs)
+
+    monkeypatch.setattr(discii.Message, "__init__", counting_init)
+    return built
+
+
+async def test_message_is_built_once_and_shared(
+    constructions: List[discii.Message],
+    record: Callable[..., str],
+    dispatch_frame: Callable[..., Dict[str, Any]],
+    guild_payload: Callable[..., Dict[str, Any]],
+    message_payload: Callable[..., Dict[str, Any]],
+) -> None:
+    path = record(
+        [
+            dispatch_frame("GUILD_CREATE", 1, guild_payload(10, [20])),
+            dispatch_frame("MESSAGE_CREATE", 2, message_payload(30, 20, 10)),
+        ]
+    )
+    gateway = ReplayGateway(path, speed=None)
+    client = RecordingClient(gateway_url=await gateway.start())
+
+    for _ in range(3):
+
+        @client.on("MESSAGE_CREATE")
+        async def message_create(message: discii.Message) -> None:
+            client.receive(message)
+
+    @client.on("MESSAGE_CREATE", raw=True)
+    async def raw_message_create(data: Dict[str, Any]) -> None:
+        client.receive(data)
+
+    await client.login("x" * 59)
+    connect = asyncio.ensure_future(client.connect())
+    try:
+        await asyncio.wait_for(client.done.wait(), 10)
+    finally:
+        await client.close()
+        await connect
+        await gateway.stop()
+
+    assert len(constructions) == 1
+    (message,) = constructions
+
+    parsed = [value for value in client.received if not isinstance(value, dict)]
+    raw = [value for value in client.received if isinstance(value, dict)]
+    assert len(parsed) == 4
+    assert all(value is message for value in parsed)
+    assert len(raw) == 1 and raw[0]["id"] == "30"
+    assert client._cache.get_message(30) is message
+    assert len(constructions) == 1
+
+
+async def test_deleted_message_is_never_built(
+    constructions: List[discii.Message],
+    record: Callable[..., str],
+    dispatch_frame: Callable[..., Dict[str, Any]],
+    guild_payload: Callable[..., Dict[str, Any]],
+    message_payload: Callable[..., Dict[str, Any]],
+) -> None:
+    path = record(
+        [
+            dispatch_frame("GUILD_CREATE", 1, guild_payload(10, [20])),
+            dispatch_frame("MESSAGE_CREATE", 2, message_payload(30, 20, 10)),
+            dispatch_frame("MESSAGE_DELETE", 3, {"id": "30", "channel_id": "20"}),
+        ]
+    )
+    gateway = ReplayGateway(path, speed=None)
+    client = discii.Client(gateway_url=await gateway.start())
+
+    await client.login("x" * 59)
+    connect = asyncio.ensure_future(client.connect())
+    try:
+        while getattr(client, "ws", None) is None or client.ws.sequence < 3:
+            await asyncio.sleep(0.01)
+    finally:
+        await client.close()
+        await connect
+        await gateway.stop()
+
+    # nothing listens to either event, so the cached payload is dropped unbuilt.
+    assert constructions == []
+    assert client._cache.get_message(30) is None
@@ -0,0 +1,56 @@
+import asyncio
+
+import discii
+import pytest
+
+from typing import Any, Callable, Dict
+
+from discii.dispatcher import Dispatcher
+from discii.replay import ReplayGateway
+
+
+@pytest.mark.parametrize(
+    "limits",
+    [
+        {"max_in_flight": 0},
+        {"max_queued": 0},
+        {"event_concurrency": {"MESSAGE_CREATE": 0}},
+    ],
+)
+def test_limits_must_be_at_least_one(limits: Dict[str, Any]) -> None:
+    with pytest.raises(ValueError):
+        Dispatcher(discii.Client(), **limits)
+
+
+async def test_backpressure_does_not_miss_heartbeat_acks(
+    record: Callable[..., str], dispatch_frame: Callable[..., Dict[str, Any]]
+) -> None:
+    events = 20
+    path = record(
+        [dispatch_frame("TYPING_START", index + 1, {"n": index}) for index in range(events)]
+    )
+    gateway = ReplayGateway(path, speed=None, heartbeat_interval=0.05)
+    client = discii.Client(
+        gateway_url=await gateway.start(), max_in_flight=1, max_queued=2
+    )
+    handled = 0
+
+    @client.on("TYPING_START", raw=True)
+    async def typing_start(data: Dict[str, Any]) -> None:
+        nonlocal handled
+        # the backlog holds the gateway reader back for several heartbeats.
+        await asyncio.sleep(0.04)
+        handled += 1
+
+    await client.login("x" * 59)
+    connect = asyncio.ensure_future(client.connect())
+    try:
+        while handled < events:
+            await asyncio.sleep(0.01)
+    finally:
+        await client.close()
+        await connect
+        await gateway.stop()
+
+    assert client.missed_heartbeat_acks == 0
+    assert client.dispatcher.dropped == {}
@@ -0,0 +1,89 @@
+import asyncio
+import json
+import threading
+import time
+
+import discii
+
+from typing import Any, Callable, Dict, List, Optional
+
+from discii.replay import GatewayRecorder, ReplayGateway
+
+
+HEARTBEAT_INTERVAL = 0.05
+BLOCKING = 0.15
+EVENTS = 4
+
+
+def _record_spaced(path: str, frames: List[Dict[str, Any]], spacing: float) -> None:
+    # writes the frames ``spacing`` seconds apart without sleeping between them.
+    recorder = GatewayRecorder(path)
+    for frame in frames:
+        recorder.write(json.dumps(frame, separators=(",", ":")))
+        recorder._started -= spacing
+    recorder.close()
+
+
+async def _ack_gaps(path: str, executor: Optional[str]) -> List[float]:
+    # replays events to a handler that blocks, returning the seconds between acks.
+    gateway = ReplayGateway(path, heartbeat_interval=HEARTBEAT_INTERVAL)
+    client = discii.Client(gateway_url=await gateway.start())
+    acks: List[float] = []
+    handled = 0
+    lock = threading.Lock()
+
+    add = client.heartbeat_latencies.add
+
+    def add_ack(sample: float) -> None:
+        acks.append(time.perf_counter())
+        add(sample)
+
+    client.heartbeat_latencies.add = add_ack  # type: ignore
+
+    def block(data: Dict[str, Any]) -> None:
+        nonlocal handled
+        time.sleep(BLOCKING)
+        with lock:
+            handled += 1
+
+    if executor is None:
+
+        @client.on("TYPING_START", raw=True)
+        async def typing_start(data: Dict[str, Any]) -> None:
+            block(data)
+
+    else:
+        client.on("TYPING_START", raw=True, executor=executor)(block)
+
+    await client.login("x" * 59)
+    connect = asyncio.ensure_future(client.connect())
+    try:
+        while handled < EVENTS:
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(HEARTBEAT_INTERVAL * 2)
+    finally:
+        await client.close()
+        await connect
+        await gateway.stop()
+
+    return [after - before for before, after in zip(acks, acks[1:])]
+
+
+async def test_thread_handler_does_not_delay_heartbeats(
+    tmp_path: Any, dispatch_frame: Callable[..., Dict[str, Any]]
+) -> None:
+    path = str(tmp_path / "recording.bin")
+    # the leading unhandled event gives the heartbeats time to start.
+    frames = [dispatch_frame("PRESENCE_UPDATE", 1, {})]
+    frames += [
+        dispatch_frame("TYPING_START", index + 2, {"n": index}) for index in range(EVENTS)
+    ]
+    _record_spaced(path, frames, BLOCKING + HEARTBEAT_INTERVAL)
+
+    # a blocking coroutine holds up the loop, and with it the heartbeats.
+    blocked = await _ack_gaps(path, None)
+    assert max(blocked) >= BLOCKING
+
+    threaded = await _ack_gaps(path, "thread")
+    assert len(threaded) > len(blocked)
+    assert max(threaded) < BLOCKING
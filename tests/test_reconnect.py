@@ -0,0 +1,114 @@
+import asyncio
+import json
+
+import discii
+
+from aiohttp import WSMsgType, web
+from typing import Any, Dict, List, Optional
+
+from discii.gateway import DiscordWebSocket
+
+
+class ResumingGateway:
+    """
+    Plays numbered ``TYPING_START`` events, dropping the
+    first connection mid-stream and, on RESUME, replaying
+    from a few events before the resumed sequence so the
+    client sees duplicates.
+    """
+
+    def __init__(self, events: int, *, drop_after: int, overlap: int = 3) -> None:
+        # sequence 1 is READY, the events follow.
+        self.events = [
+            {"t": "TYPING_START", "s": index + 2, "op": 0, "d": {"n": index}}
+            for index in range(events)
+        ]
+        self.drop_after = drop_after
+        self.overlap = overlap
+        self.identifies = 0
+        self.resumes: List[int] = []
+        self.url = ""
+        self._runner: Optional[web.AppRunner] = None
+
+    async def _handler(self, request: web.Request) -> web.WebSocketResponse:
+        socket = web.WebSocketResponse()
+        await socket.prepare(request)
+        hello = {"heartbeat_interval": 45000}
+        await socket.send_json({"op": 10, "t": None, "s": None, "d": hello})
+
+        async for message in socket:
+            if message.type is not WSMsgType.TEXT:
+                break
+
+            payload = json.loads(message.data)
+            if payload["op"] == 1:
+                await socket.send_json({"op": 11, "t": None, "s": None, "d": None})
+            elif payload["op"] == 2:
+                self.identifies += 1
+                ready = {
+                    "session_id": "session",
+                    "resume_gateway_url": self.url,
+                    "user": {"id": "1"},
+                }
+                await socket.send_json({"t": "READY", "s": 1, "op": 0, "d": ready})
+                for event in self.events[: self.drop_after]:
+                    await socket.send_json(event)
+
+                # drop the connection without a close frame, like a network failure.
+                assert request.transport is not None
+                request.transport.abort()
+                break
+            elif payload["op"] == 6:
+                sequence = payload["d"]["seq"]
+                self.resumes.append(sequence)
+                for event in self.events:
+                    if event["s"] > sequence - self.overlap:
+                        await socket.send_json(event)
+                await socket.send_json({"t": "RESUMED", "s": None, "op": 0, "d": {}})
+        return socket
+
+    async def start(self) -> str:
+        app = web.Application()
+        app.router.add_get("/", self._handler)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+
+        self.url = "ws://127.0.0.1:{}".format(self._runner.addresses[0][1])
+        return self.url
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+
+async def test_resume_after_drop_loses_and_repeats_nothing(monkeypatch: Any) -> None:
+    monkeypatch.setattr(DiscordWebSocket, "RECONNECT_BACKOFF_BASE", 0.01)
+    gateway = ResumingGateway(40, drop_after=15)
+    client = discii.Client(gateway_url=await gateway.start())
+    received: List[int] = []
+    done = asyncio.Event()
+
+    @client.on("TYPING_START", raw=True)
+    async def typing_start(data: Dict[str, Any]) -> None:
+        received.append(data["n"])
+        if len(received) == len(gateway.events):
+            done.set()
+
+    await client.login("x" * 59)
+    connect = asyncio.ensure_future(client.connect())
+    try:
+        await asyncio.wait_for(done.wait(), 10)
+        # let any duplicate that would slip through be dispatched.
+        await asyncio.sleep(0.1)
+    finally:
+        await client.close()
+        await connect
+        await gateway.stop()
+
+    assert received == list(range(len(gateway.events)))
+    assert gateway.identifies == 1
+    # READY and the events sent before the drop.
+    assert gateway.resumes == [1 + gateway.drop_after]
+    assert client.ws.sequence == gateway.events[-1]["s"]
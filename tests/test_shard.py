@@ -0,0 +1,125 @@
+import asyncio
+import json
+
+import discii
+
+from aiohttp import WSMsgType, web
+from typing import Any, Callable, Dict, List, Optional
+
+
+class ShardingGateway:
+    """
+    Accepts several shards, answering every identify
+    with READY, a ``GUILD_CREATE`` for a guild that routes
+    to the shard and as many ``TYPING_START`` events as
+    the shard's id, so every shard ends on its own sequence.
+    """
+
+    def __init__(
+        self,
+        guild_payload: Callable[..., Dict[str, Any]],
+        *,
+        heartbeat_interval: float = 0.05,
+    ) -> None:
+        self.guild_payload = guild_payload
+        self.heartbeat_interval = heartbeat_interval
+        self.identifies: List[List[int]] = []
+        self.guilds: Dict[int, int] = {}
+        self._runner: Optional[web.AppRunner] = None
+
+    @staticmethod
+    def guild_id_for(shard_id: int, shard_count: int) -> int:
+        return (shard_count * 10 + shard_id) << 22
+
+    async def _handler(self, request: web.Request) -> web.WebSocketResponse:
+        socket = web.WebSocketResponse()
+        await socket.prepare(request)
+        hello = {"heartbeat_interval": int(self.heartbeat_interval * 1000)}
+        await socket.send_json({"op": 10, "t": None, "s": None, "d": hello})
+
+        async for message in socket:
+            if message.type is not WSMsgType.TEXT:
+                break
+
+            payload = json.loads(message.data)
+            if payload["op"] == 1:
+                await socket.send_json({"op": 11, "t": None, "s": None, "d": None})
+            elif payload["op"] == 2:
+                shard_id, shard_count = payload["d"]["shard"]
+                self.identifies.append([shard_id, shard_count])
+
+                ready = {
+                    "session_id": "session-{}".format(shard_id),
+                    "resume_gateway_url": None,
+                    "user": {"id": "1"},
+                }
+                guild_id = self.guild_id_for(shard_id, shard_count)
+                self.guilds[guild_id] = shard_id
+                frames = [
+                    ("READY", ready),
+                    ("GUILD_CREATE", self.guild_payload(guild_id, [guild_id + 1])),
+                ]
+                frames += [("TYPING_START", {"n": index}) for index in range(shard_id)]
+                for sequence, (name, data) in enumerate(frames, 1):
+                    await socket.send_json({"t": name, "s": sequence, "op": 0, "d": data})
+        return socket
+
+    async def start(self) -> str:
+        app = web.Application()
+        app.router.add_get("/", self._handler)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        return "ws://127.0.0.1:{}".format(self._runner.addresses[0][1])
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+
+async def test_shards_identify_route_and_track_separately(
+    monkeypatch: Any, guild_payload: Callable[..., Dict[str, Any]]
+) -> None:
+    monkeypatch.setattr(discii.AutoShardedClient, "IDENTIFY_INTERVAL", 0)
+    gateway = ShardingGateway(guild_payload)
+    client = discii.AutoShardedClient(gateway_url=await gateway.start(), shard_count=3)
+
+    def finished() -> bool:
+        if len(client.shards) < 3:
+            return False
+        return all(
+            ws.sequence == shard_id + 2 and ws.latency > 0
+            for shard_id, ws in client.shards.items()
+        )
+
+    await client.login("x" * 59)
+    connect = asyncio.ensure_future(client.connect())
+    try:
+        while not finished():
+            await asyncio.sleep(0.01)
+    finally:
+        await client.close()
+        await connect
+        await gateway.stop()
+
+    assert sorted(gateway.identifies) == [[0, 3], [1, 3], [2, 3]]
+
+    for guild_id, shard_id in gateway.guilds.items():
+        assert client.shard_id_for(guild_id) == shard_id
+        assert client._get_websocket(guild_id).shard_id == shard_id
+        assert client.get_guild(guild_id) is not None
+
+    # READY, GUILD_CREATE and one TYPING_START per shard id.
+    assert {shard_id: ws.sequence for shard_id, ws in client.shards.items()} == {
+        0: 2,
+        1: 3,
+        2: 4,
+    }
+    assert {ws.session_id for ws in client.shards.values()} == {
+        "session-0",
+        "session-1",
+        "session-2",
+    }
+    assert [shard_id for shard_id, _ in client.latencies] == [0, 1, 2]
+    assert all(latency > 0 for _, latency in client.latencies)
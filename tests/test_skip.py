@@ -0,0 +1,55 @@
+import asyncio
+import json
+
+import discii
+
+from typing import Any, Callable, Dict, List
+
+from discii.codec import JSONCodec
+from discii.replay import ReplayGateway
+
+
+async def test_skipped_frames_keep_sequence_and_heartbeats(
+    record: Callable[..., str], dispatch_frame: Callable[..., Dict[str, Any]]
+) -> None:
+    frames = []
+    for index in range(30):
+        name = "PRESENCE_UPDATE" if index % 2 else "TYPING_START"
+        frames.append(dispatch_frame(name, index + 1, {"n": index}))
+    frames.append(dispatch_frame("INTERACTION_CREATE", 31, {"n": 30}))
+
+    gateway = ReplayGateway(record(frames), speed=None, heartbeat_interval=0.05)
+    decoded: List[Dict[str, Any]] = []
+
+    def loads(data: Any) -> Any:
+        payload = json.loads(data)
+        decoded.append(payload)
+        return payload
+
+    codec = JSONCodec("json", loads=loads, dumps=json.dumps)
+    client = discii.Client(gateway_url=await gateway.start(), codec=codec)
+    handled = asyncio.Event()
+
+    @client.on("INTERACTION_CREATE", raw=True)
+    async def interaction_create(data: Dict[str, Any]) -> None:
+        handled.set()
+
+    await client.login("x" * 59)
+    connect = asyncio.ensure_future(client.connect())
+    try:
+        await asyncio.wait_for(handled.wait(), 10)
+        while client.ws.latency == 0:
+            await asyncio.sleep(0.01)
+    finally:
+        await client.close()
+        await connect
+        await gateway.stop()
+
+    assert client.ws.sequence == 31
+    assert client.dropped_events == {"TYPING_START": 15, "PRESENCE_UPDATE": 15}
+    assert [payload["t"] for payload in decoded if payload["op"] == 0] == [
+        "INTERACTION_CREATE"
+    ]
+    # heartbeat ACKs aren't dispatches, so they're still decoded and timed.
+    assert any(payload["op"] == 11 for payload in decoded)
+    assert client.ws.latency > 0